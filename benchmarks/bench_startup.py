@@ -0,0 +1,77 @@
+"""
+Benchmark of the import time of the ``hepdata-validate`` command.
+
+Imports ``hepdata_validator.cli`` in fresh interpreters with
+``python -X importtime`` and reports the best cumulative import time,
+failing if it is over the budget or if a module which is only needed for
+remote schemas (e.g. ``requests``) or large tables (``numpy``) was imported.
+
+Usage::
+
+    $ python -m benchmarks.bench_startup [-n 10] [--budget 250]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+MODULE = 'hepdata_validator.cli'
+
+# Modules which should only be imported when a remote schema is loaded, or a
+# large table is checked
+LAZY_MODULES = ('requests', 'urllib3', 'numpy')
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+
+def measure_import_time():
+    """
+    Imports MODULE in a new interpreter.
+
+    :return: tuple of the cumulative import time of MODULE in ms and the
+        names of the top-level packages imported.
+    """
+    code = f'import sys, {MODULE}; print(" ".join(sys.modules))'
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+
+    import_time = None
+    for line in result.stderr.splitlines():
+        # Lines look like 'import time:  self [us] | cumulative | module'
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == MODULE:
+            import_time = int(parts[1]) / 1e3
+
+    modules = {name.split('.')[0] for name in result.stdout.split()}
+    return import_time, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('-n', '--number', type=int, default=10, help='Interpreters to start')
+    parser.add_argument('--budget', type=float, default=250, help='Maximum import time in ms')
+    args = parser.parse_args()
+
+    times = []
+    for _ in range(args.number):
+        import_time, modules = measure_import_time()
+        times.append(import_time)
+
+    print(f'import {MODULE}: {min(times):8.1f} ms (budget {args.budget:.0f} ms)')
+
+    failed = False
+    if min(times) > args.budget:
+        print('Import time is over budget')
+        failed = True
+
+    imported = [name for name in LAZY_MODULES if name in modules]
+    if imported:
+        print('Imported modules which should be lazy: ' + ', '.join(imported))
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
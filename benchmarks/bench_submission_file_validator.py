@@ -0,0 +1,62 @@
+"""
+Benchmark of the per-call latency of ``SubmissionFileValidator.validate``.
+
+Compares a long-lived validator, which reuses the schemas and resolver
+loaded when it was created, with the previous behaviour of re-reading the
+schemas and rebuilding the resolver on every call (emulated by clearing
+the process-wide caches before each call).
+
+Usage::
+
+    $ python -m benchmarks.bench_submission_file_validator [-n 200]
+"""
+
+import argparse
+import os
+import timeit
+
+import yaml
+
+import hepdata_validator
+from hepdata_validator import YamlLoader
+from hepdata_validator.submission_file_validator import SubmissionFileValidator
+
+SUBMISSION_FILE = os.path.join(os.path.dirname(__file__), os.pardir, 'testsuite',
+                               'test_data', 'TestHEPSubmission', 'submission.yaml')
+
+
+def clear_schema_caches():
+    hepdata_validator._loaded_schema_files.clear()
+    hepdata_validator._schema_resolvers.clear()
+    hepdata_validator._compiled_validators.clear()
+    hepdata_validator._fast_validators.clear()
+    hepdata_validator._schema_registries.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('-n', '--number', type=int, default=200, help='Calls per measurement')
+    args = parser.parse_args()
+
+    with open(SUBMISSION_FILE, 'r') as f:
+        docs = list(yaml.load_all(f, Loader=YamlLoader))
+
+    def validate_cold():
+        clear_schema_caches()
+        validator = SubmissionFileValidator()
+        validator.validate(file_path=SUBMISSION_FILE, data=docs)
+
+    validator = SubmissionFileValidator()
+
+    def validate_warm():
+        validator.clear_messages()
+        validator.validate(file_path=SUBMISSION_FILE, data=docs)
+
+    for name, fn in [('reload schemas per call', validate_cold),
+                     ('long-lived validator', validate_warm)]:
+        best = min(timeit.repeat(fn, number=args.number, repeat=5)) / args.number
+        print(f'{name:>25}: {best * 1e3:8.3f} ms/call')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Benchmark of the validators on a synthetic submission.
+
+Generates a submission (see `benchmarks.generate_submission`) and times:
+
+* ``DataFileValidator.validate`` on each data file
+* ``SubmissionFileValidator.validate`` on submission.yaml
+* ``FullSubmissionValidator.validate`` on the whole submission
+* the ``hepdata-validate`` command, end to end in a new process
+
+The results are printed, and written as JSON with ``--output`` so that
+different releases can be compared.
+
+Usage::
+
+    $ python -m benchmarks.bench_validators [--tables 10] [--rows 100] [--layout zip] [--output results.json]
+
+``--yaml-backend`` selects the YAML parser (see `hepdata_validator.yaml_backend`),
+so that backends can be compared.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+
+from hepdata_validator import __version__, get_schema_registry
+from hepdata_validator.data_file_validator import DataFileValidator
+from hepdata_validator.full_submission_validator import FullSubmissionValidator
+from hepdata_validator.submission_file_validator import SubmissionFileValidator
+from hepdata_validator.yaml_backend import get_yaml_backend_names, set_yaml_backend
+
+from .generate_submission import CUSTOM_SCHEMA_FILENAME, CUSTOM_SCHEMA_URL, SubmissionSpec, \
+    add_spec_arguments, spec_from_args, write_submission
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+
+def time_call(fn, repeat):
+    """
+    Calls `fn` `repeat` times.
+
+    :return: dict of the best, median and all times in seconds.
+    """
+    times = timeit.repeat(fn, number=1, repeat=repeat)
+    return {'best': min(times), 'median': statistics.median(times), 'times': times}
+
+
+def use_local_custom_schema(output_dir):
+    """
+    Points the schema registry at the generated copy of the custom schema,
+    so that it isn't downloaded.
+    """
+    get_schema_registry().remote_schemas[CUSTOM_SCHEMA_URL] = \
+        os.path.join(output_dir, CUSTOM_SCHEMA_FILENAME)
+
+
+def bench_file_validators(spec, output_dir, repeat):
+    """
+    Times the individual file validators on a directory layout of the
+    submission.
+    """
+    files_spec = SubmissionSpec(**dict(spec.as_dict(), layout='directory'))
+    submission_dir = write_submission(files_spec, os.path.join(output_dir, 'files'))
+    data_files = sorted(os.path.join(submission_dir, f) for f in os.listdir(submission_dir)
+                        if f.startswith('data'))
+    submission_file = os.path.join(submission_dir, 'submission.yaml')
+
+    def validate_data_files():
+        validator = DataFileValidator()
+        file_type = None
+        if spec.custom_schema:
+            file_type = CUSTOM_SCHEMA_URL
+            validator.load_custom_schema(file_type, os.path.join(output_dir, 'files', CUSTOM_SCHEMA_FILENAME))
+        for data_file in data_files:
+            validator.validate(file_path=data_file, file_type=file_type)
+
+    def validate_submission_file():
+        SubmissionFileValidator().validate(file_path=submission_file)
+
+    return {
+        'DataFileValidator.validate': time_call(validate_data_files, repeat),
+        'SubmissionFileValidator.validate': time_call(validate_submission_file, repeat),
+    }
+
+
+def bench_full_validator(spec, path, repeat):
+    result = {}
+
+    def validate():
+        validator = FullSubmissionValidator()
+        if spec.layout == 'directory':
+            result['valid'] = validator.validate(directory=path)
+        elif spec.layout == 'single':
+            result['valid'] = validator.validate(file=path)
+        else:
+            result['valid'] = validator.validate(archive=path)
+
+    timings = time_call(validate, repeat)
+    timings['valid'] = result['valid']
+    return timings
+
+
+def bench_cli(spec, path, repeat, yaml_backend):
+    option = {'directory': '-d', 'single': '-f'}.get(spec.layout, '-a')
+    command = [sys.executable, '-c', 'from hepdata_validator.cli import validate; validate()',
+               option, path, '--yaml-backend', yaml_backend]
+
+    def run():
+        subprocess.run(command, cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    return time_call(run, repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_spec_arguments(parser)
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='Repeats of each measurement')
+    parser.add_argument('-o', '--output', help='File to write the results to as JSON')
+    parser.add_argument('--yaml-backend', choices=get_yaml_backend_names(),
+                        help='YAML backend to use (defaults to the fastest available)')
+    args = parser.parse_args()
+    spec = spec_from_args(args)
+    yaml_backend = set_yaml_backend(args.yaml_backend)
+
+    results = {
+        'hepdata_validator': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'yaml_backend': yaml_backend.name,
+        'spec': spec.as_dict(),
+        'timings': {},
+    }
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        path = write_submission(spec, output_dir)
+        if spec.custom_schema:
+            use_local_custom_schema(output_dir)
+
+        timings = results['timings']
+        timings.update(bench_file_validators(spec, output_dir, args.repeat))
+        timings['FullSubmissionValidator.validate'] = bench_full_validator(spec, path, args.repeat)
+        if spec.custom_schema:
+            # A new process would download the custom schema
+            results['skipped'] = ['hepdata-validate']
+        else:
+            timings['hepdata-validate'] = bench_cli(spec, path, args.repeat, yaml_backend.name)
+
+    for name, timing in results['timings'].items():
+        print(f"{name:>35}: {timing['best'] * 1e3:10.2f} ms (median {timing['median'] * 1e3:.2f} ms)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+"""
+Generator of synthetic HEPData submissions for the benchmarks.
+
+Generates submissions with a configurable number of tables, rows, dependent
+variables and error sources, a fraction of invalid tables, optionally using
+a custom data schema, written as a directory, a zip or tar archive, or a
+single YAML file.
+
+Usage::
+
+    $ python -m benchmarks.generate_submission OUTPUT_DIR [--tables 10] [--rows 100] ...
+"""
+
+import argparse
+import copy
+import json
+import os
+import random
+import shutil
+
+import yaml
+
+from hepdata_validator import YamlDumper, get_schema_registry
+
+LAYOUTS = ('directory', 'zip', 'tar', 'single')
+
+# URL of the custom data schema. It is never downloaded: the benchmarks
+# point the schema registry at the generated local copy.
+CUSTOM_SCHEMA_URL = 'https://hepdata.example.org/benchmarks/schemas/1.0.0/custom_data_schema.json'
+CUSTOM_SCHEMA_FILENAME = 'custom_data_schema.json'
+
+
+class SubmissionSpec(object):
+    """
+    Parameters of a generated submission.
+    """
+
+    def __init__(self, tables=10, rows=100, dependent_variables=2, error_sources=2,
+                 invalid_fraction=0.0, layout='directory', custom_schema=False, seed=0):
+        if layout not in LAYOUTS:
+            raise ValueError('Invalid layout ' + layout)
+        self.tables = tables
+        self.rows = rows
+        self.dependent_variables = dependent_variables
+        self.error_sources = error_sources
+        self.invalid_fraction = invalid_fraction
+        self.layout = layout
+        self.custom_schema = custom_schema
+        self.seed = seed
+
+    def as_dict(self):
+        return dict(self.__dict__)
+
+    def invalid_tables(self):
+        """
+        :return: indices of the tables which are made invalid.
+        """
+        count = int(round(self.tables * self.invalid_fraction))
+        return set(random.Random(self.seed).sample(range(self.tables), count))
+
+
+def generate_table(spec, rng, invalid=False):
+    """
+    Generates a data table.
+
+    :param spec: `SubmissionSpec`.
+    :param rng: `random.Random`.
+    :param invalid: whether to add errors to the table.
+    :return: dict.
+    """
+    independent_values = []
+    for i in range(spec.rows):
+        independent_values.append({'low': float(i), 'high': float(i + 1)})
+
+    dependent_variables = []
+    for d in range(spec.dependent_variables):
+        values = []
+        for i in range(spec.rows):
+            errors = []
+            for e in range(spec.error_sources):
+                if e % 2:
+                    errors.append({'asymerror': {'plus': round(rng.uniform(0.1, 1), 3),
+                                                 'minus': -round(rng.uniform(0.1, 1), 3)},
+                                   'label': f'sys{e}'})
+                else:
+                    errors.append({'symerror': round(rng.uniform(0.1, 1), 3), 'label': f'stat{e}'})
+            value = {'value': round(rng.uniform(1, 100), 3)}
+            if errors:
+                value['errors'] = errors
+            values.append(value)
+        dependent_variables.append({
+            'header': {'name': f'SIG{d}', 'units': 'FB'},
+            'qualifiers': [{'name': 'SQRT(S)', 'units': 'GEV', 'value': 13000}],
+            'values': values,
+        })
+
+    if invalid and spec.rows:
+        # A schema error (a bin with 'low' but no 'high') and an error
+        # from the semantic checks (a non-numeric uncertainty)
+        del independent_values[spec.rows // 2]['high']
+        if spec.dependent_variables and spec.error_sources:
+            dependent_variables[0]['values'][-1]['errors'][0] = {'symerror': 'abc', 'label': 'stat0'}
+
+    return {
+        'independent_variables': [{'header': {'name': 'PT', 'units': 'GEV'},
+                                   'values': independent_values}],
+        'dependent_variables': dependent_variables,
+    }
+
+
+def generate_submission_docs(spec):
+    """
+    Generates the documents of a submission, with each data table in the
+    'data' key of its document.
+
+    :param spec: `SubmissionSpec`.
+    :return: list of dicts.
+    """
+    rng = random.Random(spec.seed)
+    invalid_tables = spec.invalid_tables()
+
+    docs = [{'comment': 'Synthetic submission generated for benchmarks.'}]
+    for t in range(spec.tables):
+        doc = {
+            'name': f'Table {t + 1}',
+            'description': f'Synthetic table {t + 1}.',
+            'keywords': [{'name': 'cmenergies', 'values': [13000]},
+                         {'name': 'observables', 'values': ['SIG']}],
+            'data_file': f'data{t + 1}.yaml',
+            'data': generate_table(spec, rng, invalid=t in invalid_tables),
+        }
+        if spec.custom_schema:
+            doc['data_schema'] = CUSTOM_SCHEMA_URL
+        docs.append(doc)
+    return docs
+
+
+def get_custom_schema():
+    """
+    Returns the custom data schema used by the benchmarks, which accepts
+    the same tables as the HEPData data schema.
+
+    :return: dict.
+    """
+    schema = copy.deepcopy(get_schema_registry().get_schema('data_schema.json'))
+    schema['$id'] = CUSTOM_SCHEMA_URL
+    schema['title'] = 'Custom data schema for benchmarks'
+    return schema
+
+
+def write_submission(spec, output_dir):
+    """
+    Writes a submission in the layout given by the spec.
+
+    :param spec: `SubmissionSpec`.
+    :param output_dir: directory to write into (created if needed).
+    :return: path to validate: a directory, archive or single YAML file.
+    """
+    docs = generate_submission_docs(spec)
+    os.makedirs(output_dir, exist_ok=True)
+
+    if spec.custom_schema:
+        with open(os.path.join(output_dir, CUSTOM_SCHEMA_FILENAME), 'w') as f:
+            json.dump(get_custom_schema(), f)
+
+    if spec.layout == 'single':
+        for doc in docs[1:]:
+            data = doc.pop('data')
+            del doc['data_file']
+            doc.update(data)
+        path = os.path.join(output_dir, 'submission_single.yaml')
+        with open(path, 'w') as f:
+            yaml.dump_all(docs, f, Dumper=YamlDumper)
+        return path
+
+    submission_dir = os.path.join(output_dir, 'submission')
+    os.makedirs(submission_dir, exist_ok=True)
+    for doc in docs[1:]:
+        with open(os.path.join(submission_dir, doc['data_file']), 'w') as f:
+            yaml.dump(doc.pop('data'), f, Dumper=YamlDumper)
+    with open(os.path.join(submission_dir, 'submission.yaml'), 'w') as f:
+        yaml.dump_all(docs, f, Dumper=YamlDumper)
+
+    if spec.layout == 'directory':
+        return submission_dir
+
+    archive_format = 'zip' if spec.layout == 'zip' else 'gztar'
+    archive = shutil.make_archive(os.path.join(output_dir, 'submission'), archive_format,
+                                  submission_dir)
+    shutil.rmtree(submission_dir)
+    return archive
+
+
+def add_spec_arguments(parser):
+    """
+    Adds the options of `SubmissionSpec` to an argument parser.
+    """
+    defaults = SubmissionSpec()
+    parser.add_argument('--tables', type=int, default=defaults.tables)
+    parser.add_argument('--rows', type=int, default=defaults.rows)
+    parser.add_argument('--dependent-variables', type=int, default=defaults.dependent_variables)
+    parser.add_argument('--error-sources', type=int, default=defaults.error_sources)
+    parser.add_argument('--invalid-fraction', type=float, default=defaults.invalid_fraction)
+    parser.add_argument('--layout', choices=LAYOUTS, default=defaults.layout)
+    parser.add_argument('--custom-schema', action='store_true')
+    parser.add_argument('--seed', type=int, default=defaults.seed)
+
+
+def spec_from_args(args):
+    return SubmissionSpec(tables=args.tables, rows=args.rows,
+                          dependent_variables=args.dependent_variables,
+                          error_sources=args.error_sources,
+                          invalid_fraction=args.invalid_fraction, layout=args.layout,
+                          custom_schema=args.custom_schema, seed=args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('output_dir')
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+    print(write_submission(spec_from_args(args), args.output_dir))
+
+
+if __name__ == '__main__':
+    main()
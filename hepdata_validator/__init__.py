@@ -23,28 +23,29 @@
 # as an Intergovernmental Organization or submit itself to any jurisdiction.
 
 import abc
+import hashlib
+import json
+import mmap
 import os
+import re
+from contextlib import contextmanager
 
+from jsonschema import RefResolver
 from jsonschema.validators import validator_for
 from jsonschema.exceptions import by_relevance
 from packaging import version as packaging_version
+import yaml
 
+from .discriminator import get_discriminated_validator_class
+from .schema_cache import DEFAULT_MAX_ENTRIES, DEFAULT_MAX_SIZE, SchemaCache
 from .version import __version__
+from .yaml_backend import get_yaml_backend
 
-# We try to load using the CSafeLoader for speed improvements
-YamlLoader = None
-YamlDumper = None
-use_libyaml = os.environ.get('USE_LIBYAML', True)
-if use_libyaml and use_libyaml not in ('False', 'false', 'f', 'F'):
-    try:
-        from yaml import CSafeLoader as YamlLoader
-        from yaml import CSafeDumper as YamlDumper
-    except ImportError:  # pragma: no cover
-        pass
-
-if YamlLoader is None or YamlDumper is None:
-    from yaml import SafeLoader as YamlLoader
-    from yaml import SafeDumper as YamlDumper
+# Loader and dumper of the default YAML backend, which uses the CSafeLoader
+# for speed improvements if it is available. The validators use the active
+# backend (see hepdata_validator.yaml_backend).
+YamlLoader = get_yaml_backend().loader
+YamlDumper = get_yaml_backend().dumper
 
 __all__ = ('__version__', )
 
@@ -54,6 +55,577 @@ LATEST_SCHEMA_VERSION = VALID_SCHEMA_VERSIONS[0]
 RAW_SCHEMAS_URL = 'https://raw.githubusercontent.com/HEPData/hepdata-validator/' \
     + __version__ + '/hepdata_validator/schemas'
 
+# Characters which start a JSON data or submission file (other than blanks)
+JSON_START_CHARS = ('{', '[')
+# JSON numbers which YAML 1.1 reads as floats, i.e. with a decimal point and
+# a sign in any exponent. Others, such as 1e5, are strings in YAML.
+_YAML_FLOAT_PATTERN = re.compile(r'-?[0-9]+\.[0-9]*(?:[eE][-+][0-9]+)?$')
+
+# Files at least this big are memory-mapped by `open_document` rather than
+# read through a buffer
+MMAP_THRESHOLD = 1048576
+
+
+class _MappedFile(mmap.mmap):
+    """
+    Read-only memory map of a file, with the file's name for the messages of
+    the parsers.
+    """
+
+
+@contextmanager
+def open_document(file_path):
+    """
+    Opens a YAML or JSON file for `load_document` or `load_all_documents`.
+    The file is read as bytes, which the parsers decode themselves, rather
+    than being decoded into str and copied first. Files of at least
+    `MMAP_THRESHOLD` bytes are memory-mapped.
+
+    :param file_path: path to the file.
+    :return: context manager giving a binary file-like object.
+    :raise OSError: if the file can't be read.
+    """
+    with open(file_path, 'rb') as f:
+        file_size = os.fstat(f.fileno()).st_size
+        # Empty files can't be mapped
+        if file_size < MMAP_THRESHOLD or not file_size:
+            yield f
+            return
+        mapped_file = _MappedFile(f.fileno(), 0, access=mmap.ACCESS_READ)
+        mapped_file.name = file_path
+        try:
+            yield mapped_file
+        finally:
+            mapped_file.close()
+
+
+def _looks_like_json(stream):
+    """
+    Checks whether an open file looks like JSON, i.e. it has a .json
+    extension or its first non-blank character is in `JSON_START_CHARS`.
+    The file is left at the position it was at.
+    """
+    name = getattr(stream, 'name', None)
+    if isinstance(name, str) and name.lower().endswith('.json'):
+        return True
+
+    position = stream.tell()
+    try:
+        while True:
+            chunk = stream.read(4096)
+            if not chunk:
+                return False
+            if isinstance(chunk, bytes):
+                chunk = chunk.decode('utf-8', 'replace')
+            chunk = chunk.lstrip(' \t\r\n\ufeff')
+            if chunk:
+                return chunk.startswith(JSON_START_CHARS)
+    finally:
+        stream.seek(position)
+
+
+def _load_json(stream, intern_strings=False):
+    """
+    Parses a file which looks like JSON with the json module, which is much
+    faster than the YAML loaders.
+
+    :param intern_strings: whether to intern strings and small objects (see
+        `hepdata_validator.interning`).
+    :return: tuple of whether the file was parsed, and either the document
+        or the file, to be passed to the YAML loader instead.
+    """
+    if not _looks_like_json(stream):
+        return False, stream
+    position = stream.tell()
+    try:
+        if intern_strings:
+            from .interning import Interner
+            return True, json.loads(stream.read(), parse_float=_parse_json_float,
+                                    parse_constant=_reject_json_constant,
+                                    object_pairs_hook=Interner().json_object_pairs_hook)
+        return True, json.loads(stream.read(), parse_float=_parse_json_float,
+                                parse_constant=_reject_json_constant)
+    except ValueError:
+        # e.g. a YAML flow mapping, or NaN or Infinity. The file is read
+        # again by the YAML loader, so that its errors are reported with the
+        # file name.
+        stream.seek(position)
+        return False, stream
+
+
+def _parse_json_float(text):
+    """
+    `parse_float` for `json.loads`, giving the same values as the YAML
+    loaders: numbers such as 1e5 or 1.0e5, without a decimal point or a sign
+    in the exponent, are kept as strings.
+    """
+    if _YAML_FLOAT_PATTERN.match(text):
+        return float(text)
+    return text
+
+
+def _reject_json_constant(name):
+    """
+    `parse_constant` for `json.loads`, as the json module accepts NaN,
+    Infinity and -Infinity, which aren't JSON, and YAML parses differently.
+    """
+    raise ValueError(f'{name} is not valid JSON')
+
+
+def _get_interning_loader():
+    """
+    :return: loader class of the active YAML backend interning strings and
+        small mappings, or None if the backend has no PyYAML loader.
+    """
+    loader = get_yaml_backend().loader
+    if loader is None:
+        return None
+    from .interning import get_interning_loader
+    return get_interning_loader(loader)
+
+
+def load_document(stream, intern_strings=False):
+    """
+    Loads a YAML or JSON data file. Files which look like JSON are parsed as
+    JSON, falling back to YAML if they aren't valid JSON.
+
+    :param stream: open file, in binary mode for speed (see `open_document`).
+    :param intern_strings: whether to share repeated strings and small
+        mappings (see `hepdata_validator.interning`). Ignored by YAML
+        backends without a PyYAML loader.
+    :return: the document, or None if the file is empty.
+    :raise yaml.YAMLError: if the file can't be parsed.
+    """
+    is_json, data = _load_json(stream, intern_strings)
+    if is_json:
+        return data
+    loader = _get_interning_loader() if intern_strings else None
+    if loader is not None:
+        return yaml.load(data, Loader=loader)
+    return get_yaml_backend().load(data)
+
+
+def load_all_documents(stream, intern_strings=False):
+    """
+    Loads the documents of a YAML or JSON submission file (see
+    `load_document`). A JSON file holds a single document.
+
+    :param stream: open file.
+    :param intern_strings: whether to share repeated strings and small
+        mappings, across all the documents.
+    :return: iterable of documents, parsed as they are iterated over in the
+        case of YAML.
+    :raise yaml.YAMLError: if the file can't be parsed.
+    """
+    is_json, data = _load_json(stream, intern_strings)
+    if is_json:
+        return [data]
+    loader = _get_interning_loader() if intern_strings else None
+    if loader is not None:
+        return yaml.load_all(data, Loader=loader)
+    return get_yaml_backend().load_all(data)
+
+
+def load_file(file_path, all_documents=False, intern_strings=False):
+    """
+    Loads a YAML or JSON file (see `load_document`).
+
+    :param file_path: path to the file.
+    :param all_documents: whether to load a list of all the documents of
+        the file (see `load_all_documents`) rather than a single document.
+    :param intern_strings: whether to share repeated strings and small
+        mappings.
+    :raise OSError: if the file can't be read.
+    :raise yaml.YAMLError: if the file can't be parsed.
+    """
+    with open_document(file_path) as stream:
+        if all_documents:
+            return list(load_all_documents(stream, intern_strings))
+        return load_document(stream, intern_strings)
+
+
+# Process-wide caches so that each schema file is only read once, and each
+# schema is only checked against its metaschema once, however many
+# validators or files are validated.
+_loaded_schema_files = {}
+_schema_resolvers = {}
+_compiled_validators = {}
+_fast_validators = {}
+_subschema_validators = {}
+_schema_registries = {}
+# Keys of schemas which have already been checked against their metaschema
+_checked_schemas = set()
+
+
+def load_schema_file(schema_file_path):
+    """
+    Loads a JSON schema file, reusing the parsed schema if the file has
+    already been loaded by this process.
+
+    :param schema_file_path: path to the JSON schema file.
+    :return: dict.
+    """
+    schema = _loaded_schema_files.get(schema_file_path)
+    if schema is None:
+        with open(schema_file_path, 'r') as f:
+            schema = json.load(f)
+        _loaded_schema_files[schema_file_path] = schema
+    return schema
+
+
+def get_schema_resolver(schema_file_path):
+    """
+    Returns a `jsonschema.RefResolver` for the schema in the given file,
+    shared by all validators in this process using the same schema file.
+
+    :param schema_file_path: path to the JSON schema file.
+    :return: `jsonschema.RefResolver`.
+    """
+    resolver = _schema_resolvers.get(schema_file_path)
+    if resolver is None:
+        resolver = RefResolver.from_schema(load_schema_file(schema_file_path))
+        _schema_resolvers[schema_file_path] = resolver
+    return resolver
+
+
+def get_schema_key(schema):
+    """
+    Builds a key identifying a schema by its content, for schemas which
+    do not have a fixed identity (e.g. custom or remote schemas).
+
+    :param schema: dict.
+    :return: str.
+    """
+    return _hash_schema_str(_dump_schema(schema))
+
+
+def _dump_schema(schema):
+    return json.dumps(schema, sort_keys=True, separators=(',', ':'))
+
+
+def _hash_schema_str(schema_str):
+    return hashlib.sha256(schema_str.encode('utf-8')).hexdigest()
+
+
+def _create_validator(schema, resolver=None, check_schema=True):
+    cls = get_discriminated_validator_class(validator_for(schema))
+    if check_schema:
+        cls.check_schema(schema)
+    if resolver is not None:
+        return cls(schema, resolver=resolver)
+    return cls(schema)
+
+
+def _compile_fast_validator(schema, validator, resolver=None):
+    from .schema_compiler import compile_schema, UnsupportedSchemaError
+
+    try:
+        return compile_schema(schema, type(validator), resolver)
+    except UnsupportedSchemaError:
+        return None
+
+
+def get_compiled_validator(schema, schema_key=None, resolver=None):
+    """
+    Returns a `jsonschema` validator instance for the given schema, which is
+    created and checked against its metaschema only the first time the
+    schema is seen by this process.
+
+    :param schema: dict.
+    :param schema_key: hashable key identifying the schema, e.g. a
+        (schema version, file name) tuple. Defaults to a hash of the
+        schema's content.
+    :param resolver: `jsonschema.RefResolver` to use for `$ref`. Resolvers
+        are identified by their base URI.
+    :return: `jsonschema` validator instance.
+    """
+    if schema_key is None:
+        schema_key = get_schema_key(schema)
+    resolver_key = resolver.resolution_scope if resolver is not None else None
+    cache_key = (schema_key, resolver_key)
+
+    validator = _compiled_validators.get(cache_key)
+    if validator is None:
+        validator = _create_validator(schema, resolver,
+                                      check_schema=schema_key not in _checked_schemas)
+        _checked_schemas.add(schema_key)
+        _compiled_validators[cache_key] = validator
+    return validator
+
+
+def get_fast_validator(schema, schema_key=None, resolver=None):
+    """
+    Returns a function generated from the schema (see
+    `hepdata_validator.schema_compiler`) which checks whether an instance is
+    valid, or None if the schema uses keywords which can't be compiled.
+    The function is generated the first time the schema is seen by this
+    process.
+
+    :param schema: dict.
+    :param schema_key: hashable key identifying the schema (see
+        `get_compiled_validator`).
+    :param resolver: `jsonschema.RefResolver` to use for `$ref`.
+    :return: function or None.
+    """
+    if schema_key is None:
+        schema_key = get_schema_key(schema)
+    resolver_key = resolver.resolution_scope if resolver is not None else None
+    cache_key = (schema_key, resolver_key)
+
+    if cache_key not in _fast_validators:
+        # Check the schema before compiling it
+        validator = get_compiled_validator(schema, schema_key=schema_key, resolver=resolver)
+        _fast_validators[cache_key] = _compile_fast_validator(schema, validator, resolver)
+    return _fast_validators[cache_key]
+
+
+def get_subschema_validators(schema, subschema_path, schema_key=None):
+    """
+    Returns validators for a part of a schema, e.g. the schema of the items
+    of an array, which use the same draft as the whole schema. They are
+    created the first time the subschema is seen by this process.
+
+    :param schema: dict.
+    :param subschema_path: sequence of keys leading to the subschema, e.g.
+        ('properties', 'values', 'items').
+    :param schema_key: hashable key identifying the schema (see
+        `get_compiled_validator`).
+    :return: tuple of a `jsonschema` validator instance and the function
+        generated from the subschema (or None, see `get_fast_validator`), or
+        None if there is no subschema at that path.
+    """
+    if schema_key is None:
+        schema_key = get_schema_key(schema)
+    cache_key = (schema_key, tuple(subschema_path))
+
+    if cache_key not in _subschema_validators:
+        subschema = schema
+        for part in subschema_path:
+            subschema = subschema.get(part) if isinstance(subschema, dict) else None
+        if isinstance(subschema, dict):
+            cls = type(get_compiled_validator(schema, schema_key=schema_key))
+            validator = cls(subschema)
+            _subschema_validators[cache_key] = \
+                (validator, _compile_fast_validator(subschema, validator))
+        else:
+            _subschema_validators[cache_key] = None
+    return _subschema_validators[cache_key]
+
+
+class CustomSchema(object):
+    """
+    A custom or remote data schema, identified by its content, with the
+    validators compiled from it. The validators are created the first time
+    they are needed, and are dropped with the `CustomSchema` when it is
+    evicted from the registry's cache of custom schemas.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        schema_str = _dump_schema(schema)
+        self.key = _hash_schema_str(schema_str)
+        # Size of the serialised schema, used to bound the cache
+        self.size = len(schema_str)
+        self._validator = None
+        self._is_valid = None
+        self._is_valid_compiled = False
+
+    @property
+    def validator(self):
+        """
+        `jsonschema` validator instance for the schema, which is checked
+        against its metaschema when it is created.
+        """
+        if self._validator is None:
+            self._validator = _create_validator(self.schema)
+        return self._validator
+
+    @property
+    def is_valid(self):
+        """
+        Function generated from the schema checking whether an instance is
+        valid, or None if the schema can't be compiled (see
+        `get_fast_validator`).
+        """
+        if not self._is_valid_compiled:
+            self._is_valid = _compile_fast_validator(self.schema, self.validator)
+            self._is_valid_compiled = True
+        return self._is_valid
+
+
+def get_schema_registry(schema_version=LATEST_SCHEMA_VERSION, schema_folder='schemas', base_path=None):
+    """
+    Returns the `SchemaRegistry` for the given schema version, which is
+    created the first time it is requested and then shared by all
+    validators in this process.
+
+    :param schema_version: str.
+    :param schema_folder: folder containing the schema versions.
+    :param base_path: directory containing `schema_folder` (defaults to
+        the package directory).
+    :return: `SchemaRegistry`.
+    """
+    if base_path is None:
+        base_path = os.path.dirname(__file__)
+    registry_key = (base_path, schema_folder, schema_version)
+
+    registry = _schema_registries.get(registry_key)
+    if registry is None:
+        registry = SchemaRegistry(schema_version, schema_folder, base_path)
+        _schema_registries[registry_key] = registry
+    return registry
+
+
+class SchemaRegistry(object):
+    """
+    Holds what validators need for one schema version: the paths of the
+    schema files, parsed bundled and custom schemas, the resolver for the
+    submission schemas, the local copies of remote schemas and flags for
+    the version-dependent checks.
+
+    If the version has a schema bundle (see `hepdata_validator.schema_bundle`)
+    its schemas are all loaded from the bundle, already resolved and
+    checked, instead of from the individual JSON files.
+
+    Validators borrow the registry for their schema version (see
+    `get_schema_registry`) rather than building these themselves, so
+    creating a validator is cheap. Compiled validators are cached per
+    schema by `get_compiled_validator` and `get_fast_validator`.
+    """
+    additional_resources_filename = 'additional_resources_schema.json'
+
+    def __init__(self, schema_version=LATEST_SCHEMA_VERSION, schema_folder='schemas', base_path=None):
+        from .schema_bundle import load_schema_bundle
+
+        if schema_version not in VALID_SCHEMA_VERSIONS:
+            raise ValueError('Invalid schema version ' + schema_version)
+        self.schema_version_string = schema_version
+        self.schema_version = packaging_version.parse(schema_version)
+        self.schema_folder = schema_folder
+        self.base_path = base_path if base_path is not None else os.path.dirname(__file__)
+
+        # Version-dependent features, so that validators don't compare
+        # versions for every file or document
+        self.has_semantic_checks = self.schema_version.major > 0
+        self.has_v1_1_features = self.schema_version >= packaging_version.parse('1.1.0')
+
+        # Local paths of remote schemas which have already been downloaded,
+        # keyed by schema URL
+        self.remote_schemas = SchemaCache(max_entries=DEFAULT_MAX_ENTRIES)
+        # Custom and remote schemas with their compiled validators (see
+        # `CustomSchema`), keyed by content hash
+        self.custom_schemas = SchemaCache(max_entries=DEFAULT_MAX_ENTRIES,
+                                          max_size=DEFAULT_MAX_SIZE,
+                                          sizeof=lambda custom_schema: custom_schema.size)
+
+        self._schema_filepaths = {}
+        # Content hashes of custom schema files, keyed by file path
+        self._custom_schema_paths = SchemaCache(max_entries=DEFAULT_MAX_ENTRIES)
+        self._submission_resolver = None
+
+        self._bundled_schemas = load_schema_bundle(
+            os.path.join(self.base_path, self.schema_folder, self.schema_version_string))
+        if self._bundled_schemas is not None:
+            for schema_filename in self._bundled_schemas:
+                # Schemas are checked when the bundle is built
+                _checked_schemas.add(self._get_version_filepath(schema_filename))
+
+    def get_schema_filepath(self, schema_filename):
+        """
+        Returns the path of one of the schema files for this version.
+
+        :param schema_filename: e.g. 'data_schema.json'
+        :return: str.
+        """
+        full_filepath = self._schema_filepaths.get(schema_filename)
+        if full_filepath is None:
+            full_filepath = self._get_version_filepath(schema_filename)
+
+            if not self._is_bundled(schema_filename) and not os.path.isfile(full_filepath):
+                raise ValueError('Invalid schema file ' + full_filepath)
+
+            self._schema_filepaths[schema_filename] = full_filepath
+        return full_filepath
+
+    def get_schema(self, schema_filename):
+        """
+        Returns one of the schemas for this version.
+
+        :param schema_filename: e.g. 'data_schema.json'
+        :return: dict.
+        """
+        if self._is_bundled(schema_filename):
+            return self._bundled_schemas[schema_filename]
+        return load_schema_file(self.get_schema_filepath(schema_filename))
+
+    def get_submission_resolver(self):
+        """
+        Returns the resolver used for `$ref` in the submission schemas, or
+        None if the schemas don't refer to other files, either because they
+        were resolved in the schema bundle or for versions before 1.1.0.
+
+        :return: `jsonschema.RefResolver` or None.
+        """
+        if self._submission_resolver is None and self.has_v1_1_features \
+                and not self._is_bundled(self.additional_resources_filename):
+            self._submission_resolver = get_schema_resolver(
+                self.get_schema_filepath(self.additional_resources_filename))
+        return self._submission_resolver
+
+    def get_custom_schema_filepath(self, type):
+        """
+        Returns the default path of the schema for a custom data type.
+
+        :param type: e.g. histfactory
+        :return: str.
+        """
+        return self._get_version_filepath("{0}_schema.json".format(type))
+
+    def load_custom_schema(self, schema_file_path):
+        """
+        Loads a custom schema file, reusing the parsed schema if the file, or
+        another file with the same content, has already been loaded.
+
+        :param schema_file_path: path to the JSON schema file.
+        :return: `CustomSchema`.
+        """
+        schema_key = self._custom_schema_paths.get(schema_file_path)
+        custom_schema = self.custom_schemas.get(schema_key) if schema_key else None
+        if custom_schema is None:
+            with open(schema_file_path, 'r') as f:
+                schema = json.load(f)
+            custom_schema = self.get_custom_schema(schema)
+            self._custom_schema_paths[schema_file_path] = custom_schema.key
+        return custom_schema
+
+    def get_custom_schema(self, schema, schema_key=None):
+        """
+        Returns the `CustomSchema` for a custom schema, which is shared with
+        any other schema with the same content.
+
+        :param schema: dict.
+        :param schema_key: content hash of the schema, if already known.
+        :return: `CustomSchema`.
+        """
+        custom_schema = self.custom_schemas.get(schema_key) if schema_key else None
+        if custom_schema is None:
+            new_custom_schema = CustomSchema(schema)
+            custom_schema = self.custom_schemas.get(new_custom_schema.key)
+            if custom_schema is None:
+                custom_schema = new_custom_schema
+                self.custom_schemas[custom_schema.key] = custom_schema
+        return custom_schema
+
+    def _get_version_filepath(self, filename):
+        return os.path.join(self.base_path,
+                            self.schema_folder,
+                            self.schema_version_string,
+                            filename)
+
+    def _is_bundled(self, schema_filename):
+        return self._bundled_schemas is not None and schema_filename in self._bundled_schemas
+
+
 class Validator(object):
     """
     Provides a general 'interface' for Validator in HEPData
@@ -66,23 +638,47 @@ class Validator(object):
         self.messages = {}
         self.default_schema_file = ''
         self.schemas = kwargs.get('schemas', {})
-        self.schema_folder = kwargs.get('schema_folder', 'schemas')
-        self.schema_version_string = kwargs.get('schema_version', LATEST_SCHEMA_VERSION)
-        if self.schema_version_string not in VALID_SCHEMA_VERSIONS:
-            raise ValueError('Invalid schema version ' + self.schema_version_string)
-        self.schema_version = packaging_version.parse(self.schema_version_string)
-
+        self.schema_registry = kwargs.get('schema_registry')
+        if self.schema_registry is None:
+            self.schema_registry = get_schema_registry(
+                kwargs.get('schema_version', LATEST_SCHEMA_VERSION),
+                kwargs.get('schema_folder', 'schemas'),
+                getattr(self, 'base_path', None)
+            )
+        self.schema_folder = self.schema_registry.schema_folder
+        self.schema_version_string = self.schema_registry.schema_version_string
+        self.schema_version = self.schema_registry.schema_version
+        # Whether to check documents are valid before looking for errors
+        self.check_validity_first = kwargs.get('check_validity_first', True)
+        # Whether to find the line and column of errors in files with errors
+        self.locate_errors = kwargs.get('locate_errors', True)
+        # On-disk cache of parsed files, given as a ParseCache or a directory
+        self.parse_cache = kwargs.get('parse_cache')
+        if isinstance(self.parse_cache, str):
+            from .parse_cache import ParseCache
+            self.parse_cache = ParseCache(self.parse_cache)
+        # Whether to share repeated strings and small mappings of loaded files
+        self.intern_strings = kwargs.get('intern_strings', False)
+        # Maximum number of messages kept for each file, after which the
+        # file isn't checked any further. None for no limit.
+        self.max_errors_per_file = kwargs.get('max_errors_per_file')
+        # Lower limits for files being validated, given to `validate` (see
+        # `_error_limit`)
+        self._error_limits = {}
+        # Whether to merge messages of a file which only differ in an index
+        self.aggregate_errors = kwargs.get('aggregate_errors', False)
+
+    def _load_file(self, file_path, all_documents=False):
+        """
+        Loads a YAML or JSON file (see `load_file`), through `parse_cache` if
+        one is set.
+        """
+        if self.parse_cache is not None:
+            return self.parse_cache.load(file_path, all_documents, self.intern_strings)
+        return load_file(file_path, all_documents, self.intern_strings)
 
     def _get_schema_filepath(self, schema_filename):
-        full_filepath = os.path.join(self.base_path,
-                                     self.schema_folder,
-                                     self.schema_version_string,
-                                     schema_filename)
-
-        if not os.path.isfile(full_filepath):
-            raise ValueError('Invalid schema file ' + full_filepath)
-
-        return full_filepath
+        return self.schema_registry.get_schema_filepath(schema_filename)
 
     @abc.abstractmethod
     def validate(self, **kwargs):
@@ -94,7 +690,8 @@ class Validator(object):
         :return: true if valid, false otherwise
         """
 
-    def _validate_json_against_schema(self, file_path, data, schema, sort_fn=None, **kwargs):
+    def _validate_json_against_schema(self, file_path, data, schema, sort_fn=None,
+                                      schema_key=None, resolver=None, custom_schema=None):
         """
         Validates json_data against the given schema.
         Roughly follows the pattern of jsonschema.validate but adds errors to
@@ -105,21 +702,59 @@ class Validator(object):
         :param type schema: schema to validate data against
         :param type sort_fn: Function to sort error messages to get most
             relevant (see docs for `jsonschema.exceptions.by_relevance`).
-        :param type **kwargs: Other kwargs to use when creating the
-            `jsonschema.IValidator` instance.
+        :param type schema_key: key identifying the schema in the compiled
+            validator cache (see `get_compiled_validator`).
+        :param type resolver: `jsonschema.RefResolver` to use when creating
+            the `jsonschema.IValidator` instance.
+        :param type custom_schema: `CustomSchema` holding the validators for
+            the schema, instead of the process-wide caches.
         """
+        if self.check_validity_first:
+            # Check validity with a function generated from the schema, so
+            # that errors are only collected and ranked for invalid data.
+            # If the schema can't be compiled, go straight to collecting
+            # errors, as jsonschema's own validity check would do the same work.
+            if custom_schema is not None:
+                is_valid = custom_schema.is_valid
+            else:
+                is_valid = get_fast_validator(schema, schema_key=schema_key, resolver=resolver)
+            if is_valid is not None and is_valid(data):
+                return
+
         # Create validator ourselves so we can tweak the errors
-        cls = validator_for(schema)
-        cls.check_schema(schema)
-        v = cls(schema, **kwargs)
+        if custom_schema is not None:
+            v = custom_schema.validator
+        else:
+            v = get_compiled_validator(schema, schema_key=schema_key, resolver=resolver)
+
+        self._add_schema_errors(file_path, data, v, sort_fn)
+
+    def _add_schema_errors(self, file_path, data, validator, sort_fn=None, path=(), is_valid=None):
+        """
+        Adds the errors found by a `jsonschema` validator to self.messages.
+
+        :param type path: path of data within the document being checked,
+            added to the start of the path of each error.
+        :param type is_valid: function to check the validity of data first
+            (see `get_fast_validator`), used if `check_validity_first` is set.
+        """
+        if self.error_limit_reached(file_path):
+            return
+        if self.check_validity_first and is_valid is not None and is_valid(data):
+            return
 
         if not sort_fn:
             sort_fn = by_relevance()
 
-        # Show all errors found, using best error in context for each
-        for error in v.iter_errors(data):
+        # Show all errors found, using best error in context for each, until
+        # there are too many
+        for error in validator.iter_errors(data):
+            if path:
+                error.path.extendleft(reversed(path))
             best = sorted([error] + error.context, key=sort_fn)[0]
             self.add_validation_error(file_path, best)
+            if self.error_limit_reached(file_path):
+                break
 
     def has_errors(self, file_name):
         """
@@ -131,18 +766,63 @@ class Validator(object):
         """
         return file_name in self.messages
 
-    def get_messages(self, file_name=None):
+    def error_limit_reached(self, file_name):
+        """
+        Returns true if more errors than `max_errors_per_file` were found in
+        the file, so that it shouldn't be checked any further.
+
+        :param file_name:
+        :return: boolean
+        """
+        limit = self.get_error_limit(file_name)
+        return limit is not None and len(self.messages.get(file_name, ())) > limit
+
+    def get_error_limit(self, file_name):
+        """
+        Returns the maximum number of messages kept for a file, or None if
+        there is no limit.
+
+        :param file_name:
+        :return: int or None
+        """
+        return self._error_limits.get(file_name, self.max_errors_per_file)
+
+    @contextmanager
+    def _error_limit(self, file_name, max_errors):
+        """
+        Limits the number of messages of a file to `max_errors` while it is
+        validated, e.g. to what is left of the limit for a submission,
+        instead of `max_errors_per_file`.
+
+        :param max_errors: int, or None to keep the usual limit.
+        """
+        if max_errors is None or file_name in self._error_limits:
+            yield
+            return
+        self._error_limits[file_name] = max_errors
+        try:
+            yield
+        finally:
+            del self._error_limits[file_name]
+
+    def get_messages(self, file_name=None, expand=False):
         """
         Return messages for a file (if file_name provided).
         If file_name is none, returns all messages as a dict.
 
         :param file_name:
+        :param expand: whether to give the messages merged by
+            `aggregate_errors` instead of the merged messages.
         :return: array if file_name is provided, dict otherwise.
         """
         if file_name is None:
+            if expand:
+                return {file: _expand_messages(messages) for file, messages in self.messages.items()}
             return self.messages
 
         elif file_name in self.messages:
+            if expand:
+                return _expand_messages(self.messages[file_name])
             return self.messages[file_name]
 
         else:
@@ -179,25 +859,90 @@ class Validator(object):
             message += f" (expected: {ve.schema})"
 
         self.add_validation_message(ValidationMessage(file=file_path,
-                                                      message=message))
+                                                      message=message,
+                                                      path=tuple(ve.absolute_path)))
 
     def add_validation_message(self, message):
         """
-        Adds a message to the messages dict.
+        Adds a message to the messages dict. Once a file has
+        `max_errors_per_file` messages, the next is replaced by a message
+        saying that the file wasn't checked any further, and the rest are
+        dropped.
 
         :param message:
         """
         if message.file not in self.messages:
             self.messages[message.file] = []
 
-        self.messages[message.file].append(message)
+        messages = self.messages[message.file]
+        limit = self.get_error_limit(message.file)
+        if limit is not None and len(messages) >= limit:
+            if len(messages) == limit:
+                if message.file in self._error_limits:
+                    text = f"Too many errors in the submission: stopped checking the file after {limit} errors."
+                else:
+                    text = f"Too many errors: stopped checking the file after {limit} errors."
+                messages.append(ValidationMessage(file=message.file, message=text))
+            return
+
+        messages.append(message)
 
-    def print_errors(self, file_name):
+    def aggregate_messages(self, file_path):
+        """
+        Merges the messages of a file which only differ in an index, such as
+        the index of a value, into one message giving the ranges of the index
+        (see `hepdata_validator.aggregation`), if `aggregate_errors` is set.
+        Called once the file has been checked, before its messages are
+        located, so that each merged message is located once.
+        """
+        if not self.aggregate_errors or file_path not in self.messages:
+            return
+
+        # Imported here as it is only needed for files with errors
+        from .aggregation import aggregate_messages
+        self.messages[file_path] = aggregate_messages(self.messages[file_path])
+
+    def locate_messages(self, file_path, source_path=None):
+        """
+        Adds the line and column of the messages of a file which have a path
+        in the document, by parsing the file again (see
+        `hepdata_validator.locations`). This is only done once a file has
+        errors, so that valid files are parsed once, and not at all if
+        `locate_errors` isn't set. Files which can't be parsed as YAML (or
+        JSON, which is parsed as YAML) are left without locations.
+
+        :param file_path: key of the messages.
+        :param source_path: path of the file the data was loaded from, if not
+            `file_path`.
+        """
+        messages = [message for message in self.get_messages(file_path)
+                    if message.path is not None and message.line is None]
+        if not self.locate_errors or not messages:
+            return
+
+        # Imported here as it is only needed for files with errors
+        from .locations import find_locations
+        paths = {(message.document_index, message.path) for message in messages}
+        try:
+            with open_document(source_path or file_path) as stream:
+                locations = find_locations(stream, paths, get_yaml_backend().loader or YamlLoader)
+        except (OSError, ValueError, yaml.YAMLError):
+            return
+
+        for message in messages:
+            location = locations.get((message.document_index, message.path))
+            if location:
+                message.line, message.column = location
+
+    def print_errors(self, file_name, show_locations=False):
         """
         Prints the errors observed for a file.
+
+        :param show_locations: whether to start each message with its line
+            and column in the file, if known.
         """
         for error in self.get_messages(file_name):
-            print('\t', error.__unicode__())
+            print('\t', error.__unicode__(show_location=show_locations))
 
 
 class ValidationMessage(object):
@@ -205,15 +950,54 @@ class ValidationMessage(object):
     An object to encapsulate information about an error including
     the file the error originated in, the error level, and the
     message itself.
+
+    :attr path: path in the document of the data the message is about, as a
+        tuple of keys and indices, or None.
+    :attr document_index: index in the file of the document.
+    :attr line: line of the data in the file, counted from 1, if located
+        (see `Validator.locate_messages`).
+    :attr column: column of the data in the file, counted from 1.
+    :attr aggregated: `hepdata_validator.aggregation.AggregatedMessages` of
+        the messages merged into this one, or None.
     """
     file = ''
     level = ''
     message = ''
 
-    def __init__(self, file='', level='error', message=''):
+    def __init__(self, file='', level='error', message='', path=None, document_index=0,
+                 line=None, column=None, aggregated=None):
         self.file = file
         self.level = level
         self.message = message
+        self.path = path
+        self.document_index = document_index
+        self.line = line
+        self.column = column
+        self.aggregated = aggregated
 
-    def __unicode__(self):
+    def expand(self):
+        """
+        Returns the messages which were merged into this one, of which only
+        the first has the line and column, or a list of this message if it
+        isn't a merged message.
+        """
+        if self.aggregated is None:
+            return [self]
+
+        messages = [
+            ValidationMessage(file=self.file, level=self.level, message=self.aggregated.get_text(value),
+                              path=None if self.path is None else self.aggregated.get_path(value),
+                              document_index=self.document_index)
+            for value in self.aggregated.values
+        ]
+        messages[0].line, messages[0].column = self.line, self.column
+        return messages
+
+    def __unicode__(self, show_location=False):
+        if show_location and self.line is not None:
+            return f'{self.level} - line {self.line}, column {self.column}: {self.message}'
         return self.level + ' - ' + self.message
+
+
+def _expand_messages(messages):
+    return [expanded for message in messages for expanded in message.expand()]
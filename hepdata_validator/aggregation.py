@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of HEPData.
+# Copyright (C) 2020 CERN.
+#
+# HEPData is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# HEPData is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with HEPData; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+"""
+Aggregation of repeated messages.
+
+A problem with many values of a table, such as uncertainties which are all
+zero, gives a message for each value which only differs in the index of the
+value. These messages are merged into one message giving the ranges of the
+indices and the number of messages, e.g. "Uncertainties should not all be
+zero in 'dependent_variables.values[12-4011].errors' (4000 occurrences)",
+which keeps the indices to give the messages again on request (see
+`ValidationMessage.expand`).
+"""
+
+import re
+from array import array
+
+# Fewer messages than this which only differ in one index are left as they are
+MIN_AGGREGATED_COUNT = 3
+
+# Indices in the locations of messages, e.g. 'values[12]', without leading
+# zeros so that the text can be rebuilt from the numbers
+_INDEX_PATTERN = re.compile(r'\[(0|[1-9][0-9]*)\]')
+
+
+class AggregatedMessages(object):
+    """
+    The messages merged into one message, kept as the parts of their text
+    around its indices, the indices of the first message and the value of
+    the index which differs for each message.
+    """
+
+    def __init__(self, parts, indices, position, path, path_position):
+        """
+        :param parts: tuple of the parts of the text around the indices.
+        :param indices: tuple of the indices in the text of the first message.
+        :param position: position in `indices` of the index which differs.
+        :param path: path of the first message, or None.
+        :param path_position: position in `path` of the index which differs,
+            or None if the messages have the same path.
+        """
+        self.parts = parts
+        self.indices = indices
+        self.position = position
+        self.path = path
+        self.path_position = path_position
+        self.values = array('q')
+
+    def __len__(self):
+        return len(self.values)
+
+    def get_text(self, value):
+        """
+        Returns the text of the message with the given value of the index.
+        """
+        return self._format(str(value))
+
+    def get_path(self, value):
+        """
+        Returns the path of the message with the given value of the index.
+        """
+        if self.path_position is None:
+            return self.path
+        return self.path[:self.path_position] + (value,) + self.path[self.path_position + 1:]
+
+    def get_summary(self):
+        """
+        Returns the text of the merged message, with the ranges of the index
+        and the number of messages.
+        """
+        return f'{self._format(_format_ranges(self.values))} ({len(self)} occurrences)'
+
+    def _format(self, index_text):
+        indices = [str(index) for index in self.indices]
+        indices[self.position] = index_text
+        text = self.parts[0]
+        for index, part in zip(indices, self.parts[1:]):
+            text += f'[{index}]{part}'
+        return text
+
+
+def aggregate_messages(messages, min_count=MIN_AGGREGATED_COUNT):
+    """
+    Merges the messages which only differ in one index of their text, and
+    the same index of their path, if there are at least `min_count` of them.
+
+    :param messages: list of the `ValidationMessage` of a file.
+    :param min_count: minimum number of messages to merge.
+    :return: list of the messages, with the messages of each group replaced
+        by the merged message where the first of them was.
+    """
+    from hepdata_validator import ValidationMessage
+
+    # Messages with the same level, document, text around the indices and
+    # path apart from the indices
+    groups = {}
+    for message in messages:
+        if message.aggregated is not None:
+            continue
+        split_text = _INDEX_PATTERN.split(message.message)
+        if len(split_text) == 1:
+            continue
+        parts = tuple(split_text[0::2])
+        indices = tuple(int(index) for index in split_text[1::2])
+        shape = None
+        if message.path is not None:
+            shape = tuple(None if type(part) is int else part for part in message.path)
+        key = (message.level, message.document_index, parts, shape)
+        groups.setdefault(key, []).append((message, indices))
+
+    # Merged messages by the id of the first message of each group, and the
+    # ids of the other messages of the groups
+    merged = {}
+    removed = set()
+    for (_, _, parts, _), group in groups.items():
+        if len(group) < min_count:
+            continue
+        position, path_position, subgroups = _split_group(group)
+        for subgroup in subgroups:
+            if len(subgroup) < min_count:
+                continue
+            first, indices = subgroup[0]
+            aggregated = AggregatedMessages(parts, indices, position, first.path, path_position)
+            aggregated.values.extend(indices[position] for _, indices in subgroup)
+            merged[id(first)] = ValidationMessage(
+                file=first.file, level=first.level, message=aggregated.get_summary(),
+                path=first.path, document_index=first.document_index,
+                line=first.line, column=first.column, aggregated=aggregated
+            )
+            removed.update(id(message) for message, _ in subgroup[1:])
+
+    if not merged:
+        return messages
+    return [merged.get(id(message), message) for message in messages
+            if id(message) not in removed]
+
+
+def _split_group(group):
+    """
+    Splits messages with the same text around their indices into groups
+    which only differ in the last index which isn't the same for all of
+    them.
+
+    :param group: list of tuples of each message and the indices in its text.
+    :return: tuple of the position of the index in the text, its position in
+        the paths of the messages (or None if it isn't in them) and the list
+        of groups, or an empty list if no index differs.
+    """
+    first_message, first_indices = group[0]
+    varying = [i for i in range(len(first_indices))
+               if any(indices[i] != first_indices[i] for _, indices in group)]
+    if not varying:
+        return None, None, []
+    position = varying[-1]
+
+    path_position = None
+    if first_message.path is not None:
+        for k in reversed(range(len(first_message.path))):
+            if type(first_message.path[k]) is int and \
+                    all(message.path[k] == indices[position] for message, indices in group):
+                path_position = k
+                break
+
+    subgroups = {}
+    for message, indices in group:
+        path = message.path
+        if path_position is not None:
+            path = path[:path_position] + path[path_position + 1:]
+        key = (indices[:position] + indices[position + 1:], path)
+        subgroups.setdefault(key, []).append((message, indices))
+    return position, path_position, list(subgroups.values())
+
+
+def _format_ranges(values):
+    """
+    Returns the sorted values as ranges, e.g. '1-5,8,10-12'.
+    """
+    ranges = []
+    start = end = None
+    for value in sorted(set(values)):
+        if end is not None and value == end + 1:
+            end = value
+            continue
+        if start is not None:
+            ranges.append(str(start) if start == end else f'{start}-{end}')
+        start = end = value
+    if start is not None:
+        ranges.append(str(start) if start == end else f'{start}-{end}')
+    return ','.join(ranges)
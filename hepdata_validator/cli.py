@@ -3,19 +3,37 @@ import sys
 import click
 
 from .full_submission_validator import FullSubmissionValidator
+from .yaml_backend import SlowYamlBackendError, get_yaml_backend_names, set_yaml_backend
 
 
 @click.command()
 @click.option('--directory', '-d', default='.', help='Directory to check (defaults to current working directory)')
 @click.option('--file', '-f', default=None, help='Single .yaml or .yaml.gz file (but not submission.yaml or a YAML data file) to check - see https://hepdata-submission.readthedocs.io/en/latest/single_yaml.html. (Overrides directory)')
 @click.option('--archive', '-a', default=None, help='Archive file (.zip, .tar, .tar.gz, .tgz) to check. (Overrides directory and file)')
-def validate(directory, file, archive):  # pragma: no cover
+@click.option('--yaml-backend', type=click.Choice(get_yaml_backend_names()), default=None, help='YAML parser to use (defaults to libyaml if available, otherwise python)')
+@click.option('--strict-yaml', is_flag=True, help='Fail rather than use a slow pure-Python YAML parser')
+@click.option('--show-yaml-backend', is_flag=True, help='Print which YAML parser is used')
+@click.option('--parse-cache', default=None, help='Directory of a cache of parsed files, reused by later runs')
+@click.option('--max-errors-per-file', type=int, default=None, help='Stop checking a file after this many errors')
+@click.option('--max-errors-per-submission', type=int, default=None, help='Stop checking data files after this many errors in the submission')
+@click.option('--aggregate-errors', is_flag=True, help='Merge errors which only differ in an index into one with the ranges of the index')
+def validate(directory, file, archive, yaml_backend, strict_yaml, show_yaml_backend, parse_cache,
+             max_errors_per_file, max_errors_per_submission, aggregate_errors):  # pragma: no cover
     """
     Offline validation of submission.yaml and YAML data files.
     Can check either a directory, an archive file, or the single YAML file format.
     """
+    try:
+        backend = set_yaml_backend(yaml_backend, strict=strict_yaml)
+    except SlowYamlBackendError as e:
+        raise click.ClickException(str(e))
+    if show_yaml_backend:
+        click.echo(f"Using YAML backend {backend.name} ({backend.description}).")
+
     file_or_dir_checked = archive if archive else (file if file else directory)
-    validator = FullSubmissionValidator()
+    validator = FullSubmissionValidator(parse_cache=parse_cache, max_errors_per_file=max_errors_per_file,
+                                        max_errors_per_submission=max_errors_per_submission,
+                                        aggregate_errors=aggregate_errors)
     is_valid = validator.validate(directory, file, archive)
     if is_valid:
         click.echo(f"{file_or_dir_checked} is valid.")
@@ -24,7 +42,7 @@ def validate(directory, file, archive):  # pragma: no cover
 
     validator.print_valid_files()
     for f in validator.messages.keys():
-        validator.print_errors(f)
+        validator.print_errors(f, show_locations=True)
 
     if not is_valid:
         sys.exit(1)
@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of HEPData.
+# Copyright (C) 2020 CERN.
+#
+# HEPData is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# HEPData is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with HEPData; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+"""
+Compact storage of the values of data tables.
+
+The values of a variable are stored in typed arrays, one per field, rather
+than as a dict per value. Values which don't fit the arrays (e.g. with
+strings such as '10%' or '1-2', or unexpected keys) are kept as they are.
+"""
+
+import math
+from array import array
+from collections.abc import Sequence
+
+from . import vectorized
+from .streaming import stream_table
+
+# Flags of a value
+HAS_VALUE = 0x01
+HAS_LOW = 0x02
+HAS_HIGH = 0x04
+VALUE_IS_INT = 0x08
+LOW_IS_INT = 0x10
+HIGH_IS_INT = 0x20
+HAS_ERRORS = 0x40
+IRREGULAR = 0x80
+
+# Flags of an uncertainty
+ASYMERROR = 0x01
+PLUS_IS_INT = 0x02
+MINUS_IS_INT = 0x04
+
+_FIELDS = (('value', HAS_VALUE, VALUE_IS_INT),
+           ('low', HAS_LOW, LOW_IS_INT),
+           ('high', HAS_HIGH, HIGH_IS_INT))
+
+# Integers up to this size are exactly represented by a float
+_MAX_EXACT_INT = 2 ** 53
+
+
+def _to_float(x):
+    """
+    :return: tuple of x as a float and whether it is an int, or None if x
+        isn't a number which can be stored exactly as a float.
+    """
+    if type(x) is float:
+        return x, False
+    if type(x) is int and -_MAX_EXACT_INT <= x <= _MAX_EXACT_INT:
+        return float(x), True
+    return None
+
+
+def _from_float(x, is_int):
+    return int(x) if is_int else x
+
+
+class CompactValues(Sequence):
+    """
+    The values of an independent or dependent variable, stored in arrays.
+
+    Indexing or iterating builds the dict of each value, equal to the one
+    which was added.
+
+    :attr irregular_values: values which aren't stored in the arrays, keyed
+        by index.
+    """
+
+    def __init__(self, values=()):
+        self.flags = array('B')
+        self.value = array('d')
+        self.low = array('d')
+        self.high = array('d')
+        # Uncertainties of value j are at error_offsets[j]:error_offsets[j + 1]
+        self.error_offsets = array('q', [0])
+        self.error_flags = array('B')
+        self.error_plus = array('d')
+        self.error_minus = array('d')
+        self.error_labels = array('l')
+        self.labels = []
+        self._label_indices = {}
+        self.irregular_values = {}
+        for v in values:
+            self.append(v)
+
+    def append(self, v):
+        """
+        Adds a value, as a dict.
+        """
+        row = self._pack(v)
+        if row is None:
+            self.irregular_values[len(self.flags)] = v
+            self.flags.append(IRREGULAR)
+            self.value.append(0.0)
+            self.low.append(0.0)
+            self.high.append(0.0)
+            self.error_offsets.append(self.error_offsets[-1])
+            return
+
+        flags, fields, errors = row
+        self.flags.append(flags)
+        self.value.append(fields[0])
+        self.low.append(fields[1])
+        self.high.append(fields[2])
+        for error_flags, plus, minus, label in errors:
+            self.error_flags.append(error_flags)
+            self.error_plus.append(plus)
+            self.error_minus.append(minus)
+            self.error_labels.append(self._get_label_index(label))
+        self.error_offsets.append(len(self.error_flags))
+
+    def _get_label_index(self, label):
+        if label is None:
+            return -1
+        index = self._label_indices.get(label)
+        if index is None:
+            index = self._label_indices[label] = len(self.labels)
+            self.labels.append(label)
+        return index
+
+    def _pack(self, v):
+        """
+        :return: tuple of the flags, fields and uncertainties of a value, or
+            None if it can't be stored in the arrays.
+        """
+        if type(v) is not dict:
+            return None
+        flags = 0
+        fields = [0.0, 0.0, 0.0]
+        for k, (name, has_flag, int_flag) in enumerate(_FIELDS):
+            if name in v:
+                number = _to_float(v[name])
+                if number is None:
+                    return None
+                fields[k] = number[0]
+                flags |= has_flag | (int_flag if number[1] else 0)
+
+        errors = []
+        if 'errors' in v:
+            if type(v['errors']) is not list:
+                return None
+            flags |= HAS_ERRORS
+            for error in v['errors']:
+                packed_error = self._pack_error(error)
+                if packed_error is None:
+                    return None
+                errors.append(packed_error)
+
+        if len(v) != bin(flags & (HAS_VALUE | HAS_LOW | HAS_HIGH | HAS_ERRORS)).count('1'):
+            # Unexpected keys
+            return None
+        return flags, fields, errors
+
+    def _pack_error(self, error):
+        if type(error) is not dict:
+            return None
+        label = error.get('label')
+        if 'label' in error and type(label) is not str:
+            return None
+        if len(error) != 1 + ('label' in error):
+            return None
+
+        if 'symerror' in error:
+            number = _to_float(error['symerror'])
+            if number is None:
+                return None
+            error_flags = (PLUS_IS_INT | MINUS_IS_INT) if number[1] else 0
+            return error_flags, number[0], number[0], label
+        elif 'asymerror' in error:
+            asymerror = error['asymerror']
+            if type(asymerror) is not dict or set(asymerror) != {'plus', 'minus'}:
+                return None
+            plus = _to_float(asymerror['plus'])
+            minus = _to_float(asymerror['minus'])
+            if plus is None or minus is None:
+                return None
+            error_flags = ASYMERROR | (PLUS_IS_INT if plus[1] else 0) | (MINUS_IS_INT if minus[1] else 0)
+            return error_flags, plus[0], minus[0], label
+        return None
+
+    def __len__(self):
+        return len(self.flags)
+
+    def __getitem__(self, j):
+        if isinstance(j, slice):
+            return [self[k] for k in range(*j.indices(len(self)))]
+        if j < 0:
+            j += len(self)
+        flags = self.flags[j]
+        if flags & IRREGULAR:
+            return self.irregular_values[j]
+
+        v = {}
+        for name, has_flag, int_flag in _FIELDS:
+            if flags & has_flag:
+                v[name] = _from_float(getattr(self, name)[j], flags & int_flag)
+        if flags & HAS_ERRORS:
+            v['errors'] = [self._get_error(e)
+                           for e in range(self.error_offsets[j], self.error_offsets[j + 1])]
+        return v
+
+    def __eq__(self, other):
+        if not isinstance(other, (list, CompactValues)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"<CompactValues of {len(self)} values>"
+
+    def _get_error(self, e):
+        error_flags = self.error_flags[e]
+        plus = _from_float(self.error_plus[e], error_flags & PLUS_IS_INT)
+        if error_flags & ASYMERROR:
+            minus = _from_float(self.error_minus[e], error_flags & MINUS_IS_INT)
+            error = {'asymerror': {'plus': plus, 'minus': minus}}
+        else:
+            error = {'symerror': plus}
+        label_index = self.error_labels[e]
+        if label_index >= 0:
+            error['label'] = self.labels[label_index]
+        return error
+
+    def zero_error_indices(self):
+        """
+        Returns the indices of the values stored in the arrays which have
+        uncertainties that are all zero.
+        """
+        if vectorized.can_vectorize(len(self.flags)):
+            return vectorized.zero_error_indices(self)
+        plus = self.error_plus
+        minus = self.error_minus
+        offsets = self.error_offsets
+        indices = []
+        for j in range(len(self.flags)):
+            start, end = offsets[j], offsets[j + 1]
+            if start < end and all(plus[e] == 0 and minus[e] == 0 for e in range(start, end)):
+                indices.append(j)
+        return indices
+
+    def infinite_bin_indices(self):
+        """
+        Returns the indices of the values stored in the arrays which have a
+        'low' and 'high', at least one of which is infinite.
+        """
+        if vectorized.can_vectorize(len(self.flags)):
+            return vectorized.infinite_bin_indices(self)
+        has_bin = HAS_LOW | HAS_HIGH
+        return [j for j, flags in enumerate(self.flags)
+                if flags & has_bin == has_bin and not flags & IRREGULAR
+                and (math.isinf(self.low[j]) or math.isinf(self.high[j]))]
+
+    def nbytes(self):
+        """
+        :return: approximate size of the arrays in bytes, not counting the
+            irregular values and labels.
+        """
+        arrays = (self.flags, self.value, self.low, self.high, self.error_offsets,
+                  self.error_flags, self.error_plus, self.error_minus, self.error_labels)
+        return sum(a.itemsize * len(a) for a in arrays)
+
+
+def load_compact_table(stream, loader_cls, value_callback=None):
+    """
+    Parses a YAML data table, storing the values of each variable in a
+    `CompactValues` as they are parsed (see `stream_table`).
+
+    :param stream: file object or str.
+    :param loader_cls: loader class, e.g. `yaml.CSafeLoader`.
+    :param value_callback: also called for each value, as in `stream_table`.
+    :return: `hepdata_validator.streaming.StreamedTable` whose document has
+        a `CompactValues` for each streamed list of values, or None if the
+        stream has no document.
+    :raise yaml.YAMLError: if the stream can't be parsed.
+    """
+    columns = {}
+
+    def add_value(key, i, j, value):
+        if value_callback is not None:
+            value_callback(key, i, j, value)
+        if (key, i) not in columns:
+            columns[(key, i)] = CompactValues()
+        columns[(key, i)].append(value)
+
+    table = stream_table(stream, loader_cls, add_value)
+    if table is not None:
+        for key, i in table.value_counts:
+            table.document[key][i]['values'] = columns.get((key, i), CompactValues())
+    return table
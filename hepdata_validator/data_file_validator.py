@@ -22,15 +22,16 @@
 # waive the privileges and immunities granted to it by virtue of its status
 # as an Intergovernmental Organization or submit itself to any jurisdiction.
 
-import json
 import math
 import os
 import re
 
-from packaging import version as packaging_version
-import yaml
-
-from hepdata_validator import Validator, ValidationMessage, YamlLoader
+from hepdata_validator import Validator, ValidationMessage, YamlLoader, get_subschema_validators, \
+    open_document
+from hepdata_validator.compact import CompactValues, load_compact_table
+from hepdata_validator.schema_cache import DEFAULT_MAX_ENTRIES, SchemaCache
+from hepdata_validator.streaming import VARIABLES_KEYS, stream_table
+from hepdata_validator.yaml_backend import get_yaml_backend
 from jsonschema import ValidationError
 from jsonschema.exceptions import by_relevance
 
@@ -47,7 +48,24 @@ class DataFileValidator(Validator):
     def __init__(self, *args, **kwargs):
         super(DataFileValidator, self).__init__(*args, **kwargs)
         self.default_schema_file = self._get_schema_filepath(self.schema_name)
+        self._data_schema = self.schema_registry.get_schema(self.schema_name)
+        # Custom schemas loaded with load_custom_schema, keyed by type, which
+        # are all kept as they may have been loaded from any path
         self.custom_data_schemas = {}
+        # Custom schemas of the schema folder loaded by validate for the type
+        # of a file. The least recently used are dropped when there are more
+        # than max_custom_schemas, and are loaded again if they are needed.
+        max_custom_schemas = kwargs.get('max_custom_schemas', DEFAULT_MAX_ENTRIES)
+        self._default_custom_data_schemas = SchemaCache(max_entries=max_custom_schemas)
+        # Content hashes of the custom schemas, stored alongside the schema
+        # object they were computed from
+        self._custom_data_schema_keys = SchemaCache(max_entries=max_custom_schemas)
+        # Whether to check the values of data files as they are parsed
+        # instead of loading whole files (see validate_streaming)
+        self.streaming = kwargs.get('streaming', False)
+        # Whether to load the values of data files into compact arrays (see
+        # hepdata_validator.compact) to run the checks on
+        self.compact_values = kwargs.get('compact_values', False)
 
     def load_custom_schema(self, type, schema_file_path=None):
         """
@@ -56,23 +74,39 @@ class DataFileValidator(Validator):
         :param type: e.g. histfactory
         :return:
         """
-        try:
-            if type in self.custom_data_schemas:
-                return self.custom_data_schemas[type]
+        if type in self.custom_data_schemas:
+            return self.custom_data_schemas[type]
+        schema = self._load_custom_schema(type, schema_file_path)
+        self.custom_data_schemas[type] = schema
+        return schema
 
+    def _get_custom_data_schema(self, type):
+        """
+        Returns the custom schema of a type for `validate`, loading the
+        schema of the type from the schema folder if it hasn't been loaded
+        with `load_custom_schema`.
+        """
+        if type in self.custom_data_schemas:
+            return self.custom_data_schemas[type]
+        schema = self._default_custom_data_schemas.get(type)
+        if schema is None:
+            schema = self._load_custom_schema(type)
+            self._default_custom_data_schemas[type] = schema
+        return schema
+
+    def _load_custom_schema(self, type, schema_file_path=None):
+        try:
             if schema_file_path:
                 _schema_file = schema_file_path
             else:
-                _schema_file = os.path.join(self.base_path,
-                                            self.schema_folder,
-                                            self.schema_version_string,
-                                            "{0}_schema.json".format(type))
+                _schema_file = self.schema_registry.get_custom_schema_filepath(type)
 
-            with open(_schema_file, 'r') as f:
-                custom_data_schema = json.load(f)
-                self.custom_data_schemas[type] = custom_data_schema
+            # The parsed schema is shared with other validators using the
+            # same schema registry
+            custom_schema = self.schema_registry.load_custom_schema(_schema_file)
+            self._custom_data_schema_keys[type] = (custom_schema.schema, custom_schema.key)
 
-            return custom_data_schema
+            return custom_schema.schema
         except Exception:
             raise UnsupportedDataSchemaException(
                 message="There is no schema defined for the '{0}' data type.".format(type))
@@ -84,28 +118,48 @@ class DataFileValidator(Validator):
         :param file_path: path to file to be loaded.
         :param file_type: file data type (optional).
         :param data: pre loaded YAML object (optional).
+        :param max_errors: maximum number of messages for the file, such as
+            what is left of the limit for a submission, instead of
+            `max_errors_per_file` (optional).
         :return: Bool to indicate the validity of the file.
         """
 
         file_path = kwargs.pop("file_path", None)
         file_type = kwargs.pop("file_type", None)
         data = kwargs.pop("data", None)
+        max_errors = kwargs.pop("max_errors", None)
 
         if file_path is None:
             raise LookupError("file_path argument must be supplied")
 
+        with self._error_limit(file_path, max_errors):
+            return self._validate(file_path, file_type, data)
+
+    def _validate(self, file_path, file_type, data):
+
+        if data is None and (self.streaming or self.compact_values) and not file_type:
+            try:
+                return self.validate_streaming(file_path)
+            except Exception as e:
+                self.add_validation_message(ValidationMessage(
+                    file=file_path,
+                    message='There was a problem parsing the file.\n' + e.__str__(),
+                ))
+                return False
+
+        # Errors are only located in files loaded here, which are known to
+        # hold the data
+        is_loaded = data is None
         if data is None:
 
             try:
-                # The yaml package support both JSON and YAML
-                with open(file_path, 'r') as df:
-                    data = yaml.load(df, Loader=YamlLoader)
-                    if data is None:
-                        self.add_validation_message(ValidationMessage(
-                            file=file_path,
-                            message='No data found in file.'
-                        ))
-                        return False
+                data = self._load_file(file_path)
+                if data is None:
+                    self.add_validation_message(ValidationMessage(
+                        file=file_path,
+                        message='No data found in file.'
+                    ))
+                    return False
             except Exception as e:
                 self.add_validation_message(ValidationMessage(
                     file=file_path,
@@ -116,40 +170,30 @@ class DataFileValidator(Validator):
         try:
             is_custom_schema = False
             sort_fn = None
+            custom_schema = None
 
-            if file_type:
-                is_custom_schema = True
-                data_schema = self.load_custom_schema(file_type)
-            elif 'type' in data:
+            if file_type or 'type' in data:
                 is_custom_schema = True
-                data_schema = self.load_custom_schema(data['type'])
+                custom_type = file_type if file_type else data['type']
+                data_schema = self._get_custom_data_schema(custom_type)
+                schema_key = self._get_custom_schema_key(custom_type, data_schema)
+                custom_schema = self.schema_registry.get_custom_schema(data_schema, schema_key)
             else:
-                with open(self.default_schema_file, 'r') as f:
-                    data_schema = json.load(f)
+                data_schema = self._data_schema
+                schema_key = self.default_schema_file
 
                 # Make 'oneOf' errors more relevant to give better error
                 # messages about 'low' without 'high' etc
                 sort_fn = by_relevance(strong='oneOf', weak=[])
 
-            self._validate_json_against_schema(file_path, data, data_schema, sort_fn)
+            self._validate_json_against_schema(file_path, data, data_schema, sort_fn,
+                                               schema_key=schema_key,
+                                               custom_schema=custom_schema)
 
             if not is_custom_schema and \
-               self.schema_version.major > 0:
-                try:
-                    self.check_error_values(file_path, data)
-                    self.check_length_values(file_path, data)
-                    if self.schema_version >= packaging_version.parse("1.1.0"):
-                        self.check_independent_variable_values(file_path, data)
-                except Exception:
-                    # If the file did not validate against the schema, we
-                    # ignore any exceptions as they're likely to be due to
-                    # missing fields etc.
-                    # Otherwise we return error as unexpected.
-                    if not self.has_errors(file_path):
-                        self.add_validation_message(ValidationMessage(
-                            file=file_path,
-                            message=f"An unexpected error occurred whilst validating {file_path}. Please contact info@hepdata.net if this issue recurs.",
-                        ))  #pragma: no cover
+               self.schema_registry.has_semantic_checks and \
+               not self.error_limit_reached(file_path):
+                self._check_semantics(file_path, data)
 
         except UnsupportedDataSchemaException as ex:
             self.add_validation_message(ValidationMessage(
@@ -157,11 +201,104 @@ class DataFileValidator(Validator):
                 message=ex.message,
             ))
 
+        self.aggregate_messages(file_path)
+        if is_loaded:
+            self.locate_messages(file_path)
+
         if self.has_errors(file_path):
             return False
         else:
             return True
 
+    def _check_semantics(self, file_path, data):
+        """
+        Runs the checks which aren't part of the schema.
+        """
+        try:
+            self.check_error_values(file_path, data)
+            self.check_length_values(file_path, data)
+            if self.schema_registry.has_v1_1_features:
+                self.check_independent_variable_values(file_path, data)
+        except Exception:
+            # If the file did not validate against the schema, we
+            # ignore any exceptions as they're likely to be due to
+            # missing fields etc.
+            # Otherwise we return error as unexpected.
+            if not self.has_errors(file_path):
+                self.add_validation_message(ValidationMessage(
+                    file=file_path,
+                    message=f"An unexpected error occurred whilst validating {file_path}. Please contact info@hepdata.net if this issue recurs.",
+                ))  #pragma: no cover
+
+    def validate_streaming(self, file_path, max_errors=None):
+        """
+        Validates a data file while it is parsed, checking the values of the
+        variables one at a time instead of loading the whole file, so that
+        the memory used doesn't depend on the number of rows. With the
+        `compact_values` option, the values are instead kept in compact
+        arrays, and the checks other than the schema are run on those once
+        the file has been parsed.
+
+        The errors are the same as those of `validate`, but errors in the
+        values are listed after the other errors found by the schema. Files
+        using a custom schema, or not laid out as a data table, are loaded
+        whole and passed to `validate`.
+
+        :param file_path: path to file to be validated.
+        :param max_errors: maximum number of messages for the file, instead
+            of `max_errors_per_file` (see `validate`).
+        :return: Bool to indicate the validity of the file.
+        :raise OSError: if the file can't be read.
+        :raise yaml.YAMLError: if the file can't be parsed.
+        """
+        with self._error_limit(file_path, max_errors):
+            return self._validate_streaming(file_path)
+
+    def _validate_streaming(self, file_path):
+        checker = _StreamingChecker(self, file_path)
+        table = None
+
+        if checker.can_stream:
+            loader_cls = get_yaml_backend().loader or YamlLoader
+            with open_document(file_path) as df:
+                if self.compact_values:
+                    table = load_compact_table(df, loader_cls, checker.check_value)
+                else:
+                    table = stream_table(df, loader_cls, checker.check_value,
+                                         checker.check_variable)
+
+            if table is not None and table.is_complete and 'type' not in table.document:
+                checker.finish(table)
+                self.aggregate_messages(file_path)
+                self.locate_messages(file_path)
+                return not self.has_errors(file_path)
+
+        data = None
+        if table is not None or not checker.can_stream:
+            data = self._load_file(file_path)
+
+        if data is None:
+            self.add_validation_message(ValidationMessage(
+                file=file_path,
+                message='No data found in file.'
+            ))
+            return False
+
+        is_valid = self.validate(file_path=file_path, data=data)
+        self.locate_messages(file_path)
+        return is_valid
+
+    def _get_custom_schema_key(self, type, schema):
+        """
+        Returns the content hash of a loaded custom schema, or None if the
+        schema has been replaced since it was loaded (in which case the hash
+        is recomputed when the schema is compiled).
+        """
+        schema_and_key = self._custom_data_schema_keys.get(type)
+        if schema_and_key and schema_and_key[0] is schema:
+            return schema_and_key[1]
+        return None
+
     def check_independent_variable_values(self, file_path, data_item):
         """
         Check that 'independent_variables' values are not a range like 1.7-4.7.
@@ -170,118 +307,196 @@ class DataFileValidator(Validator):
         :return: raise ValidationError if not numeric
         """
         for i, var in enumerate(data_item['independent_variables']):
-            overflows = []
-            underflows = []
-            for j, v in enumerate(var['values']):
-                if 'value' in v and isinstance(v['value'], str) and '-' in v['value']:
-                    m = re.match(r'^[+-]?\d+(\.\d*)?([eE][+-]?\d+)?\s*-\s*[+-]?\d+(\.\d*)?([eE][+-]?\d+)?$', v['value'])
-                    if m:
-                        error = ValidationError(
-                            "independent_variable 'value' must not be a string range (use 'low' and 'high' to represent a range): '%s'" % v['value'],
-                            path=['independent_variables', i, 'values', j, 'value'],
-                            instance=data_item['independent_variables'],
-                            schema={"type": "number or string (not a range)"}
-                        )
-                        self.add_validation_error(file_path, error)
-                if 'low' in v and 'high' in v:
-                    lo = None
-                    hi = None
-                    try:
-                        lo = float(v['low'])
-                        hi = float(v['high'])
-                    except:
-                        continue
-                    if math.isinf(lo) and math.isinf(hi):
-                        error = ValidationError(
-                            "independent_variable 'low' and 'high' must not both have infinite values: '%s' and '%s'" % (v['low'], v['high']),
-                            path=['independent_variables', i, 'values', j],
-                            instance=data_item['independent_variables']
-                        )
-                        self.add_validation_error(file_path, error)
-                    elif math.isinf(lo):
-                        of_id = "(%s, %.4e)" % (str(v['low']), hi)
-                        if of_id not in underflows:
-                            underflows.append(of_id)
-                    elif math.isinf(hi):
-                        of_id = "(%.4e, %s)" % (lo, str(v['high']))
-                        if of_id not in overflows:
-                            overflows.append(of_id)
-            if len(underflows) > 1:
+            # Dicts of the bins (as keys), which keep the order they were
+            # found in
+            overflows = {}
+            underflows = {}
+            j = None
+            values = var['values']
+            if isinstance(values, CompactValues):
+                # Numeric values and bins can only give errors if infinite
+                indices = set(values.irregular_values).union(values.infinite_bin_indices())
+                for k in sorted(indices):
+                    self._check_independent_variable_value(file_path, data_item, i, k, values[k],
+                                                           underflows, overflows)
+                    if self.error_limit_reached(file_path):
+                        return
+                j = len(values) - 1
+                values = ()
+            for j, v in enumerate(values):
+                # Most values are only checked quickly
+                if not _is_finite_independent_value(v):
+                    self._check_independent_variable_value(file_path, data_item, i, j, v,
+                                                           underflows, overflows)
+                    if self.error_limit_reached(file_path):
+                        return
+            self._check_independent_variable_bins(file_path, data_item, i, j,
+                                                  underflows, overflows)
+
+    def _check_independent_variable_value(self, file_path, data_item, i, j, v,
+                                          underflows, overflows):
+        """
+        Checks value j of independent variable i, adding any underflow or
+        overflow bins to the given dicts.
+        """
+        if 'value' in v and isinstance(v['value'], str) and '-' in v['value']:
+            m = re.match(r'^[+-]?\d+(\.\d*)?([eE][+-]?\d+)?\s*-\s*[+-]?\d+(\.\d*)?([eE][+-]?\d+)?$', v['value'])
+            if m:
                 error = ValidationError(
-                    "independent_variable must not have more than one underflow bin: %s" % ", ".join(underflows),
-                    path=['independent_variables', i, 'values', j],
-                    instance=data_item['independent_variables']
+                    "independent_variable 'value' must not be a string range (use 'low' and 'high' to represent a range): '%s'" % v['value'],
+                    path=['independent_variables', i, 'values', j, 'value'],
+                    instance=data_item['independent_variables'],
+                    schema={"type": "number or string (not a range)"}
                 )
                 self.add_validation_error(file_path, error)
-            if len(overflows) > 1:
+        if 'low' in v and 'high' in v:
+            lo = None
+            hi = None
+            try:
+                lo = float(v['low'])
+                hi = float(v['high'])
+            except:
+                return
+            if math.isinf(lo) and math.isinf(hi):
                 error = ValidationError(
-                    "independent_variable must not have more than one overflow bin: %s" % ", ".join(overflows),
+                    "independent_variable 'low' and 'high' must not both have infinite values: '%s' and '%s'" % (v['low'], v['high']),
                     path=['independent_variables', i, 'values', j],
                     instance=data_item['independent_variables']
                 )
                 self.add_validation_error(file_path, error)
+            elif math.isinf(lo):
+                of_id = "(%s, %.4e)" % (str(v['low']), hi)
+                underflows.setdefault(of_id)
+            elif math.isinf(hi):
+                of_id = "(%.4e, %s)" % (lo, str(v['high']))
+                overflows.setdefault(of_id)
+
+    def _check_independent_variable_bins(self, file_path, data_item, i, j,
+                                         underflows, overflows):
+        """
+        Checks that independent variable i, whose last value is j, has at
+        most one underflow and one overflow bin.
+        """
+        if len(underflows) > 1:
+            error = ValidationError(
+                "independent_variable must not have more than one underflow bin: %s" % ", ".join(underflows),
+                path=['independent_variables', i, 'values', j],
+                instance=data_item['independent_variables']
+            )
+            self.add_validation_error(file_path, error)
+        if len(overflows) > 1:
+            error = ValidationError(
+                "independent_variable must not have more than one overflow bin: %s" % ", ".join(overflows),
+                path=['independent_variables', i, 'values', j],
+                instance=data_item['independent_variables']
+            )
+            self.add_validation_error(file_path, error)
 
     def check_error_values(self, file_path, data):
         """
         Check that uncertainties are not all zero.
         Adds validation error if uncertainties are all zero.
 
+        Uncertainties with neither 'symerror' nor 'asymerror', such as the
+        characters of 'errors' given as a string, are left to the schema,
+        and the other checks still run. Before the values were checked one
+        at a time, such an uncertainty was given the values of the previous
+        uncertainty of the table, repeating its messages, or stopped the
+        checks of the file if there was none.
+
         :param data: data table in YAML format
         """
-        for dependent_variable in data['dependent_variables']:
-            for i, value in enumerate(dependent_variable['values']):
-                if 'errors' in value:
-                    zero_uncertainties = []
-                    for j, error in enumerate(value['errors']):
-                        has_asymerror = False
-                        if 'symerror' in error:
-                            error_plus = error_minus = self.convert_to_float(
-                                error['symerror'],
-                                file_path=file_path,
-                                path=['dependent_variables', 'values', i, 'errors', j, 'symerror'],
-                                instance=data['dependent_variables']
-                            )
-                        elif 'asymerror' in error:
-                            has_asymerror = True
-                            error_plus = self.convert_to_float(
-                                error['asymerror']['plus'],
-                                file_path=file_path,
-                                path=['dependent_variables', 'values', i, 'errors', j, 'asymerror', 'plus'],
-                                instance=data['dependent_variables']
-                            )
-                            error_minus = self.convert_to_float(
-                                error['asymerror']['minus'],
-                                file_path=file_path,
-                                path=['dependent_variables', 'values', i, 'errors', j, 'asymerror', 'minus'],
-                                instance=data['dependent_variables']
-                            )
-
-                        if error_plus == '' and error_minus == '':
-                            if has_asymerror:
-                                msg = "asymerror plus and minus cannot both be empty"
-                                sub_path = 'asymerror'
-                            else:
-                                msg = "symerror cannot be empty"
-                                sub_path = 'symerror'
-                            error = ValidationError(
-                                msg,
-                                path=['dependent_variables', 'values', i, 'errors', j, sub_path],
-                                instance=data['dependent_variables']
-                            )
-                            self.add_validation_error(file_path, error)
-
-                        if error_plus == 0 and error_minus == 0:
-                            zero_uncertainties.append(True)
-                        else:
-                            zero_uncertainties.append(False)
-
-                    if len(zero_uncertainties) > 0 and all(zero_uncertainties):
-                        error = ValidationError(
-                            "Uncertainties should not all be zero",
-                            path=['dependent_variables', 'values', i, 'errors'],
-                            instance=data['dependent_variables']
-                        )
-                        self.add_validation_error(file_path, error)
+        for k, dependent_variable in enumerate(data['dependent_variables']):
+            values = dependent_variable['values']
+            if isinstance(values, CompactValues):
+                # Numeric uncertainties can only give an error if all zero
+                indices = set(values.irregular_values).union(values.zero_error_indices())
+                for i in sorted(indices):
+                    self._check_error_value(file_path, data, i, values[i], k)
+                    if self.error_limit_reached(file_path):
+                        return
+                continue
+            for i, value in enumerate(values):
+                # Most values are only checked quickly, without building the
+                # paths of the errors
+                if not _has_nonzero_uncertainties(value):
+                    self._check_error_value(file_path, data, i, value, k)
+                    if self.error_limit_reached(file_path):
+                        return
+
+    def _check_error_value(self, file_path, data, i, value, variable_index=None):
+        """
+        Checks the uncertainties of value i of a dependent variable.
+
+        :param variable_index: index of the dependent variable, added to the
+            paths used to locate the messages (but not shown in them).
+        """
+        message_count = len(self.get_messages(file_path))
+        try:
+            self._check_uncertainties(file_path, data, i, value)
+        finally:
+            if variable_index is not None:
+                for message in self.get_messages(file_path)[message_count:]:
+                    # The message saying there are too many errors has no path
+                    if message.path is not None:
+                        message.path = message.path[:1] + (variable_index,) + message.path[1:]
+
+    def _check_uncertainties(self, file_path, data, i, value):
+        if 'errors' in value:
+            zero_uncertainties = []
+            for j, error in enumerate(value['errors']):
+                has_asymerror = False
+                if 'symerror' in error:
+                    error_plus = error_minus = self.convert_to_float(
+                        error['symerror'],
+                        file_path=file_path,
+                        path=['dependent_variables', 'values', i, 'errors', j, 'symerror'],
+                        instance=data['dependent_variables']
+                    )
+                elif 'asymerror' in error:
+                    has_asymerror = True
+                    error_plus = self.convert_to_float(
+                        error['asymerror']['plus'],
+                        file_path=file_path,
+                        path=['dependent_variables', 'values', i, 'errors', j, 'asymerror', 'plus'],
+                        instance=data['dependent_variables']
+                    )
+                    error_minus = self.convert_to_float(
+                        error['asymerror']['minus'],
+                        file_path=file_path,
+                        path=['dependent_variables', 'values', i, 'errors', j, 'asymerror', 'minus'],
+                        instance=data['dependent_variables']
+                    )
+                else:
+                    # An uncertainty without either is reported by the schema
+                    continue
+
+                if error_plus == '' and error_minus == '':
+                    if has_asymerror:
+                        msg = "asymerror plus and minus cannot both be empty"
+                        sub_path = 'asymerror'
+                    else:
+                        msg = "symerror cannot be empty"
+                        sub_path = 'symerror'
+                    error = ValidationError(
+                        msg,
+                        path=['dependent_variables', 'values', i, 'errors', j, sub_path],
+                        instance=data['dependent_variables']
+                    )
+                    self.add_validation_error(file_path, error)
+
+                if error_plus == 0 and error_minus == 0:
+                    zero_uncertainties.append(True)
+                else:
+                    zero_uncertainties.append(False)
+
+            if len(zero_uncertainties) > 0 and all(zero_uncertainties):
+                error = ValidationError(
+                    "Uncertainties should not all be zero",
+                    path=['dependent_variables', 'values', i, 'errors'],
+                    instance=data['dependent_variables']
+                )
+                self.add_validation_error(file_path, error)
 
     def check_length_values(self, file_path, data):
         """
@@ -332,6 +547,245 @@ class DataFileValidator(Validator):
         return error
 
 
+def _uncertainty_to_float(error):
+    """
+    Converts an uncertainty to a float as `DataFileValidator.convert_to_float`
+    does, without reporting errors.
+
+    :return: the float, or None if the uncertainty isn't a number.
+    """
+    error_type = type(error)
+    if error_type is float:
+        return error
+    if error_type is int or error_type is str:
+        try:
+            return float(error.replace('%', '') if error_type is str else error)
+        except (ValueError, OverflowError):
+            # Left to convert_to_float to report
+            return None
+    return None
+
+
+def _has_nonzero_uncertainties(value):
+    """
+    Checks the uncertainties of a dependent variable value without building
+    the paths and errors of `DataFileValidator._check_uncertainties`, as
+    most values have nothing to report.
+
+    :return: True if `_check_uncertainties` would report nothing, or False
+        if the value has to be checked by it.
+    """
+    if type(value) is not dict:
+        return False
+    if 'errors' not in value:
+        return True
+    errors = value['errors']
+    if type(errors) is not list:
+        return False
+
+    all_zero = True
+    for error in errors:
+        if type(error) is not dict:
+            return False
+        if 'symerror' in error:
+            error_plus = error['symerror']
+            if type(error_plus) is not float:
+                error_plus = _uncertainty_to_float(error_plus)
+                if error_plus is None:
+                    return False
+            if error_plus != 0:
+                all_zero = False
+            continue
+
+        asymerror = error.get('asymerror')
+        if type(asymerror) is not dict:
+            return False
+        error_plus = _uncertainty_to_float(asymerror.get('plus'))
+        error_minus = _uncertainty_to_float(asymerror.get('minus'))
+        if error_plus is None or error_minus is None:
+            return False
+        if error_plus != 0 or error_minus != 0:
+            all_zero = False
+    return not (errors and all_zero)
+
+
+def _is_finite_independent_value(v):
+    """
+    Checks an independent variable value without the regular expression and
+    formatting of `DataFileValidator._check_independent_variable_value`.
+
+    :return: True if the value isn't a string range and isn't an underflow
+        or overflow bin, or False if the value has to be checked fully.
+    """
+    if type(v) is not dict:
+        return False
+    if isinstance(v.get('value'), str) and '-' in v['value']:
+        return False
+    if 'low' in v and 'high' in v:
+        for limit in (v['low'], v['high']):
+            limit_type = type(limit)
+            if limit_type is float:
+                if math.isinf(limit):
+                    return False
+            elif limit_type is not int:
+                return False
+    return True
+
+
+class _StreamingChecker(object):
+    """
+    Runs the checks of `DataFileValidator.validate` on the values of a table
+    while it is streamed. The messages from each kind of check are kept apart
+    until the whole table has been parsed, so that nothing is reported for a
+    file which can't be parsed.
+    """
+
+    def __init__(self, validator, file_path):
+        self.validator = validator
+        self.file_path = file_path
+        # With compact values the other checks are run after parsing
+        self.check_rows = not validator.compact_values
+        self.semantic_checks = validator.schema_registry.has_semantic_checks
+        self.independent_checks = self.semantic_checks and \
+            validator.schema_registry.has_v1_1_features
+        self.sort_fn = by_relevance(strong='oneOf', weak=[])
+
+        self.value_validators = {}
+        for key in VARIABLES_KEYS:
+            self.value_validators[key] = get_subschema_validators(
+                validator._data_schema,
+                ('properties', key, 'items', 'properties', 'values', 'items'),
+                schema_key=validator.default_schema_file
+            )
+        # Without a schema for the values they can only be checked as part
+        # of the whole document
+        self.can_stream = all(self.value_validators.values())
+
+        self.schema_messages = {}
+        self.error_value_messages = {}
+        self.independent_messages = {}
+        # The messages in the order they are added to the validator
+        self.collected_messages = (self.schema_messages, self.error_value_messages,
+                                   self.independent_messages)
+        self.error_values_failed = False
+        self.independent_failed = False
+        self.bins = {}
+
+    def _collect(self, messages, check, *args):
+        """
+        Runs a check of the validator, adding its messages to `messages`
+        instead of the validator's own. The check is skipped once the
+        messages which will be added before and with `messages` take the file
+        over `max_errors_per_file`.
+        """
+        if self._is_over_error_limit(messages):
+            return
+        validator_messages = self.validator.messages
+        self.validator.messages = messages
+        try:
+            check(*args)
+        finally:
+            self.validator.messages = validator_messages
+
+    def _is_over_error_limit(self, messages):
+        limit = self.validator.get_error_limit(self.file_path)
+        if limit is None:
+            return False
+        count = 0
+        for collected in self.collected_messages:
+            count += len(collected.get(self.file_path, ()))
+            if collected is messages:
+                break
+        return count > limit
+
+    def check_value(self, key, i, j, value):
+        validator, is_valid = self.value_validators[key]
+        self._collect(self.schema_messages, self.validator._add_schema_errors, self.file_path,
+                      value, validator, self.sort_fn, (key, i, 'values', j), is_valid)
+        if not self.check_rows:
+            return
+
+        # As in validate, a check which fails with an exception is stopped,
+        # which is only reported if there are no other errors
+        if key == 'dependent_variables':
+            if self.semantic_checks and not self.error_values_failed and \
+                    not _has_nonzero_uncertainties(value):
+                try:
+                    self._collect(self.error_value_messages, self.validator._check_error_value,
+                                  self.file_path, {'dependent_variables': None}, j, value, i)
+                except Exception:
+                    self.error_values_failed = True
+        elif self.independent_checks and not self.independent_failed and \
+                not _is_finite_independent_value(value):
+            underflows, overflows = self.bins.setdefault(i, ({}, {}))
+            try:
+                self._collect(self.independent_messages,
+                              self.validator._check_independent_variable_value,
+                              self.file_path, {'independent_variables': None}, i, j, value,
+                              underflows, overflows)
+            except Exception:
+                self.independent_failed = True
+
+    def check_variable(self, key, i, count):
+        if key == 'independent_variables' and self.independent_checks and \
+                not self.independent_failed and count:
+            underflows, overflows = self.bins.pop(i, ({}, {}))
+            self._collect(self.independent_messages,
+                          self.validator._check_independent_variable_bins,
+                          self.file_path, {'independent_variables': None}, i, count - 1,
+                          underflows, overflows)
+
+    def finish(self, table):
+        """
+        Validates the rest of the document against the schema, runs the
+        checks which need the whole table and adds all the messages to the
+        validator.
+        """
+        validator = self.validator
+        file_path = self.file_path
+        data = table.document
+
+        skeleton = data
+        if not self.check_rows:
+            skeleton = dict(data)
+            for key in VARIABLES_KEYS:
+                skeleton[key] = [dict(variable, values=[]) for variable in data[key]]
+
+        validator._validate_json_against_schema(file_path, skeleton, validator._data_schema,
+                                                self.sort_fn,
+                                                schema_key=validator.default_schema_file)
+        self._add_messages(self.schema_messages)
+        if not self.semantic_checks:
+            return
+
+        if not self.check_rows:
+            validator._check_semantics(file_path, data)
+            return
+
+        self._add_messages(self.error_value_messages)
+        if not self.error_values_failed:
+            # The lengths are checked on stand-ins with the right number
+            # of values
+            counts = {}
+            for key in VARIABLES_KEYS:
+                counts[key] = [{'values': range(table.value_counts[(key, i)])}
+                               for i in range(len(data[key]))]
+            validator.check_length_values(file_path, counts)
+            if self.independent_checks:
+                self._add_messages(self.independent_messages)
+
+        if (self.error_values_failed or self.independent_failed) and \
+                not validator.has_errors(file_path):
+            validator.add_validation_message(ValidationMessage(
+                file=file_path,
+                message=f"An unexpected error occurred whilst validating {file_path}. Please contact info@hepdata.net if this issue recurs.",
+            ))  #pragma: no cover
+
+    def _add_messages(self, messages):
+        for message in messages.get(self.file_path, []):
+            self.validator.add_validation_message(message)
+
+
 class UnsupportedDataSchemaException(Exception):
     """
     Represents an error on the request of a custom data schema which does not exist.
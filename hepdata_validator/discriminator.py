@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of HEPData.
+# Copyright (C) 2020 CERN.
+#
+# HEPData is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# HEPData is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with HEPData; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+"""
+Chooses the branch of a `oneOf` to validate an object against from the keys
+present in the object.
+
+A key discriminates a branch if the branch requires it and every other
+branch forbids it (with `additionalProperties: false`). If an object has
+that key, no other branch can be valid; if an object has none of the
+discriminating keys, only the one branch without a discriminating key can
+be valid. For example, the `{low, high[, value]}` form of a data table
+value is chosen by the presence of `low`, and the `{value}` form otherwise.
+"""
+
+from jsonschema import ValidationError
+from jsonschema.validators import extend
+
+# Discriminators found for each oneOf list, keyed by id, with the list kept
+# alive so the id can't be reused
+_discriminators = {}
+_discriminated_validator_classes = {}
+
+
+class OneOfDiscriminator(object):
+    """
+    Selects a branch of a `oneOf` from the keys of an object.
+
+    :attr list keys: (key, index) pairs, where the presence of the key
+        selects the branch at the index.
+    :attr int default: index of the branch to use if none of the keys are
+        present, or None if no branch can be valid.
+    """
+
+    def __init__(self, keys, default):
+        self.keys = keys
+        self.default = default
+
+    def select(self, instance):
+        """
+        Returns the index of the only branch an object could be valid
+        against, or None if no branch can be valid.
+        """
+        for key, index in self.keys:
+            if key in instance:
+                return index
+        return self.default
+
+
+def find_discriminator(branches, validator_cls):
+    """
+    Finds how to choose between the branches of a `oneOf` from the keys of
+    an object.
+
+    :param branches: list of subschemas of the `oneOf`.
+    :param validator_cls: `jsonschema` validator class for the schema.
+    :return: `OneOfDiscriminator`, or None if the branches can't be
+        distinguished by their keys.
+    """
+    if len(branches) < 2 or 'required' not in validator_cls.VALIDATORS:
+        return None
+
+    required = []
+    allowed = []
+    for branch in branches:
+        if not isinstance(branch, dict) or '$ref' in branch:
+            return None
+        branch_required = branch.get('required', [])
+        if not isinstance(branch_required, list):
+            return None
+        required.append(branch_required)
+        if branch.get('additionalProperties', True) is False and 'patternProperties' not in branch:
+            allowed.append(set(branch.get('properties', {})))
+        else:
+            allowed.append(None)
+
+    keys = []
+    default = None
+    for index, branch_required in enumerate(required):
+        others = [allowed[other] for other in range(len(branches)) if other != index]
+        key = next((key for key in branch_required
+                    if all(names is not None and key not in names for names in others)), None)
+        if key is not None:
+            keys.append((key, index))
+        elif default is None:
+            default = index
+        else:
+            # More than one branch without a discriminating key
+            return None
+
+    return OneOfDiscriminator(keys, default)
+
+
+def _get_discriminator(one_of, validator_cls):
+    cached = _discriminators.get(id(one_of))
+    if cached is None or cached[0] is not one_of:
+        cached = (one_of, find_discriminator(one_of, validator_cls))
+        _discriminators[id(one_of)] = cached
+    return cached[1]
+
+
+def make_discriminated_one_of(standard_one_of):
+    """
+    Returns a `oneOf` keyword for `jsonschema` which only descends into the
+    branch chosen by the object's keys. The error yielded is the same as for
+    the standard keyword, but its context only has the errors of that
+    branch.
+
+    :param standard_one_of: `oneOf` keyword of the validator class being
+        extended, used when the branches can't be chosen from the keys.
+    """
+    def discriminated_one_of(validator, one_of, instance, schema):
+        discriminator = None
+        if validator.is_type(instance, 'object'):
+            discriminator = _get_discriminator(one_of, type(validator))
+        if discriminator is None:
+            yield from standard_one_of(validator, one_of, instance, schema)
+            return
+
+        index = discriminator.select(instance)
+        if index is None:
+            errors = []
+        else:
+            errors = list(validator.descend(instance, one_of[index], schema_path=index))
+            if not errors:
+                return
+
+        yield ValidationError(
+            f"{instance!r} is not valid under any of the given schemas",
+            context=errors,
+        )
+
+    return discriminated_one_of
+
+
+def get_discriminated_validator_class(cls):
+    """
+    Returns a `jsonschema` validator class extending `cls` with a
+    discriminated `oneOf` keyword (see `make_discriminated_one_of`).
+    """
+    if 'oneOf' not in cls.VALIDATORS:
+        return cls
+    extended = _discriminated_validator_classes.get(cls)
+    if extended is None:
+        extended = extend(cls, {'oneOf': make_discriminated_one_of(cls.VALIDATORS['oneOf'])})
+        _discriminated_validator_classes[cls] = extended
+    return extended
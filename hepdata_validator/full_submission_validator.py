@@ -1,21 +1,29 @@
 from enum import Enum
 import gzip
 import os.path
-from packaging import version as packaging_version
 import shutil
+import tarfile
 import tempfile
+import zipfile
 from urllib.parse import urlparse, urlunsplit
 
 import yaml
 
-from hepdata_validator import Validator, ValidationMessage, YamlLoader, YamlDumper
+from hepdata_validator import Validator, ValidationMessage, load_all_documents, open_document
 from .schema_resolver import JsonSchemaResolver
 from .schema_downloader import HTTPSchemaDownloader
-from .submission_file_validator import SubmissionFileValidator
+from .submission_file_validator import SubmissionFileValidator, SubmissionSummary
 from .data_file_validator import DataFileValidator
+from .yaml_backend import get_yaml_backend
 
 
 INDIVIDUAL_FILE_SIZE_LIMIT = 10485760
+# The tables of a single YAML file are only measured against
+# INDIVIDUAL_FILE_SIZE_LIMIT if the file is bigger than the limit divided by
+# this, allowing for tables being bigger when written out in block style.
+SINGLE_YAML_SIZE_CHECK_RATIO = 4
+# Size of the chunks in which .yaml.gz files are decompressed
+DECOMPRESS_CHUNK_SIZE = 1048576
 
 class SchemaType(Enum):
     SUBMISSION = 'submission'
@@ -30,15 +38,33 @@ class FullSubmissionValidator(Validator):
     :attr dict valid_files: map of SchemaType (e.g. submission, data, single
                             file, remote) to lists of valid files
     :attr list submission_docs: List of parsed YAML (represented as `dicts`)
-                                from the submission file
+                                from the submission file, or None in
+                                streaming mode unless `keep_submission_docs`
+                                is set.
     """
 
     def __init__(self, *args, **kwargs):
         super(FullSubmissionValidator, self).__init__(*args, **kwargs)
+        # Share this validator's schema registry with the file validators
+        kwargs['schema_registry'] = self.schema_registry
+        kwargs['parse_cache'] = self.parse_cache
         self._submission_file_validator = SubmissionFileValidator(*args, **kwargs)
         self._data_file_validator = DataFileValidator(*args, **kwargs)
         self.valid_files = {}
         self.submission_docs = None
+        # In streaming mode the documents of the submission file are
+        # validated one at a time as they are parsed, and only kept if asked.
+        self.streaming = kwargs.get('streaming', False)
+        self.keep_submission_docs = kwargs.get('keep_submission_docs', not self.streaming)
+        # Limits in bytes on the inputs, checked before they are parsed (or
+        # extracted, for archives). None means no limit.
+        self.data_file_size_limit = kwargs.get('data_file_size_limit', INDIVIDUAL_FILE_SIZE_LIMIT)
+        self.submission_file_size_limit = kwargs.get('submission_file_size_limit')
+        self.single_yaml_file_size_limit = kwargs.get('single_yaml_file_size_limit')
+        self.archive_size_limit = kwargs.get('archive_size_limit')
+        # Maximum number of messages for the whole submission, after which
+        # the remaining data files aren't validated. None means no limit.
+        self.max_errors_per_submission = kwargs.get('max_errors_per_submission')
         if 'autoload_remote_schemas' in kwargs:
             self.autoload_remote_schemas = kwargs['autoload_remote_schemas']
         else:
@@ -80,6 +106,8 @@ class FullSubmissionValidator(Validator):
         """
         self.single_yaml_file = False
         self.temp_directory = None
+        self._data_tables = {}
+        self._skipped_data_file_count = 0
         self.directory = directory
 
         try:
@@ -91,6 +119,17 @@ class FullSubmissionValidator(Validator):
                     )
                     return False
 
+                # Check the size of the files in the archive before extracting it
+                if self.archive_size_limit is not None:
+                    archive_size = _get_archive_size(archive)
+                    if archive_size is not None and archive_size > self.archive_size_limit:
+                        self._add_validation_message(
+                            file=archive,
+                            message=f"Size of the files in archive {archive} ({archive_size} bytes) is bigger "
+                                    f"than the limit of {self.archive_size_limit} bytes."
+                        )
+                        return False
+
                 # Try extracting file to a temp dir
                 self.temp_directory = tempfile.mkdtemp()
                 try:
@@ -129,12 +168,20 @@ class FullSubmissionValidator(Validator):
                     try:
                         with gzip.GzipFile(file, 'rb') as gzip_file:
                             with open(unzipped_path, 'wb') as unzipped_file:
-                                unzipped_file.write(gzip_file.read())
+                                is_extracted = _copy_file(gzip_file, unzipped_file,
+                                                          self.single_yaml_file_size_limit)
                     except Exception as e:
                         self._add_validation_message(
                             file=file, message=f"Unable to extract file {file}. Error was: {e}"
                         )
                         return False
+                    if not is_extracted:
+                        self._add_validation_message(
+                            file=file,
+                            message=f"Size of the decompressed file {file} is bigger than the limit of "
+                                    f"{self.single_yaml_file_size_limit} bytes."
+                        )
+                        return False
 
                     self.submission_file_path = unzipped_path
                     self.directory = self.temp_directory
@@ -158,74 +205,43 @@ class FullSubmissionValidator(Validator):
                     )
                     return False
 
-            self.included_files = [self.submission_file_path]
-
-            # Open the submission.yaml file and load all YAML documents.
-            with open(self.submission_file_path, 'r') as submission_file:
-                try:
-                    self.submission_docs = list(yaml.load_all(submission_file, Loader=YamlLoader))
-                except yaml.YAMLError as e:
+            # Check the size of the submission file before parsing it
+            if self.single_yaml_file:
+                size_limit, file_kind = self.single_yaml_file_size_limit, 'single YAML file'
+            else:
+                size_limit, file_kind = self.submission_file_size_limit, 'submission file'
+            if size_limit is not None:
+                file_size = os.path.getsize(self.submission_file_path)
+                if file_size > size_limit:
                     self._add_validation_message(
                         file=self.submission_file_path,
-                        message="There was a problem parsing the file:\n\t\t" + str(e).replace('\n', '\n\t\t')
+                        message=f"Size of {file_kind} {self.submission_file_path} ({file_size} bytes) is bigger "
+                                f"than the limit of {size_limit} bytes."
                     )
                     return False
 
-                # Need to remove independent_variables and dependent_variables from single YAML file.
-                if self.single_yaml_file:
-                    self._create_data_files(self.submission_docs)
-
-                # Validate the submission.yaml file
-                is_valid_submission_file = self._submission_file_validator.validate(file_path=self.submission_file_path, data=self.submission_docs)
-                if not is_valid_submission_file:
-                    self._add_validation_message(
-                        file=self.submission_file_path, message=f'{self.submission_file_path} is invalid HEPData YAML.'
-                    )
-                    for message in self._submission_file_validator.get_messages(self.submission_file_path):
-                        self._add_validation_message(
-                            file=self.submission_file_path, message=message.message
-                        )
-                    return False
+            self.included_files = [self.submission_file_path]
 
-                # Loop over all YAML documents in the submission.yaml file.
-                for doc in self.submission_docs:
-                    is_valid_doc_in_submission_file = self._check_doc(doc)
-                    if not is_valid_doc_in_submission_file:
-                        is_valid_submission_file = False
+            # Open the submission.yaml file and validate its YAML documents.
+            validate_documents = self._validate_documents_lazily if self.streaming \
+                else self._validate_documents
+            if not validate_documents():
+                return False
 
-                if is_valid_submission_file:
-                    type = SchemaType.SINGLE_YAML if self.single_yaml_file else SchemaType.SUBMISSION
-                    self.valid_files[type] = [self._remove_temp_directory(self.submission_file_path)]
+            if self._skipped_data_file_count:
+                # Unreferenced files aren't looked for, as the data files of
+                # the skipped documents would be reported
+                self._add_validation_message(
+                    file=self.submission_file_path,
+                    message=f"Too many errors: stopped validating the submission after "
+                            f"{self.max_errors_per_submission} errors. Data files not checked: "
+                            f"{self._skipped_data_file_count}."
+                )
+                return False
 
             # Check all files in directory are in included_files
-            if not self.single_yaml_file and self.schema_version >= packaging_version.parse("1.1.0"):
-                # helper to check if a provided file is not meant to describe HEP data, but rather
-                # represents "extended attributes" (e.g.) as a result of BSD tar (default on MacOS)
-                # which creates these extra files when archiving files with extended attributes on
-                # HSF+ volumes (denoted by "@" in permission bits)
-                def is_ext_attr_file(f):
-                    # three conditions must be fulfilled
-                    # 1. the file must not be referenced in the submission (already checked below)
-                    # 2. the file name must have the format "._<actual_file>"
-                    prefix = "._"
-                    if not f.startswith(prefix):
-                        return False
-                    # 3. a file named "<actual_file>" must exist in the same directory
-                    if not os.path.isfile(os.path.join(self.directory, f[len(prefix):])):
-                        return False
-                    return True
-
-                for f in os.listdir(self.directory):
-                    file_path = os.path.join(self.directory, f)
-                    if file_path not in self.included_files:
-                        self._add_validation_message(
-                            file=file_path, message=f'{f} is not referenced in the submission.'
-                        )
-                        if is_ext_attr_file(f):
-                            self._add_validation_message(
-                               file=file_path, message=f'{f} might be a file created by tar on MacOS. Set COPYFILE_DISABLE=1 before creating the archive.',
-                               level='hint'
-                            )
+            if not self.single_yaml_file and self.schema_registry.has_v1_1_features:
+                self._check_unreferenced_files()
 
             return len(self.messages) == 0
         finally:
@@ -233,6 +249,49 @@ class FullSubmissionValidator(Validator):
                 # Delete temporary Directory
                 shutil.rmtree(self.temp_directory)
 
+    def _check_unreferenced_files(self):
+        """
+        Adds an error for each file in the submission directory which isn't
+        in `included_files`.
+        """
+        # helper to check if a provided file is not meant to describe HEP data, but rather
+        # represents "extended attributes" (e.g.) as a result of BSD tar (default on MacOS)
+        # which creates these extra files when archiving files with extended attributes on
+        # HSF+ volumes (denoted by "@" in permission bits)
+        def is_ext_attr_file(f):
+            # three conditions must be fulfilled
+            # 1. the file must not be referenced in the submission (already checked below)
+            # 2. the file name must have the format "._<actual_file>"
+            prefix = "._"
+            if not f.startswith(prefix):
+                return False
+            # 3. a file named "<actual_file>" must exist in the same directory
+            if not os.path.isfile(os.path.join(self.directory, f[len(prefix):])):
+                return False
+            return True
+
+        # included_files is a list, so it is made into a set once rather
+        # than searched for every file
+        included_files = set(self.included_files)
+        for f in os.listdir(self.directory):
+            file_path = os.path.join(self.directory, f)
+            if file_path not in included_files:
+                self._add_validation_message(
+                    file=file_path, message=f'{f} is not referenced in the submission.'
+                )
+                if is_ext_attr_file(f):
+                    self._add_validation_message(
+                       file=file_path, message=f'{f} might be a file created by tar on MacOS. Set COPYFILE_DISABLE=1 before creating the archive.',
+                       level='hint'
+                    )
+
+    def get_error_limit(self, file_name):
+        """
+        The messages of each data file or table are limited by the data
+        file validator, so the messages gathered here aren't limited.
+        """
+        return None
+
     def _add_validation_message(self, file, message, **kwargs):
         if self.temp_directory:
             # Remove temp directory from filename and message
@@ -249,18 +308,167 @@ class FullSubmissionValidator(Validator):
         else:
             return s
 
-    def _create_data_files(self, docs):
-        for doc in docs:
-            if 'name' in doc:
-                file_name = doc['name'].replace(' ', '_').replace('/', '-') + '.yaml'
-                doc['data_file'] = file_name
-                if self.directory:
-                    file_name = os.path.join(self.directory, file_name)
-                with open(file_name, 'w') as data_file:
-                    yaml.dump({'independent_variables': doc.pop('independent_variables', None),
-                               'dependent_variables': doc.pop('dependent_variables', None)}, data_file, Dumper=YamlDumper)
-
-    def _check_doc(self, doc):
+    def _validate_documents(self):
+        """
+        Loads all YAML documents of the submission file into
+        `submission_docs`, validates them and then the data file of each.
+
+        :return: False if the submission file can't be parsed or is invalid.
+        """
+        try:
+            self.submission_docs = self._load_file(self.submission_file_path, all_documents=True)
+        except yaml.YAMLError as e:
+            self._add_parsing_message(e)
+            return False
+
+        # Need to remove independent_variables and dependent_variables from single YAML file.
+        if self.single_yaml_file:
+            for doc in self.submission_docs:
+                self._extract_data_table(doc)
+
+        # Validate the submission.yaml file
+        is_valid_submission_file = self._submission_file_validator.validate(file_path=self.submission_file_path, data=self.submission_docs)
+        if not is_valid_submission_file:
+            self._add_invalid_submission_messages()
+            return False
+
+        # Loop over all YAML documents in the submission.yaml file.
+        for index, doc in enumerate(self.submission_docs):
+            is_valid_doc_in_submission_file = self._check_doc(doc, index)
+            if not is_valid_doc_in_submission_file:
+                is_valid_submission_file = False
+
+        if is_valid_submission_file:
+            self._add_valid_submission_file()
+        return True
+
+    def _validate_documents_lazily(self):
+        """
+        Validates the YAML documents of the submission file one at a time as
+        they are parsed, then checks the file as a whole from a
+        `SubmissionSummary`, so that only the current document (and table, for
+        a single YAML file) is held in memory. The messages about data files
+        are held back until the submission file is known to be valid, giving
+        the same messages as `_validate_documents`. The submission file isn't
+        loaded through `parse_cache`, whose entries hold all the documents.
+
+        :return: False if the submission file can't be parsed or is invalid.
+        """
+        file_path = self.submission_file_path
+        submission_validator = self._submission_file_validator
+        summary = SubmissionSummary()
+        self.submission_docs = [] if self.keep_submission_docs else None
+        messages, valid_files = self.messages, self.valid_files
+        data_messages, data_valid_files = {}, {}
+        is_valid_submission_file = True
+        has_failed = False
+
+        with open_document(file_path) as submission_file:
+            try:
+                documents = load_all_documents(submission_file, self.intern_strings)
+                for index, doc in enumerate(documents):
+                    if self.single_yaml_file:
+                        self._extract_data_table(doc)
+                    if self.keep_submission_docs:
+                        self.submission_docs.append(doc)
+                    # Keep parsing the rest of the file after an error, as a
+                    # parsing error replaces all other messages
+                    if has_failed:
+                        continue
+
+                    try:
+                        submission_validator.validate_document(file_path, index, doc, summary)
+                    except Exception as e:
+                        submission_validator.add_validation_message(ValidationMessage(file=file_path, message=str(e)))
+                        has_failed = True
+                        continue
+                    if submission_validator.has_errors(file_path):
+                        continue
+
+                    self.messages, self.valid_files = data_messages, data_valid_files
+                    try:
+                        if not self._check_doc(doc, index):
+                            is_valid_submission_file = False
+                    finally:
+                        self.messages, self.valid_files = messages, valid_files
+            except yaml.YAMLError as e:
+                submission_validator.messages.pop(file_path, None)
+                self._add_parsing_message(e)
+                return False
+
+        if not has_failed:
+            submission_validator.check_summary(file_path, summary)
+        if submission_validator.has_errors(file_path):
+            self._add_invalid_submission_messages()
+            return False
+
+        for file_messages in data_messages.values():
+            for message in file_messages:
+                self.add_validation_message(message)
+        for type, files in data_valid_files.items():
+            self.valid_files.setdefault(type, []).extend(files)
+        if is_valid_submission_file:
+            self._add_valid_submission_file()
+        return True
+
+    def _add_parsing_message(self, error):
+        self._add_validation_message(
+            file=self.submission_file_path,
+            message="There was a problem parsing the file:\n\t\t" + str(error).replace('\n', '\n\t\t')
+        )
+
+    def _add_invalid_submission_messages(self):
+        self._add_validation_message(
+            file=self.submission_file_path, message=f'{self.submission_file_path} is invalid HEPData YAML.'
+        )
+        # Messages of documents validated one at a time haven't been merged
+        self._submission_file_validator.aggregate_messages(self.submission_file_path)
+        self._submission_file_validator.locate_messages(self.submission_file_path)
+        for message in self._submission_file_validator.get_messages(self.submission_file_path):
+            self._add_validation_message(
+                file=self.submission_file_path, message=message.message,
+                line=message.line, column=message.column, aggregated=message.aggregated
+            )
+
+    def _add_valid_submission_file(self):
+        type = SchemaType.SINGLE_YAML if self.single_yaml_file else SchemaType.SUBMISSION
+        self.valid_files[type] = [self._remove_temp_directory(self.submission_file_path)]
+
+    def _extract_data_table(self, doc):
+        """
+        Moves the table of a document of a single YAML file out of it, and
+        gives the document a 'data_file' name for the table as for
+        submission.yaml. The table is validated by _check_doc without being
+        written out.
+        """
+        if doc and 'name' in doc:
+            file_name = doc['name'].replace(' ', '_').replace('/', '-') + '.yaml'
+            doc['data_file'] = file_name
+            self._data_tables[file_name] = {
+                'independent_variables': doc.pop('independent_variables', None),
+                'dependent_variables': doc.pop('dependent_variables', None)
+            }
+
+    def _get_data_table_size(self, table):
+        """
+        Returns the size of a table of a single YAML file if it were written
+        out as a data file, without writing it, or 0 if the whole file is
+        too small for the table to reach `data_file_size_limit`.
+        """
+        if self.data_file_size_limit is None or os.path.getsize(self.submission_file_path) \
+                * SINGLE_YAML_SIZE_CHECK_RATIO <= self.data_file_size_limit:
+            return 0
+        writer = _SizeWriter()
+        get_yaml_backend().dump(table, writer)
+        return writer.size
+
+    def _check_doc(self, doc, document_index=0):
+        """
+        Checks a document of the submission file and validates its data file.
+
+        :param document_index: index of the document in the submission file,
+            which holds the table of a single YAML file.
+        """
         # Skip empty YAML documents.
         if not doc:
             return True
@@ -271,7 +479,7 @@ class FullSubmissionValidator(Validator):
         if 'additional_resources' in doc:
             for resource in doc['additional_resources']:
                 # For v0 schemas, allow resource locations that start with '/resource/'
-                if self.schema_version.major == 0:
+                if not self.schema_registry.has_semantic_checks:
                     unchecked_prefixes = ('http', '/resource/')
                 else:
                     unchecked_prefixes = 'http'
@@ -300,27 +508,46 @@ class FullSubmissionValidator(Validator):
                 )
                 return False
 
+            # Stop validating data files once the submission has too many
+            # errors, and give each data file what is left of the limit if
+            # that is lower than max_errors_per_file
+            error_limit = None
+            if self.max_errors_per_submission is not None:
+                remaining = self.max_errors_per_submission - \
+                    sum(len(messages) for messages in self.messages.values())
+                if remaining <= 0:
+                    self._skipped_data_file_count += 1
+                    return is_valid_submission_doc
+                if self.max_errors_per_file is None or remaining < self.max_errors_per_file:
+                    error_limit = remaining
+
             # Extract data file from YAML document.
             if self.directory:
                 data_file_path = os.path.join(self.directory, doc['data_file'])
             else:
                 data_file_path = doc['data_file']
 
-            if not self.single_yaml_file:
-                self.included_files.append(data_file_path)
+            # Tables of a single YAML file were parsed with the rest of the file
+            data_table = self._data_tables.pop(doc['data_file'], None)
+            if data_table is not None:
+                file_size = self._get_data_table_size(data_table)
+            else:
+                if not self.single_yaml_file:
+                    self.included_files.append(data_file_path)
 
-            if not os.path.isfile(data_file_path):
-                self._add_validation_message(
-                    file=data_file_path, message="Missing data_file '%s'." % doc['data_file']
-                )
-                return is_valid_submission_doc
+                if not os.path.isfile(data_file_path):
+                    self._add_validation_message(
+                        file=data_file_path, message="Missing data_file '%s'." % doc['data_file']
+                    )
+                    return is_valid_submission_doc
 
-            file_size = os.path.getsize(data_file_path)   # 10 MB limit for each data file
-            if file_size > INDIVIDUAL_FILE_SIZE_LIMIT and self.schema_version >= packaging_version.parse("1.1.0"):
+                file_size = os.path.getsize(data_file_path)   # 10 MB limit for each data file
+            if self.data_file_size_limit is not None and file_size > self.data_file_size_limit \
+                    and self.schema_registry.has_v1_1_features:
                 self._add_validation_message(
                     file=data_file_path,
                     message=f"Size of data_file '{doc['data_file']}' ({file_size} bytes) is bigger than the limit of " \
-                            f"{INDIVIDUAL_FILE_SIZE_LIMIT} bytes. Try adding the file as an additional_resource instead."
+                            f"{self.data_file_size_limit} bytes. Try adding the file as an additional_resource instead."
                 )
                 return is_valid_submission_doc
 
@@ -346,9 +573,27 @@ class FullSubmissionValidator(Validator):
                     )
                     return False
 
-            # Just try to load YAML data file without validating schema.
             try:
-                contents = yaml.load(open(data_file_path, 'r'), Loader=YamlLoader)
+                if data_table is not None:
+                    is_valid_data_file = self._data_file_validator.validate(
+                        file_path=data_file_path, file_type=file_type, data=data_table,
+                        max_errors=error_limit
+                    )
+                elif (self._data_file_validator.streaming or self._data_file_validator.compact_values) \
+                        and not file_type:
+                    # Validate the YAML data file while it is parsed
+                    is_valid_data_file = self._data_file_validator.validate_streaming(
+                        data_file_path, max_errors=error_limit
+                    )
+                else:
+                    # Just try to load YAML data file without validating schema.
+                    contents = self._load_file(data_file_path)
+
+                    # Validate the YAML data file
+                    is_valid_data_file = self._data_file_validator.validate(
+                        file_path=data_file_path, file_type=file_type, data=contents,
+                        max_errors=error_limit
+                    )
             except (OSError, yaml.YAMLError) as e:
                 problem_type = 'reading' if isinstance(e, OSError) else 'parsing'
                 self._add_validation_message(
@@ -357,10 +602,6 @@ class FullSubmissionValidator(Validator):
                 )
                 return is_valid_submission_doc
 
-            # Validate the YAML data file
-            is_valid_data_file = self._data_file_validator.validate(
-                file_path=data_file_path, file_type=file_type, data=contents
-            )
             if not is_valid_data_file:
                 table_msg = f" ({doc['name']})" if self.single_yaml_file else ''
                 invalid_msg = f"against schema {doc['data_schema']}" if 'data_schema' in doc else "HEPData YAML"
@@ -371,9 +612,17 @@ class FullSubmissionValidator(Validator):
                     is_valid_submission_doc = False
 
                 is_valid_data_file = False
+                if data_table is not None:
+                    # The table was loaded from its document in the submission file
+                    for message in self._data_file_validator.get_messages(data_file_path):
+                        message.document_index = document_index
+                    self._data_file_validator.locate_messages(data_file_path, self.submission_file_path)
+                else:
+                    self._data_file_validator.locate_messages(data_file_path)
                 for message in self._data_file_validator.get_messages(data_file_path):
                     self._add_validation_message(
-                        file=user_data_file_path, message=message.message
+                        file=user_data_file_path, message=message.message,
+                        line=message.line, column=message.column, aggregated=message.aggregated
                     )
             elif not self.single_yaml_file:
                 type = SchemaType.REMOTE if 'data_schema' in doc else SchemaType.DATA
@@ -386,10 +635,6 @@ class FullSubmissionValidator(Validator):
                 else:
                     self.valid_files[type].append(user_data_file_path)
 
-            # For single YAML file, clean up by removing temporary data_file created above.
-            if self.single_yaml_file and not self.temp_directory:
-                os.remove(doc['data_file'])
-
         return is_valid_submission_doc
 
     def load_remote_schema(self, schema_url=None, base_url=None, schema_name=None):
@@ -412,10 +657,62 @@ class FullSubmissionValidator(Validator):
         if schema_url in self._data_file_validator.custom_data_schemas:
             return
 
-        # Retrieve and save the remote schema in the local path
-        schema_spec = downloader.get_schema_spec(schema_name)
-        downloader.save_locally(schema_name, schema_spec)
+        # Retrieve and save the remote schema in the local path, unless it
+        # has already been retrieved by a validator sharing the registry
+        local_path = self.schema_registry.remote_schemas.get(schema_url)
+        if local_path is None:
+            schema_spec = downloader.get_schema_spec(schema_name)
+            downloader.save_locally(schema_name, schema_spec)
+            local_path = os.path.join(downloader.schemas_path, schema_name)
+            self.schema_registry.remote_schemas[schema_url] = local_path
 
         # Load the custom schema as a custom type
-        local_path = os.path.join(downloader.schemas_path, schema_name)
         self._data_file_validator.load_custom_schema(schema_url, local_path)
+
+
+def _copy_file(source, destination, size_limit=None):
+    """
+    Copies an open file to another in chunks, stopping if more than
+    `size_limit` bytes are read.
+
+    :return: False if the size limit was reached, else True.
+    """
+    size = 0
+    while True:
+        chunk = source.read(DECOMPRESS_CHUNK_SIZE)
+        if not chunk:
+            return True
+        size += len(chunk)
+        if size_limit is not None and size > size_limit:
+            return False
+        destination.write(chunk)
+
+
+def _get_archive_size(archive):
+    """
+    Returns the total size of the files in a zip or tar archive, as given by
+    the archive without extracting them, or None for other archives or if
+    the archive can't be read (which is reported when extracting it).
+    """
+    try:
+        if zipfile.is_zipfile(archive):
+            with zipfile.ZipFile(archive) as zip_file:
+                return sum(info.file_size for info in zip_file.infolist())
+        if tarfile.is_tarfile(archive):
+            with tarfile.open(archive) as tar_file:
+                return sum(member.size for member in tar_file.getmembers())
+    except (OSError, EOFError, zipfile.BadZipFile, tarfile.TarError):
+        pass
+    return None
+
+
+class _SizeWriter(object):
+    """
+    File-like object which only counts what is written to it.
+    """
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
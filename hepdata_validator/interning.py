@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of HEPData.
+# Copyright (C) 2020 CERN.
+#
+# HEPData is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# HEPData is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with HEPData; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+
+"""
+Interning of the repeated strings and small mappings of parsed files.
+
+Names, units, qualifiers and uncertainty labels (e.g. 'stat' and 'sys') are
+repeated in every bin of every table. When interning, each loader keeps a
+table of the strings and small mappings of strings (e.g. qualifiers and
+headers) it has constructed, and reuses the first equal one instead of
+keeping another copy. This saves memory for documents which are kept,
+e.g. the tables of a single YAML submission, and lets equal values be
+compared by identity.
+
+Shared mappings must not be modified. Documents themselves are never
+shared, as the validators may modify them.
+"""
+
+import yaml
+
+# Mappings with more entries than this aren't shared, as they are less
+# likely to be repeated
+SMALL_MAPPING_SIZE = 4
+
+# Interning loader classes by the loader class they extend
+_interning_loaders = {}
+
+
+class Interner(object):
+    """
+    Table of the strings and small mappings constructed by one loader.
+    """
+
+    def __init__(self):
+        self.strings = {}
+        self.mappings = {}
+
+    def intern_string(self, value):
+        return self.strings.setdefault(value, value)
+
+    def intern_mapping(self, mapping):
+        """
+        Returns the first mapping with the same items as `mapping`, in the
+        same order, if it is small and only holds strings.
+        """
+        # Mappings holding numbers, such as values and uncertainties, are
+        # rarely repeated, and keeping them would cost more than it saves
+        if len(mapping) > SMALL_MAPPING_SIZE \
+                or not all(type(k) is str and type(v) is str for k, v in mapping.items()):
+            return mapping
+        return self.mappings.setdefault(tuple(mapping.items()), mapping)
+
+    def json_object_pairs_hook(self, pairs):
+        """
+        `object_pairs_hook` for `json.loads`, interning the string values
+        and the objects. Keys are already shared by the json module.
+        """
+        mapping = {k: self.intern_string(v) if type(v) is str else v for k, v in pairs}
+        return self.intern_mapping(mapping)
+
+
+class InterningConstructorMixin(object):
+    """
+    Mixin for PyYAML loader classes, interning strings and the small
+    mappings of strings.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(InterningConstructorMixin, self).__init__(*args, **kwargs)
+        # Shared by all the documents of a stream
+        self.interner = Interner()
+        self._document_node = None
+
+    def construct_document(self, node):
+        self._document_node = node
+        try:
+            return super(InterningConstructorMixin, self).construct_document(node)
+        finally:
+            # The nodes are released as soon as the document is constructed
+            self._document_node = None
+
+    def construct_interned_str(self, node):
+        return self.interner.intern_string(self.construct_yaml_str(node))
+
+    def construct_interned_map(self, node):
+        if node is self._document_node or len(node.value) > SMALL_MAPPING_SIZE \
+                or not all(isinstance(v, yaml.ScalarNode) for _, v in node.value):
+            # Constructed as usual, in two steps in case it is recursive
+            return self.construct_yaml_map(node)
+        return self.interner.intern_mapping(self.construct_mapping(node))
+
+
+def get_interning_loader(loader_cls):
+    """
+    Returns a subclass of a PyYAML loader class which interns the strings
+    and small mappings of the documents it loads.
+
+    :param loader_cls: loader class using `yaml.SafeConstructor`, e.g.
+        `yaml.CSafeLoader`.
+    """
+    interning_loader = _interning_loaders.get(loader_cls)
+    if interning_loader is None:
+        interning_loader = type('Interning' + loader_cls.__name__,
+                                (InterningConstructorMixin, loader_cls), {})
+        interning_loader.add_constructor('tag:yaml.org,2002:str',
+                                         InterningConstructorMixin.construct_interned_str)
+        interning_loader.add_constructor('tag:yaml.org,2002:map',
+                                         InterningConstructorMixin.construct_interned_map)
+        _interning_loaders[loader_cls] = interning_loader
+    return interning_loader
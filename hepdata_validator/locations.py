@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of HEPData.
+# Copyright (C) 2020 CERN.
+#
+# HEPData is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# HEPData is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with HEPData; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+"""
+Locating the nodes of YAML documents in their file, to give the line and
+column of errors.
+
+Files are loaded without keeping where each node came from, which would
+slow down every file. Instead, once a file is found to have errors, the
+parser's events are read again to find where the nodes at the paths of the
+errors start.
+"""
+
+import yaml
+
+
+def find_locations(stream, paths, loader_cls):
+    """
+    Finds where the nodes at the given paths start in a YAML stream. The
+    stream is only parsed as far as the last of the nodes.
+
+    :param stream: open file or str.
+    :param paths: iterable of tuples of the index of a document in the
+        stream and the path of a node in that document, as a tuple of keys
+        and indices.
+    :param loader_cls: PyYAML loader class, e.g. `yaml.CSafeLoader`.
+    :return: dict mapping each of the paths which were found to a tuple of
+        the line and column of the node, counted from 1.
+    :raise yaml.YAMLError: if the stream can't be parsed up to the last node.
+    """
+    wanted = {}
+    for document_index, path in paths:
+        wanted.setdefault(document_index, set()).add(tuple(path))
+    remaining = sum(len(document_paths) for document_paths in wanted.values())
+    locations = {}
+
+    loader = loader_cls(stream)
+    try:
+        document_index = -1
+        document_paths = prefixes = ()
+        # One frame per open collection: [is_mapping, path, expects_key or
+        # next index, key]. The path is None for nodes not leading to any
+        # of the wanted paths.
+        stack = []
+        while remaining and loader.check_event():
+            event = loader.get_event()
+            if isinstance(event, yaml.DocumentStartEvent):
+                document_index += 1
+                document_paths = wanted.get(document_index, ())
+                prefixes = {path[:n] for path in document_paths for n in range(len(path) + 1)}
+                stack = []
+                continue
+            if isinstance(event, yaml.CollectionEndEvent):
+                stack.pop()
+                continue
+            if not isinstance(event, yaml.NodeEvent):
+                continue
+
+            path = _get_node_path(stack, event)
+            if path is not None and path not in prefixes:
+                path = None
+            if path in document_paths and (document_index, path) not in locations:
+                locations[(document_index, path)] = (event.start_mark.line + 1,
+                                                     event.start_mark.column + 1)
+                remaining -= 1
+
+            if isinstance(event, yaml.MappingStartEvent):
+                stack.append([True, path, True, None])
+            elif isinstance(event, yaml.SequenceStartEvent):
+                stack.append([False, path, 0, None])
+    finally:
+        loader.dispose()
+
+    return locations
+
+
+def _get_node_path(stack, event):
+    """
+    Returns the path of the node starting with `event`, updating the frame
+    of the collection it is in. Mapping keys have no path.
+    """
+    if not stack:
+        return ()
+
+    frame = stack[-1]
+    is_mapping, parent_path = frame[0], frame[1]
+    if is_mapping:
+        if frame[2]:
+            # A key, which gives the path of the next node. Keys which
+            # aren't scalars can't be in the path of an error.
+            frame[2] = False
+            frame[3] = event.value if isinstance(event, yaml.ScalarEvent) else None
+            return None
+        frame[2] = True
+        if parent_path is None or frame[3] is None:
+            return None
+        return parent_path + (frame[3],)
+
+    index = frame[2]
+    frame[2] += 1
+    if parent_path is None:
+        return None
+    return parent_path + (index,)
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of HEPData.
+# Copyright (C) 2020 CERN.
+#
+# HEPData is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# HEPData is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with HEPData; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+"""
+On-disk cache of parsed YAML and JSON files.
+
+Files are looked up by a hash of their content and of the parser used, so
+that a file which is validated again unchanged (e.g. in a submission which
+is uploaded again after fixing another file) is unpickled instead of being
+parsed. Entries are written to a temporary file which is then renamed, so
+several processes can share a cache directory, and the least recently used
+entries are removed when the cache is bigger than its maximum size.
+
+As the entries are unpickled, the cache directory must only be writable by
+the validators.
+"""
+
+import hashlib
+import io
+import os
+import pickle
+import tempfile
+import time
+from collections import namedtuple
+
+import yaml
+
+from hepdata_validator import load_all_documents, load_document
+from .version import __version__
+from .yaml_backend import get_yaml_backend
+
+DEFAULT_MAX_SIZE = 1024 * 1024 * 1024
+# Increased when the format of the entries, or what files are parsed to,
+# changes, so that older entries are not used
+CACHE_FORMAT = 2
+ENTRY_SUFFIX = '.pickle'
+TEMP_SUFFIX = '.tmp'
+# Temporary files older than this (in seconds) were left by a process which
+# stopped while writing, and are removed
+TEMP_FILE_MAX_AGE = 3600
+# The directory is scanned at least once in this many writes, to see the
+# entries written by other processes
+RESCAN_INTERVAL = 100
+# Once the cache is bigger than its maximum size, entries are removed until
+# it is no bigger than this fraction of it, so that a full cache isn't
+# scanned again on the next write
+EVICTION_TARGET_RATIO = 0.9
+
+ParseCacheInfo = namedtuple('ParseCacheInfo', ['hits', 'misses', 'evictions', 'max_size'])
+
+
+class ParseCache(object):
+    """
+    Cache of parsed files in a directory, holding at most `max_size` bytes
+    of entries. The counters only count the lookups of this instance.
+    """
+
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        """
+        :param directory: directory of the cache, created if needed.
+        :param max_size: maximum total size of the entries in bytes, or None
+            for no limit.
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Size of the entries found by the last scan of the directory plus
+        # those written since, or None before the first scan
+        self._size = None
+        self._writes_since_scan = 0
+        # Entries are given the permissions of files created with the umask,
+        # rather than only being readable by this user, so that validators
+        # running as other users can share the cache
+        umask = os.umask(0)
+        os.umask(umask)
+        self._entry_mode = 0o666 & ~umask
+        os.makedirs(directory, exist_ok=True)
+
+    def load(self, file_path, all_documents=False, intern_strings=False):
+        """
+        Loads a file as `hepdata_validator.load_file` does, from the cache if
+        a file with the same content has been loaded before by the same
+        parser.
+
+        :param file_path: path to the file.
+        :param all_documents: whether to load the list of all documents.
+        :param intern_strings: whether to share repeated strings and small
+            mappings. The sharing is kept by the cache.
+        :raise OSError: if the file can't be read.
+        :raise yaml.YAMLError: if the file can't be parsed (which isn't
+            cached).
+        """
+        # The content which is parsed is the content which was hashed, even
+        # if the file is changed in between
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        key = _get_key(content, file_path, all_documents, intern_strings)
+        found, value = self._read(key)
+        if found:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = _load_content(content, file_path, all_documents, intern_strings)
+        self._write(key, value)
+        return value
+
+    def get_key(self, file_path, all_documents=False, intern_strings=False):
+        """
+        Returns the key of a file, a hash of its content and of what it is
+        parsed with.
+        """
+        with open(file_path, 'rb') as f:
+            return _get_key(f.read(), file_path, all_documents, intern_strings)
+
+    def cache_info(self):
+        return ParseCacheInfo(self.hits, self.misses, self.evictions, self.max_size)
+
+    def clear(self):
+        """
+        Removes all entries.
+        """
+        for name in os.listdir(self.directory):
+            if name.endswith(ENTRY_SUFFIX):
+                _remove(os.path.join(self.directory, name))
+        self._size = None
+
+    def _get_path(self, key):
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    def _read(self, key):
+        """
+        :return: tuple of whether the entry was found, and its value.
+        """
+        path = self._get_path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return False, None
+        except Exception:
+            # Unreadable entries are replaced
+            _remove(path)
+            return False, None
+
+        try:
+            # The modification time orders entries by when they were last used
+            os.utime(path)
+        except OSError:
+            pass
+        return True, value
+
+    def _write(self, key, value):
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return
+        if self.max_size is not None and len(data) > self.max_size:
+            # Never fits, so isn't cached at all
+            return
+
+        # Renaming a complete file means other processes either see the
+        # whole entry or none of it
+        try:
+            fd, temp_path = tempfile.mkstemp(suffix=TEMP_SUFFIX, dir=self.directory)
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.chmod(temp_path, self._entry_mode)
+            os.replace(temp_path, self._get_path(key))
+        except OSError:
+            _remove(temp_path)
+            return
+
+        if self.max_size is None:
+            return
+        # Scanning the whole directory for each entry would take time
+        # growing with the square of the number of files validated
+        self._writes_since_scan += 1
+        if self._size is not None:
+            self._size += len(data)
+        if self._size is None or self._size > self.max_size or \
+                self._writes_since_scan >= RESCAN_INTERVAL:
+            self._evict()
+
+    def _evict(self):
+        """
+        Removes temporary files left by stopped processes and, if the cache
+        is bigger than `max_size`, the least recently used entries until it
+        is no bigger than `EVICTION_TARGET_RATIO` of it.
+        """
+        self._writes_since_scan = 0
+        entries = []
+        now = time.time()
+        for entry in os.scandir(self.directory):
+            try:
+                stat = entry.stat()
+            except OSError:
+                # Removed by another process
+                continue
+            if entry.name.endswith(ENTRY_SUFFIX):
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+            elif entry.name.endswith(TEMP_SUFFIX) and now - stat.st_mtime > TEMP_FILE_MAX_AGE:
+                _remove(entry.path)
+
+        size = sum(entry_size for _, entry_size, _ in entries)
+        target_size = self.max_size * EVICTION_TARGET_RATIO if size > self.max_size else size
+        for _, entry_size, path in sorted(entries):
+            if size <= target_size:
+                break
+            _remove(path)
+            size -= entry_size
+            self.evictions += 1
+        self._size = size
+
+
+def _get_key(content, file_path, all_documents, intern_strings):
+    digest = hashlib.sha256()
+    # Files named .json are parsed as JSON whatever their content
+    parser = (CACHE_FORMAT, __version__, yaml.__version__, get_yaml_backend().name,
+              all_documents, intern_strings, file_path.lower().endswith('.json'))
+    digest.update(repr(parser).encode())
+    digest.update(content)
+    return digest.hexdigest()
+
+
+def _load_content(content, file_path, all_documents, intern_strings):
+    """
+    Parses the content of a file as `hepdata_validator.load_file` does.
+    """
+    stream = io.BytesIO(content)
+    # For the JSON check and the messages of the parsers
+    stream.name = file_path
+    if all_documents:
+        return list(load_all_documents(stream, intern_strings))
+    return load_document(stream, intern_strings)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
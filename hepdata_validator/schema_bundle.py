@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of HEPData.
+# Copyright (C) 2020 CERN.
+#
+# HEPData is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# HEPData is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with HEPData; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+"""
+Builds and loads the schema bundles shipped with the package.
+
+Each bundled schema version has a bundle file holding all the schemas of
+that version, with every `$ref` to another schema file replaced by the
+schema it refers to. The schemas are checked against their metaschema when
+the bundle is built, so validators can load them in a single read without
+checking them again.
+
+The bundles must be rebuilt after changing the JSON schema files::
+
+    $ python -m hepdata_validator.schema_bundle
+"""
+
+import json
+import os
+import pickle
+from urllib.parse import urldefrag, urljoin
+
+BUNDLE_FILENAME = 'schemas.pickle'
+# Increased when the layout of the bundle changes, so that bundles in an
+# older layout are ignored rather than misread
+BUNDLE_FORMAT = 1
+
+SCHEMAS_PATH = os.path.join(os.path.dirname(__file__), 'schemas')
+
+
+class SchemaBundleError(Exception):
+    """
+    Raised when a schema bundle can't be built.
+    """
+
+
+def load_schema_bundle(version_path):
+    """
+    Loads the bundle of schemas for a schema version.
+
+    :param version_path: directory containing the schemas of the version.
+    :return: dict of schemas keyed by file name, or None if there is no
+        usable bundle.
+    """
+    try:
+        with open(os.path.join(version_path, BUNDLE_FILENAME), 'rb') as f:
+            bundle = pickle.load(f)
+    except Exception:
+        return None
+
+    if not isinstance(bundle, dict) or bundle.get('format') != BUNDLE_FORMAT:
+        return None
+    return bundle['schemas']
+
+
+def build_schema_bundle(version_path):
+    """
+    Resolves and checks the schemas of a schema version.
+
+    :param version_path: directory containing the schemas of the version.
+    :return: dict holding the bundle format and the schemas, keyed by file name.
+    :raise SchemaBundleError: if a `$ref` can't be resolved.
+    :raise jsonschema.SchemaError: if a schema is invalid.
+    """
+    from jsonschema.validators import validator_for
+
+    schemas = {}
+    for filename in sorted(os.listdir(version_path)):
+        if filename.endswith('.json'):
+            with open(os.path.join(version_path, filename), 'r') as f:
+                schemas[filename] = json.load(f)
+
+    store = {}
+    for schema in schemas.values():
+        schema_id = _id_of(schema)
+        if schema_id:
+            store[urldefrag(schema_id)[0]] = schema
+
+    resolved_schemas = {}
+    for filename, schema in schemas.items():
+        schema_id = _id_of(schema) or ''
+        resolved_schema = _resolve_refs(schema, schema_id, store, [urldefrag(schema_id)[0]])
+        validator_for(resolved_schema).check_schema(resolved_schema)
+        resolved_schemas[filename] = resolved_schema
+
+    return {'format': BUNDLE_FORMAT, 'schemas': resolved_schemas}
+
+
+def write_schema_bundle(version_path):
+    """
+    Builds the bundle of schemas for a schema version and saves it in the
+    version's directory.
+
+    :param version_path: directory containing the schemas of the version.
+    :return: path of the bundle file.
+    """
+    bundle = build_schema_bundle(version_path)
+    bundle_path = os.path.join(version_path, BUNDLE_FILENAME)
+    with open(bundle_path, 'wb') as f:
+        pickle.dump(bundle, f, protocol=4)
+    return bundle_path
+
+
+def _id_of(schema):
+    # 'id' is also used as a property name, so only take string values
+    for key in ('$id', 'id'):
+        if isinstance(schema.get(key), str):
+            return schema[key]
+    return None
+
+
+def _resolve_refs(obj, base_uri, store, documents):
+    """
+    Returns a copy of `obj` with each `$ref` to another document of the
+    store replaced by the (resolved) schema it refers to. References within
+    the same document are kept, as they can be resolved from the schema
+    itself.
+    """
+    if isinstance(obj, list):
+        return [_resolve_refs(item, base_uri, store, documents) for item in obj]
+    if not isinstance(obj, dict):
+        return obj
+
+    schema_id = _id_of(obj)
+    if schema_id:
+        base_uri = urljoin(base_uri, schema_id)
+
+    if isinstance(obj.get('$ref'), str):
+        document_url, fragment = urldefrag(urljoin(base_uri, obj['$ref']))
+        if document_url != documents[-1]:
+            if document_url in documents:
+                raise SchemaBundleError(f"Circular $ref {obj['$ref']}")
+            if document_url not in store:
+                raise SchemaBundleError(f"Cannot resolve $ref {obj['$ref']}")
+            target = _resolve_fragment(store[document_url], fragment, obj['$ref'])
+            return _resolve_refs(target, document_url, store, documents + [document_url])
+
+    return {key: _resolve_refs(value, base_uri, store, documents)
+            for key, value in obj.items()}
+
+
+def _resolve_fragment(document, fragment, ref):
+    target = document
+    for part in fragment.lstrip('/').split('/') if fragment else []:
+        part = part.replace('~1', '/').replace('~0', '~')
+        try:
+            target = target[int(part)] if isinstance(target, list) else target[part]
+        except (KeyError, IndexError, ValueError):
+            raise SchemaBundleError(f"Cannot resolve $ref {ref}")
+    return target
+
+
+if __name__ == '__main__':  # pragma: no cover
+    for version in sorted(os.listdir(SCHEMAS_PATH)):
+        path = os.path.join(SCHEMAS_PATH, version)
+        if os.path.isdir(path):
+            print(write_schema_bundle(path))
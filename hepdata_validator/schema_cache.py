@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of HEPData.
+# Copyright (C) 2020 CERN.
+#
+# HEPData is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# HEPData is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with HEPData; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+from collections import OrderedDict, namedtuple
+from collections.abc import MutableMapping
+
+# Default bounds of the caches of custom and remote schemas
+DEFAULT_MAX_ENTRIES = 128
+DEFAULT_MAX_SIZE = 16 * 1024 * 1024
+
+SchemaCacheInfo = namedtuple('SchemaCacheInfo', [
+    'hits', 'misses', 'evictions', 'entries', 'size', 'max_entries', 'max_size'
+])
+
+
+class SchemaCache(MutableMapping):
+    """
+    Mapping which holds at most `max_entries` items, with a total size of at
+    most `max_size`, evicting the least recently used items when it is full.
+
+    Lookups with `[]` or `get` count as hits or misses; `in` doesn't.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_size=None, sizeof=None):
+        """
+        :param max_entries: maximum number of items, or None for no limit.
+        :param max_size: maximum total size of the items, or None for no limit.
+        :param sizeof: function returning the size of an item (required if
+            `max_size` is given).
+        """
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self._sizeof = sizeof
+        self._items = OrderedDict()
+        self._sizes = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __getitem__(self, key):
+        try:
+            value = self._items[key]
+        except KeyError:
+            self.misses += 1
+            raise
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key, value):
+        if key in self._items:
+            self._remove(key)
+
+        item_size = self._sizeof(value) if self._sizeof is not None else 0
+        if self.max_size is not None and item_size > self.max_size:
+            # Never fits, so isn't cached at all
+            return
+
+        self._items[key] = value
+        self._sizes[key] = item_size
+        self.size += item_size
+
+        while (self.max_entries is not None and len(self._items) > self.max_entries) or \
+                (self.max_size is not None and self.size > self.max_size):
+            self._remove(next(iter(self._items)))
+            self.evictions += 1
+
+    def __delitem__(self, key):
+        if key not in self._items:
+            raise KeyError(key)
+        self._remove(key)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def _remove(self, key):
+        del self._items[key]
+        self.size -= self._sizes.pop(key)
+
+    def cache_info(self):
+        """
+        Returns the counters and bounds of the cache.
+
+        :return: `SchemaCacheInfo`.
+        """
+        return SchemaCacheInfo(self.hits, self.misses, self.evictions, len(self._items),
+                               self.size, self.max_entries, self.max_size)
@@ -0,0 +1,392 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of HEPData.
+# Copyright (C) 2020 CERN.
+#
+# HEPData is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# HEPData is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with HEPData; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+"""
+Generates specialised Python validation functions from JSON schemas.
+
+The generated function answers only whether an instance is valid, and gives
+the same answer as `jsonschema` for the keywords it supports. Detailed error
+messages still come from `jsonschema`, which is only needed when the
+generated function finds a problem.
+"""
+
+import numbers
+import re
+from urllib.parse import urldefrag, urljoin
+
+from jsonschema import RefResolver
+from jsonschema._utils import equal, uniq
+
+from .discriminator import find_discriminator
+
+# Keywords which are handled by the generated code. Other keywords known to
+# jsonschema make a schema unsupported; unknown keywords are ignored, as
+# they are by jsonschema.
+SUPPORTED_KEYWORDS = {
+    '$ref', 'additionalProperties', 'allOf', 'anyOf', 'const', 'enum',
+    'exclusiveMaximum', 'exclusiveMinimum', 'format', 'items', 'maxItems',
+    'maxLength', 'maximum', 'minItems', 'minLength', 'minimum', 'not', 'oneOf',
+    'pattern', 'properties', 'required', 'type', 'uniqueItems',
+}
+
+# Meta-schemas of the drafts in which keywords alongside $ref are ignored.
+# In later drafts they apply as well as the $ref.
+REF_OVERRIDES_DRAFTS = {
+    'http://json-schema.org/draft-04/schema#',
+    'http://json-schema.org/draft-06/schema#',
+    'http://json-schema.org/draft-07/schema#',
+}
+
+# Expressions checking the JSON types which are common in HEPData files.
+# Other types are checked with the validator's type checker.
+TYPE_EXPRESSIONS = {
+    'string': 'isinstance({0}, str)',
+    'object': 'isinstance({0}, dict)',
+    'array': 'isinstance({0}, list)',
+    'boolean': 'isinstance({0}, bool)',
+    'null': '{0} is None',
+    'number': '(type({0}) in _NUMBER_TYPES or '
+              '(isinstance({0}, _Number) and not isinstance({0}, bool)))',
+}
+
+
+class UnsupportedSchemaError(Exception):
+    """
+    Raised when a schema uses keywords the schema compiler does not support.
+    """
+
+
+def compile_schema(schema, validator_cls, resolver=None):
+    """
+    Generates a function validating instances against the given schema.
+
+    :param schema: dict.
+    :param validator_cls: `jsonschema` validator class for the schema.
+    :param resolver: `jsonschema.RefResolver` used to find the targets of
+        any `$ref` in the schema.
+    :return: function taking an instance and returning a bool.
+    :raise UnsupportedSchemaError: if the schema can't be compiled.
+    """
+    return SchemaCompiler(schema, validator_cls, resolver).compile()
+
+
+class SchemaCompiler(object):
+    """
+    Generates the source of a Python module with one function for each
+    non-trivial subschema of a schema.
+    """
+
+    def __init__(self, schema, validator_cls, resolver=None):
+        self.schema = schema
+        self.validator_cls = validator_cls
+        if resolver is None:
+            resolver = RefResolver.from_schema(schema, id_of=validator_cls.ID_OF)
+        self.resolver = resolver
+        self.functions = []
+        self.function_names = {}
+        self.constants = {
+            '_NUMBER_TYPES': (int, float),
+            '_Number': numbers.Number,
+            '_uniq': uniq,
+            '_equal': equal,
+            '_is_type': validator_cls.TYPE_CHECKER.is_type,
+        }
+
+    def compile(self):
+        expr = self._expression(self.schema, 'x', '')
+        self.functions.append('def validate(x):\n    return ' + expr)
+        source = '\n\n'.join(self.functions)
+
+        namespace = dict(self.constants)
+        exec(compile(source, '<compiled schema>', 'exec'), namespace)
+        validate = namespace['validate']
+        validate.source = source
+        return validate
+
+    def _constant(self, value):
+        name = '_C%d' % len(self.constants)
+        self.constants[name] = value
+        return name
+
+    def _scope(self, schema, base_uri):
+        if isinstance(schema, dict):
+            schema_id = self.validator_cls.ID_OF(schema)
+            if isinstance(schema_id, str):
+                return urljoin(base_uri, schema_id)
+        return base_uri
+
+    def _resolve_ref(self, ref, base_uri):
+        url = urljoin(base_uri, ref)
+        document_url, fragment = urldefrag(url)
+        root_url = urldefrag(self._scope(self.schema, ''))[0]
+        if document_url in ('', root_url):
+            document = self.schema
+        elif document_url in self.resolver.store:
+            document = self.resolver.store[document_url]
+        else:
+            # Never fetch remote schemas while compiling
+            raise UnsupportedSchemaError(f'Cannot resolve $ref {ref}')
+
+        try:
+            target = self.resolver.resolve_fragment(document, fragment)
+        except Exception:
+            raise UnsupportedSchemaError(f'Cannot resolve $ref {ref}')
+        return target, document_url
+
+    def _check_keywords(self, schema):
+        for keyword in schema:
+            if keyword in self.validator_cls.VALIDATORS and keyword not in SUPPORTED_KEYWORDS:
+                raise UnsupportedSchemaError(f'Unsupported keyword {keyword}')
+
+    def _check_ref_siblings(self, schema):
+        """
+        Checks that the keywords alongside a $ref can be ignored, as they
+        are in drafts 4 to 7.
+        """
+        meta_schema_id = self.validator_cls.ID_OF(self.validator_cls.META_SCHEMA)
+        if meta_schema_id in REF_OVERRIDES_DRAFTS:
+            return
+        for keyword in schema:
+            if keyword != '$ref' and keyword in self.validator_cls.VALIDATORS:
+                raise UnsupportedSchemaError(f'Unsupported keyword {keyword} alongside $ref')
+
+    def _type_expression(self, types, var):
+        if isinstance(types, str):
+            types = [types]
+        exprs = []
+        for type_name in types:
+            if type_name in TYPE_EXPRESSIONS:
+                exprs.append(TYPE_EXPRESSIONS[type_name].format(var))
+            else:
+                exprs.append(f'_is_type({var}, {type_name!r})')
+        if len(exprs) == 1:
+            return exprs[0]
+        return '(' + ' or '.join(exprs) + ')'
+
+    def _is_simple(self, schema):
+        """Whether a schema only has keywords which check the instance as a whole."""
+        nested = ('$ref', 'properties', 'additionalProperties', 'required', 'items',
+                  'oneOf', 'anyOf', 'allOf', 'not')
+        return not any(keyword in schema for keyword in nested)
+
+    def _leaf_conditions(self, schema, var):
+        """Conditions (as expressions which are true if valid) for keywords checking the instance as a whole."""
+        conditions = []
+        types = schema.get('type')
+        if types is not None:
+            conditions.append(self._type_expression(types, var))
+        # Type checks below can be skipped if the type is known to be a single type
+        single_type = types if isinstance(types, str) else None
+
+        def guarded(type_name, condition):
+            if single_type == type_name:
+                return condition
+            return f'not {self._type_expression(type_name, var)} or {condition}'
+
+        if 'enum' in schema:
+            enum = schema['enum']
+            if all(isinstance(value, str) for value in enum):
+                conditions.append(f'(isinstance({var}, str) and {var} in {self._constant(frozenset(enum))})')
+            else:
+                conditions.append(f'any(_equal(_e, {var}) for _e in {self._constant(list(enum))})')
+        if 'const' in schema:
+            conditions.append(f'_equal({var}, {self._constant(schema["const"])})')
+
+        for keyword, type_name, condition in [
+                ('maxLength', 'string', 'len({0}) <= {1}'),
+                ('minLength', 'string', 'len({0}) >= {1}'),
+                ('maxItems', 'array', 'len({0}) <= {1}'),
+                ('minItems', 'array', 'len({0}) >= {1}'),
+                ('pattern', 'string', '{1}.search({0}) is not None'),
+                ('exclusiveMinimum', 'number', '{0} > {1}'),
+                ('exclusiveMaximum', 'number', '{0} < {1}')]:
+            if keyword in schema and keyword in self.validator_cls.VALIDATORS:
+                value = schema[keyword]
+                if keyword == 'pattern':
+                    value = re.compile(value)
+                condition = condition.format(var, self._constant(value))
+                conditions.append('(' + guarded(type_name, condition) + ')')
+
+        # In draft 4, exclusiveMinimum/exclusiveMaximum modify minimum/maximum
+        draft4_bounds = 'exclusiveMinimum' not in self.validator_cls.VALIDATORS
+        for keyword, exclusive, operators in [('minimum', 'exclusiveMinimum', ('>=', '>')),
+                                              ('maximum', 'exclusiveMaximum', ('<=', '<'))]:
+            if keyword in schema:
+                is_exclusive = draft4_bounds and schema.get(exclusive, False)
+                condition = f'{var} {operators[bool(is_exclusive)]} {self._constant(schema[keyword])}'
+                conditions.append('(' + guarded('number', condition) + ')')
+
+        if schema.get('uniqueItems'):
+            conditions.append('(' + guarded('array', '_uniq({0})'.format(var)) + ')')
+        return conditions
+
+    def _expression(self, schema, var, base_uri):
+        """
+        Returns an expression which is true if `var` is valid against `schema`,
+        where `base_uri` is the resolution scope of the parent schema.
+        """
+        if schema is True:
+            return 'True'
+        if schema is False:
+            return 'False'
+        if not isinstance(schema, dict):
+            raise UnsupportedSchemaError('Schema must be a dict or a boolean')
+        self._check_keywords(schema)
+
+        if '$ref' in schema:
+            self._check_ref_siblings(schema)
+            target, target_uri = self._resolve_ref(schema['$ref'], base_uri)
+            return f'{self._function(target, target_uri)}({var})'
+
+        if self._is_simple(schema):
+            conditions = self._leaf_conditions(schema, var)
+            if not conditions:
+                return 'True'
+            return ' and '.join(conditions)
+
+        return f'{self._function(schema, base_uri)}({var})'
+
+    def _function(self, schema, base_uri):
+        key = id(schema)
+        if key in self.function_names:
+            return self.function_names[key]
+        name = '_validate_%d' % len(self.function_names)
+        self.function_names[key] = name
+        # Keep a reference so the id can't be reused by another subschema
+        self.constants['_schema_%s' % name] = schema
+
+        base_uri = self._scope(schema, base_uri)
+        lines = []
+        self._statements(schema, 'x', base_uri, lines, '    ')
+        lines.append('    return True')
+        self.functions.append(f'def {name}(x):\n' + '\n'.join(lines))
+        return name
+
+    def _statements(self, schema, var, base_uri, lines, indent):
+        """Appends statements which return False if `var` is invalid against `schema`."""
+        if '$ref' in schema or self._is_simple(schema):
+            expr = self._expression(schema, var, base_uri)
+            if expr != 'True':
+                lines.append(f'{indent}if not ({expr}):')
+                lines.append(f'{indent}    return False')
+            return
+
+        for condition in self._leaf_conditions(schema, var):
+            lines.append(f'{indent}if not ({condition}):')
+            lines.append(f'{indent}    return False')
+
+        types = schema.get('type')
+        is_object = types == 'object'
+        is_array = types == 'array'
+
+        properties = schema.get('properties', {})
+        additional = schema.get('additionalProperties', True)
+        required = schema.get('required', [])
+        if properties or additional is not True or required:
+            if 'patternProperties' in schema:
+                raise UnsupportedSchemaError('patternProperties is not supported')
+            object_indent = indent
+            if not is_object:
+                lines.append(f'{indent}if isinstance({var}, dict):')
+                object_indent = indent + '    '
+            if required:
+                missing = ' or '.join(f'{name!r} not in {var}' for name in required)
+                lines.append(f'{object_indent}if {missing}:')
+                lines.append(f'{object_indent}    return False')
+            if additional is False:
+                names = self._constant(frozenset(properties))
+                lines.append(f'{object_indent}if not {names}.issuperset({var}):')
+                lines.append(f'{object_indent}    return False')
+            elif additional is not True:
+                names = self._constant(frozenset(properties))
+                expr = self._expression(additional, '_v', base_uri)
+                if expr != 'True':
+                    lines.append(f'{object_indent}for _k, _v in {var}.items():')
+                    lines.append(f'{object_indent}    if _k not in {names} and not ({expr}):')
+                    lines.append(f'{object_indent}        return False')
+            for name, subschema in properties.items():
+                expr = self._expression(subschema, '_v', base_uri)
+                if expr == 'True':
+                    continue
+                lines.append(f'{object_indent}if {name!r} in {var}:')
+                lines.append(f'{object_indent}    _v = {var}[{name!r}]')
+                lines.append(f'{object_indent}    if not ({expr}):')
+                lines.append(f'{object_indent}        return False')
+
+        if 'items' in schema:
+            items = schema['items']
+            if not isinstance(items, (dict, bool)):
+                raise UnsupportedSchemaError('Only a single schema is supported for items')
+            expr = self._expression(items, '_i', base_uri)
+            if expr != 'True':
+                array_indent = indent
+                if not is_array:
+                    lines.append(f'{indent}if isinstance({var}, list):')
+                    array_indent = indent + '    '
+                lines.append(f'{array_indent}for _i in {var}:')
+                lines.append(f'{array_indent}    if not ({expr}):')
+                lines.append(f'{array_indent}        return False')
+
+        for keyword in ('allOf', 'anyOf', 'oneOf'):
+            if keyword in schema:
+                exprs = ['(%s)' % self._expression(subschema, var, base_uri)
+                         for subschema in schema[keyword]]
+                if keyword == 'allOf':
+                    condition = ' and '.join(exprs) or 'True'
+                elif keyword == 'anyOf':
+                    condition = ' or '.join(exprs) or 'False'
+                else:
+                    condition = '(%s) == 1' % (' + '.join(exprs) or '0')
+                    discriminator = find_discriminator(schema[keyword], self.validator_cls)
+                    if discriminator is not None:
+                        self._discriminated_statements(discriminator, exprs, condition, var, lines, indent)
+                        continue
+                lines.append(f'{indent}if not ({condition}):')
+                lines.append(f'{indent}    return False')
+
+        if 'not' in schema:
+            expr = self._expression(schema['not'], var, base_uri)
+            lines.append(f'{indent}if {expr}:')
+            lines.append(f'{indent}    return False')
+
+    def _discriminated_statements(self, discriminator, exprs, condition, var, lines, indent):
+        """
+        Appends statements checking an object only against the `oneOf` branch
+        chosen by its keys, and other instances against all branches.
+        """
+        lines.append(f'{indent}if isinstance({var}, dict):')
+        keyword = 'if'
+        for key, index in discriminator.keys:
+            lines.append(f'{indent}    {keyword} {key!r} in {var}:')
+            lines.append(f'{indent}        if not {exprs[index]}:')
+            lines.append(f'{indent}            return False')
+            keyword = 'elif'
+        if discriminator.default is None:
+            lines.append(f'{indent}    else:')
+            lines.append(f'{indent}        return False')
+        else:
+            lines.append(f'{indent}    elif not {exprs[discriminator.default]}:')
+            lines.append(f'{indent}        return False')
+        lines.append(f'{indent}elif not ({condition}):')
+        lines.append(f'{indent}    return False')
@@ -22,7 +22,6 @@
 # waive the privileges and immunities granted to it by virtue of its status
 # as an Intergovernmental Organization or submit itself to any jurisdiction.
 
-import requests
 from abc import ABCMeta
 from abc import abstractmethod
 from copy import deepcopy
@@ -73,6 +72,10 @@ class DummySchemaResolver(SchemaResolverInterface):
         :return: dict.
         """
 
+        # Only imported when a schema is fetched, to keep imports of the
+        # validators (e.g. for offline validation) fast
+        import requests
+
         schema_resp = requests.get(schema_uri)
         schema_resp.raise_for_status()
 
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of HEPData.
+# Copyright (C) 2020 CERN.
+#
+# HEPData is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# HEPData is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with HEPData; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+"""
+Event-driven parsing of YAML data files.
+
+The values of the independent and dependent variables are constructed one
+at a time and passed to a callback instead of being kept in the document,
+so the memory used doesn't grow with the number of rows in the table.
+"""
+
+from yaml.composer import Composer, ComposerError
+from yaml.events import MappingEndEvent, MappingStartEvent, SequenceEndEvent, \
+    SequenceStartEvent, StreamEndEvent
+
+VARIABLES_KEYS = ('independent_variables', 'dependent_variables')
+MERGE_TAG = 'tag:yaml.org,2002:merge'
+
+
+def get_streaming_loader_class(loader_cls):
+    """
+    Returns a loader class which can compose single nodes from the event
+    stream. The libyaml loaders compose whole documents in C, so the Python
+    composer is added to them.
+
+    :param loader_cls: e.g. `yaml.CSafeLoader`.
+    :return: class.
+    """
+    if issubclass(loader_cls, Composer):
+        return loader_cls
+    return type('Streaming' + loader_cls.__name__, (loader_cls, Composer), {})
+
+
+class StreamedTable(object):
+    """
+    A data table parsed by `stream_table`.
+
+    :attr document: the parsed document, in which each streamed list of
+        values has been replaced by an empty list, or None if the table
+        couldn't be streamed and has to be loaded whole.
+    :attr value_counts: number of values streamed for each variable, keyed
+        by (variables key, variable index).
+    :attr is_complete: whether all variables had their values streamed, i.e.
+        the document has a list of variables for each of `VARIABLES_KEYS`,
+        each of which is a mapping with a list of values.
+    """
+
+    def __init__(self, document, value_counts, is_complete):
+        self.document = document
+        self.value_counts = value_counts
+        self.is_complete = is_complete
+
+
+def stream_table(stream, loader_cls, value_callback, variable_callback=None):
+    """
+    Parses a YAML data table, calling `value_callback` for each item of the
+    values of each variable.
+
+    :param stream: file object or str.
+    :param loader_cls: loader class, e.g. `yaml.CSafeLoader`.
+    :param value_callback: called as `value_callback(key, i, j, value)` for
+        value j of variable i of `key` ('independent_variables' or
+        'dependent_variables').
+    :param variable_callback: called as `variable_callback(key, i, count)`
+        at the end of variable i of `key`, where count is the number of
+        values streamed, or None if the variable has no list of values.
+    :return: `StreamedTable`, or None if the stream has no document. Tables
+        with merge keys, repeated keys or anchors in the mappings and lists
+        which are streamed, which loading the whole document handles
+        differently, give an incomplete `StreamedTable` without a document
+        as soon as they are found.
+    :raise yaml.YAMLError: if the stream can't be parsed.
+    """
+    loader = get_streaming_loader_class(loader_cls)(stream)
+    loader.anchors = {}
+    try:
+        streamer = _TableStreamer(loader, value_callback, variable_callback)
+        return streamer.stream()
+    except _NotStreamable:
+        return StreamedTable(None, {}, False)
+    finally:
+        loader.dispose()
+
+
+class _NotStreamable(Exception):
+    """
+    Raised when a table has to be loaded whole to be parsed the same way.
+    """
+
+
+class _TableStreamer(object):
+
+    def __init__(self, loader, value_callback, variable_callback):
+        self.loader = loader
+        self.value_callback = value_callback
+        self.variable_callback = variable_callback
+        self.value_counts = {}
+        self.is_complete = True
+
+    def stream(self):
+        loader = self.loader
+        loader.get_event()  # StreamStartEvent
+        if loader.check_event(StreamEndEvent):
+            return None
+
+        loader.get_event()  # DocumentStartEvent
+        start_mark = loader.peek_event().start_mark
+        if loader.check_event(MappingStartEvent):
+            document = self._stream_document()
+        else:
+            document = self._construct()
+            self.is_complete = False
+        loader.get_event()  # DocumentEndEvent
+
+        if not loader.check_event(StreamEndEvent):
+            event = loader.get_event()
+            raise ComposerError("expected a single document in the stream", start_mark,
+                                "but found another document", event.start_mark)
+
+        if not isinstance(document, dict) or \
+                not all(isinstance(document.get(key), list) for key in VARIABLES_KEYS):
+            self.is_complete = False
+        return StreamedTable(document, self.value_counts, self.is_complete)
+
+    def _construct(self):
+        node = self.loader.compose_node(None, None)
+        return self.loader.construct_document(node)
+
+    def _start_collection(self):
+        """
+        Consumes the start of a mapping or list which is streamed rather
+        than composed, so can't be referred to by an alias.
+        """
+        if self.loader.get_event().anchor is not None:
+            raise _NotStreamable()
+
+    def _construct_key(self, mapping):
+        """
+        Constructs the next key of a streamed mapping, which mustn't be a
+        merge key or already be in the mapping.
+        """
+        node = self.loader.compose_node(None, None)
+        if node.tag == MERGE_TAG:
+            raise _NotStreamable()
+        key = self.loader.construct_document(node)
+        try:
+            is_repeated = key in mapping
+        except TypeError:
+            # An unhashable key, reported when the document is loaded
+            raise _NotStreamable()
+        if is_repeated:
+            raise _NotStreamable()
+        return key
+
+    def _stream_document(self):
+        self._start_collection()  # MappingStartEvent
+        document = {}
+        while not self.loader.check_event(MappingEndEvent):
+            key = self._construct_key(document)
+            if key in VARIABLES_KEYS and self.loader.check_event(SequenceStartEvent):
+                document[key] = self._stream_variables(key)
+            else:
+                document[key] = self._construct()
+        self.loader.get_event()
+        return document
+
+    def _stream_variables(self, key):
+        self._start_collection()  # SequenceStartEvent
+        variables = []
+        while not self.loader.check_event(SequenceEndEvent):
+            i = len(variables)
+            if self.loader.check_event(MappingStartEvent):
+                variables.append(self._stream_variable(key, i))
+            else:
+                variables.append(self._construct())
+                self.is_complete = False
+        self.loader.get_event()
+        return variables
+
+    def _stream_variable(self, key, i):
+        self._start_collection()  # MappingStartEvent
+        variable = {}
+        while not self.loader.check_event(MappingEndEvent):
+            name = self._construct_key(variable)
+            if name == 'values' and self.loader.check_event(SequenceStartEvent):
+                self._start_collection()
+                j = 0
+                while not self.loader.check_event(SequenceEndEvent):
+                    self.value_callback(key, i, j, self._construct())
+                    j += 1
+                self.loader.get_event()
+                variable[name] = []
+                self.value_counts[(key, i)] = j
+            else:
+                variable[name] = self._construct()
+        self.loader.get_event()
+
+        if (key, i) not in self.value_counts:
+            self.is_complete = False
+        if self.variable_callback is not None:
+            self.variable_callback(key, i, self.value_counts.get((key, i)))
+        return variable
@@ -1,12 +1,9 @@
-import json
-from jsonschema import ValidationError, RefResolver
+from jsonschema import ValidationError
 import os
-from packaging import version as packaging_version
 import re
-import yaml
 from yaml.scanner import ScannerError
 
-from hepdata_validator import Validator, ValidationMessage, YamlLoader
+from hepdata_validator import Validator, ValidationMessage, load_all_documents
 
 __author__ = 'eamonnmaguire'
 
@@ -24,7 +21,13 @@ class SubmissionFileValidator(Validator):
         super(SubmissionFileValidator, self).__init__(*args, **kwargs)
         self.default_schema_file = self._get_schema_filepath(self.submission_filename)
         self.additional_info_schema = self._get_schema_filepath(self.additional_info_filename)
-        if self.schema_version >= packaging_version.parse("1.1.0"):
+
+        # Parsed schemas and resolver are borrowed from the schema registry,
+        # and reused across calls to validate
+        self._submission_file_schema = self.schema_registry.get_schema(self.submission_filename)
+        self._additional_file_section_schema = self.schema_registry.get_schema(self.additional_info_filename)
+        self._resolver = self.schema_registry.get_submission_resolver()
+        if self.schema_registry.has_v1_1_features:
             self.additional_resources_schema = self._get_schema_filepath(self.additional_resources_filename)
 
     def validate(self, **kwargs):
@@ -39,79 +42,28 @@ class SubmissionFileValidator(Validator):
         return_value = False
 
         try:
-            submission_file_schema = None
-            additional_file_section_schema = None
-
-            with open(self.default_schema_file, 'r') as submission_schema:
-                submission_file_schema = json.load(submission_schema)
-
-            with open(self.additional_info_schema, 'r') as additional_schema:
-                additional_file_section_schema = json.load(additional_schema)
-
-            resolver = None
-            if self.schema_version >= packaging_version.parse("1.1.0"):
-                with open(self.additional_resources_schema, 'r') as additional_schema:
-                    additional_resources_schema = json.load(additional_schema)
-
-                resolver = RefResolver.from_schema(additional_resources_schema)
-
-            # even though we are using the yaml package to load,
-            # it supports JSON and YAML
             data = kwargs.pop("data", None)
             file_path = kwargs.pop("file_path", None)
 
             if file_path is None:
                 raise LookupError("file_path argument must be supplied")
 
-            if data is None:
-                data_file_handle = open(file_path, 'r')
-                data = yaml.load_all(data_file_handle, Loader=YamlLoader)
+            # Errors are only located in a file loaded here
+            is_loaded = data is None
+            if data is None and self.parse_cache is not None:
+                data = self._load_file(file_path, all_documents=True)
+            elif data is None:
+                data_file_handle = open(file_path, 'rb')
+                data = load_all_documents(data_file_handle, self.intern_strings)
 
-            table_names = []
-            table_data_files = []
-            has_submission_doc = False
+            summary = SubmissionSummary()
             for data_item_index, data_item in enumerate(data):
-                if data_item is None:
-                    continue
-                try:
-                    if not data_item_index and 'data_file' not in data_item:
-                        self._validate_json_against_schema(
-                            file_path,
-                            data_item,
-                            additional_file_section_schema,
-                            resolver=resolver
-                        )
-                    else:
-                        self._validate_json_against_schema(
-                            file_path,
-                            data_item,
-                            submission_file_schema,
-                            resolver=resolver
-                        )
-                        has_submission_doc = True
-                        if not self.has_errors(file_path) and self.schema_version.major > 0:
-                            check_cmenergies(data_item)
-                            table_names.append(data_item['name'])
-                            table_data_files.append(data_item['data_file'])
-
-                except ValidationError as ve:
-                    self.add_validation_error(file_path, ve)
-
-            if not has_submission_doc and self.schema_version >= packaging_version.parse("1.1.0"):
-                # It's possible that all data items match the additional_file_section_schema
-                # just by having properties that don't match any items in there. So we need
-                # to make sure that we have at least one valid submission doc.
-                self.add_validation_message(
-                    ValidationMessage(
-                        file=file_path,
-                        message='There should be at least one document matching the submission schema.'
-                    )
-                )
-
-
-            if self.schema_version >= packaging_version.parse("1.1.0"):
-                self.check_for_duplicates(file_path, table_names, table_data_files)
+                self.validate_document(file_path, data_item_index, data_item, summary)
+            self.check_summary(file_path, summary)
 
+            self.aggregate_messages(file_path)
+            if is_loaded:
+                self.locate_messages(file_path)
             if not self.has_errors(file_path):
                 return_value = True
 
@@ -137,16 +89,79 @@ class SubmissionFileValidator(Validator):
 
         return return_value
 
+    def validate_document(self, file_path, data_item_index, data_item, summary):
+        """
+        Validates one document of a submission file, adding what is needed
+        to check the submission as a whole to the summary.
+
+        :param data_item_index: index of the document in the file.
+        :param data_item: YAML document from submission.yaml
+        :param summary: `SubmissionSummary` of the documents so far.
+        """
+        if data_item is None:
+            return
+        message_count = len(self.get_messages(file_path))
+        try:
+            if not data_item_index and 'data_file' not in data_item:
+                self._validate_json_against_schema(
+                    file_path,
+                    data_item,
+                    self._additional_file_section_schema,
+                    schema_key=self.additional_info_schema,
+                    resolver=self._resolver
+                )
+            else:
+                self._validate_json_against_schema(
+                    file_path,
+                    data_item,
+                    self._submission_file_schema,
+                    schema_key=self.default_schema_file,
+                    resolver=self._resolver
+                )
+                summary.has_submission_doc = True
+                if not self.has_errors(file_path) and self.schema_registry.has_semantic_checks:
+                    check_cmenergies(data_item)
+                    summary.table_names.append(data_item['name'])
+                    summary.table_data_files.append(data_item['data_file'])
+
+        except ValidationError as ve:
+            self.add_validation_error(file_path, ve)
+
+        for message in self.get_messages(file_path)[message_count:]:
+            message.document_index = data_item_index
+
+    def check_summary(self, file_path, summary):
+        """
+        Runs the checks on the submission file as a whole, once all its
+        documents have been validated.
+
+        :param summary: `SubmissionSummary` of the documents.
+        """
+        if not summary.has_submission_doc and self.schema_registry.has_v1_1_features:
+            # It's possible that all data items match the additional_file_section_schema
+            # just by having properties that don't match any items in there. So we need
+            # to make sure that we have at least one valid submission doc.
+            self.add_validation_message(
+                ValidationMessage(
+                    file=file_path,
+                    message='There should be at least one document matching the submission schema.'
+                )
+            )
+
+        if self.schema_registry.has_v1_1_features:
+            self.check_for_duplicates(file_path, summary.table_names, summary.table_data_files)
+
     def check_for_duplicates(self, file_path, table_names, table_data_files):
         for (key, items) in [('name', table_names), ('data_file', table_data_files)]:
             seen = set()
-            duplicates = []
+            # A dict rather than a set, to keep the order they were found in
+            duplicates = {}
 
             for x in items:
                 if x not in seen:
                     seen.add(x)
-                elif x not in duplicates:
-                    duplicates.append(x)
+                else:
+                    duplicates.setdefault(x)
 
             if duplicates:
                 for d in duplicates:
@@ -156,6 +171,18 @@ class SubmissionFileValidator(Validator):
                     ))
 
 
+class SubmissionSummary(object):
+    """
+    What is kept of the documents of a submission file to check the file as
+    a whole, so that the documents themselves don't need to be kept.
+    """
+
+    def __init__(self):
+        self.has_submission_doc = False
+        self.table_names = []
+        self.table_data_files = []
+
+
 def check_cmenergies(data_item):
     """
     Check that 'cmenergies' values are numeric unless a range like 1.7-4.7.
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of HEPData.
+# Copyright (C) 2020 CERN.
+#
+# HEPData is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# HEPData is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with HEPData; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+
+"""
+Checks of the values of large tables with NumPy, if it is installed.
+
+The arrays of `hepdata_validator.compact.CompactValues` are read by NumPy
+without copying them, so the checks run as vectorised operations instead
+of a loop over the rows. The rows they find are then checked in Python,
+which gives the messages. Tables with fewer than `MIN_ROWS` rows, or
+without NumPy, are checked by the loops in `compact`.
+"""
+
+# Smaller tables are checked in Python, as they take little time either way
+MIN_ROWS = 1000
+
+# NumPy, imported the first time a table is large enough to use it, as it
+# takes longer to import than the rest of the package. None if it isn't
+# installed.
+numpy = None
+_is_imported = False
+
+
+def can_vectorize(row_count):
+    """
+    :return: whether a table with `row_count` rows is checked with NumPy.
+    """
+    global numpy, _is_imported
+    if row_count < MIN_ROWS:
+        return False
+    if not _is_imported:
+        _is_imported = True
+        try:
+            import numpy
+        except ImportError:             # pragma: no cover
+            numpy = None
+    return numpy is not None
+
+
+def _as_numpy(a):
+    return numpy.frombuffer(a, dtype=a.typecode) if len(a) else numpy.zeros(0, a.typecode)
+
+
+def zero_error_indices(values):
+    """
+    Vectorised `CompactValues.zero_error_indices`.
+    """
+    offsets = _as_numpy(values.error_offsets)
+    is_nonzero = (_as_numpy(values.error_plus) != 0) | (_as_numpy(values.error_minus) != 0)
+    # Number of non-zero uncertainties before each offset
+    nonzero_counts = numpy.concatenate(([0], numpy.cumsum(is_nonzero)))[offsets]
+    starts, ends = offsets[:-1], offsets[1:]
+    is_all_zero = (starts < ends) & (nonzero_counts[1:] == nonzero_counts[:-1])
+    return numpy.flatnonzero(is_all_zero).tolist()
+
+
+def infinite_bin_indices(values):
+    """
+    Vectorised `CompactValues.infinite_bin_indices`.
+    """
+    from .compact import HAS_HIGH, HAS_LOW, IRREGULAR
+    flags = _as_numpy(values.flags)
+    is_bin = (flags & (HAS_LOW | HAS_HIGH | IRREGULAR)) == (HAS_LOW | HAS_HIGH)
+    is_infinite = numpy.isinf(_as_numpy(values.low)) | numpy.isinf(_as_numpy(values.high))
+    return numpy.flatnonzero(is_bin & is_infinite).tolist()
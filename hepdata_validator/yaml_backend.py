@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of HEPData.
+# Copyright (C) 2020 CERN.
+#
+# HEPData is free software; you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of the
+# License, or (at your option) any later version.
+#
+# HEPData is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with HEPData; if not, write to the
+# Free Software Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+# MA 02111-1307, USA.
+#
+# In applying this license, CERN does not
+# waive the privileges and immunities granted to it by virtue of its status
+# as an Intergovernmental Organization or submit itself to any jurisdiction.
+
+"""
+Backends used to parse and write YAML files.
+
+The validators use the active backend, which by default is `libyaml` if
+PyYAML was built with LibYAML (unless the environment variable USE_LIBYAML
+is false), or otherwise the much slower pure-Python `python` backend.
+"""
+
+import os
+from collections import OrderedDict
+
+import yaml
+
+
+class SlowYamlBackendError(Exception):
+    """
+    Raised when a slow YAML backend is selected in strict mode.
+    """
+
+
+class YamlBackend(object):
+    """
+    A YAML backend using PyYAML loader and dumper classes. Other parsers can
+    be plugged in by overriding `load`, `load_all` and `dump`, which must
+    raise a `yaml.YAMLError` if a file can't be parsed.
+
+    :attr name: name of the backend.
+    :attr loader: PyYAML loader class, also used to stream data files, or
+        None if the backend doesn't use PyYAML (in which case files are
+        streamed with PyYAML's fastest loader).
+    :attr dumper: PyYAML dumper class.
+    :attr is_fast: False for pure-Python parsers, which aren't allowed in
+        strict mode.
+    :attr description: short description, shown by `hepdata-validate`.
+    """
+
+    def __init__(self, name, loader, dumper, is_fast=True, description=''):
+        self.name = name
+        self.loader = loader
+        self.dumper = dumper
+        self.is_fast = is_fast
+        self.description = description
+
+    def load(self, stream):
+        """
+        Loads a single document.
+
+        :param stream: open file or str.
+        :return: the document, or None if the stream is empty.
+        """
+        return yaml.load(stream, Loader=self.loader)
+
+    def load_all(self, stream):
+        """
+        Loads all documents of a stream.
+
+        :param stream: open file or str.
+        :return: iterable of documents.
+        """
+        return yaml.load_all(stream, Loader=self.loader)
+
+    def dump(self, data, stream=None, **kwargs):
+        """
+        Writes a document, to `stream` if given.
+
+        :return: the YAML as a str if no stream is given.
+        """
+        return yaml.dump(data, stream, Dumper=self.dumper, **kwargs)
+
+    def __repr__(self):
+        return f"<YamlBackend {self.name}>"
+
+
+_backends = OrderedDict()
+_active_backend = None
+
+
+def register_yaml_backend(backend):
+    """
+    Adds a backend, replacing any other with the same name.
+
+    :param backend: `YamlBackend`.
+    """
+    _backends[backend.name] = backend
+
+
+def get_yaml_backend_names():
+    """
+    :return: list of the names of the registered backends.
+    """
+    return list(_backends)
+
+
+def get_yaml_backend(name=None):
+    """
+    Returns a registered backend, by default the active one.
+
+    :param name: name of the backend.
+    :return: `YamlBackend`.
+    :raise ValueError: if there is no backend with that name.
+    """
+    if name is None:
+        return _active_backend
+    try:
+        return _backends[name]
+    except KeyError:
+        raise ValueError(f"Unknown YAML backend {name}. Available backends: "
+                         + ", ".join(_backends))
+
+
+def get_default_yaml_backend_name():
+    """
+    :return: name of the backend used if no other is selected.
+    """
+    use_libyaml = os.environ.get('USE_LIBYAML', True)
+    if use_libyaml and use_libyaml not in ('False', 'false', 'f', 'F') and 'libyaml' in _backends:
+        return 'libyaml'
+    return 'python'
+
+
+def set_yaml_backend(name=None, strict=False):
+    """
+    Selects the backend used by the validators in this process.
+
+    :param name: name of a registered backend, or None for the default.
+    :param strict: if True, raise an error instead of using a slow backend.
+    :return: `YamlBackend`.
+    :raise ValueError: if there is no backend with that name.
+    :raise SlowYamlBackendError: if strict and the backend is slow.
+    """
+    global _active_backend
+    backend = get_yaml_backend(name or get_default_yaml_backend_name())
+    if strict and not backend.is_fast:
+        raise SlowYamlBackendError(
+            f"The YAML backend {backend.name} ({backend.description}) is slow. "
+            "Install LibYAML and reinstall PyYAML to use the libyaml backend."
+        )
+    _active_backend = backend
+    return backend
+
+
+register_yaml_backend(YamlBackend(
+    'python', yaml.SafeLoader, yaml.SafeDumper, is_fast=False,
+    description='pure-Python PyYAML parser'
+))
+if getattr(yaml, '__with_libyaml__', False):
+    register_yaml_backend(YamlBackend(
+        'libyaml', yaml.CSafeLoader, yaml.CSafeDumper,
+        description='PyYAML with the LibYAML C parser'
+    ))
+
+set_yaml_backend()
@@ -18,6 +18,7 @@ test_requirements = [
 extras_require = {
     'all': [],
     'docs': ['Sphinx>7'],
+    'numpy': ['numpy'],
     'tests': test_requirements,
 }
 
@@ -42,7 +43,7 @@ setup(
     author_email='info@hepdata.net',
     description=__doc__,
     keywords='hepdata validator',
-    package_data={'hepdata_validator': ["schemas/**/*.json"]},
+    package_data={'hepdata_validator': ["schemas/**/*.json", "schemas/**/*.pickle"]},
     long_description=long_description,
     long_description_content_type='text/x-rst',
     packages=["hepdata_validator"],
@@ -0,0 +1,91 @@
+import os
+
+import pytest
+import yaml
+
+from hepdata_validator import ValidationMessage
+from hepdata_validator.aggregation import aggregate_messages
+from hepdata_validator.data_file_validator import DataFileValidator
+from hepdata_validator.full_submission_validator import FullSubmissionValidator
+
+
+def _zero_uncertainty_message(i, j):
+    return ValidationMessage(
+        file='data.yaml', message=f"Uncertainties should not all be zero in 'dependent_variables.values[{j}].errors'",
+        path=('dependent_variables', i, 'values', j, 'errors')
+    )
+
+
+def test_aggregate_messages():
+    messages = [ValidationMessage(file='data.yaml', message='First message')]
+    messages += [_zero_uncertainty_message(0, j) for j in (1, 2, 3, 5, 7, 8, 9)]
+    messages += [_zero_uncertainty_message(1, j) for j in (0, 1, 2)]
+    messages += [_zero_uncertainty_message(2, j) for j in (0, 1)]
+    messages += [ValidationMessage(file='data.yaml', message=f"Error in 'values[{j}].errors[{j}]'")
+                 for j in range(3)]
+    aggregated = aggregate_messages(messages)
+    assert [m.message for m in aggregated] == [
+        'First message',
+        "Uncertainties should not all be zero in 'dependent_variables.values[1-3,5,7-9].errors' (7 occurrences)",
+        "Uncertainties should not all be zero in 'dependent_variables.values[0-2].errors' (3 occurrences)",
+        # Too few to be merged
+        "Uncertainties should not all be zero in 'dependent_variables.values[0].errors'",
+        "Uncertainties should not all be zero in 'dependent_variables.values[1].errors'",
+        # More than one index differs
+        "Error in 'values[0].errors[0]'",
+        "Error in 'values[1].errors[1]'",
+        "Error in 'values[2].errors[2]'",
+    ]
+    assert aggregated[1].path == ('dependent_variables', 0, 'values', 1, 'errors')
+    assert aggregated[2].path == ('dependent_variables', 1, 'values', 0, 'errors')
+    assert [(m.message, m.path) for message in aggregated for m in message.expand()] == \
+        [(m.message, m.path) for m in messages]
+    # Merged messages aren't merged again
+    assert aggregate_messages(aggregated) == aggregated
+
+
+def _write_table(file_path, size):
+    values = [{'value': i, 'errors': [{'symerror': 0}]} for i in range(size)]
+    values[size // 2]['errors'][0]['symerror'] = 1
+    data = {'independent_variables': [{'header': {'name': 'x'},
+                                       'values': [{'value': i} for i in range(size)]}],
+            'dependent_variables': [{'header': {'name': 'y'}, 'qualifiers': [], 'values': values}]}
+    with open(file_path, 'w') as f:
+        yaml.dump(data, f)
+
+
+@pytest.mark.parametrize("kwargs", [{}, {'streaming': True}, {'compact_values': True}])
+def test_aggregate_errors(tmp_path, kwargs):
+    file = str(tmp_path / 'data.yaml')
+    _write_table(file, 100)
+    validator = DataFileValidator(**kwargs)
+    assert not validator.validate(file_path=file)
+    messages = validator.get_messages(file)
+
+    validator = DataFileValidator(aggregate_errors=True, **kwargs)
+    assert not validator.validate(file_path=file)
+    [message] = validator.get_messages(file)
+    assert message.message == \
+        "Uncertainties should not all be zero in 'dependent_variables.values[0-49,51-99].errors' (99 occurrences)"
+    assert (message.line, message.column) == (messages[0].line, messages[0].column)
+    assert [(m.message, m.path, m.line) for m in validator.get_messages(file, expand=True)] == \
+        [(m.message, m.path, m.line if i == 0 else None) for i, m in enumerate(messages)]
+    assert validator.get_messages(expand=True)[file][1].message == messages[1].message
+
+
+def test_aggregate_errors_submission(tmp_path):
+    _write_table(str(tmp_path / 'data.yaml'), 10)
+    documents = [{'comment': 'A submission'},
+                 {'name': 'Table 1', 'description': 'A table', 'keywords': [], 'data_file': 'data.yaml'}]
+    with open(tmp_path / 'submission.yaml', 'w') as f:
+        yaml.dump_all(documents, f)
+    data_file = os.path.join(str(tmp_path), 'data.yaml')
+
+    validator = FullSubmissionValidator(aggregate_errors=True)
+    assert not validator.validate(directory=str(tmp_path))
+    messages = validator.get_messages(data_file)
+    assert [m.message for m in messages] == [
+        f'{data_file} is invalid HEPData YAML.',
+        "Uncertainties should not all be zero in 'dependent_variables.values[0-4,6-9].errors' (9 occurrences)"
+    ]
+    assert len(validator.get_messages(data_file, expand=True)) == 10
@@ -1,4 +1,6 @@
 import os
+import subprocess
+import sys
 
 from click.testing import CliRunner
 import pytest
@@ -68,3 +70,17 @@ def test_invalid_yaml(data_path, cli_runner):
     lines = result.output.splitlines()
     assert lines[0] == f"ERROR: {file} is invalid."
     assert lines[1].strip().startswith(f"error - {file} (Table 1) is invalid HEPData YAML.")
+
+
+def test_offline_validation_imports(data_path):
+    """
+    Tests that validating a local submission doesn't import the modules
+    which are only needed for remote schemas
+    """
+    submission_dir = os.path.join(data_path, 'TestHEPSubmission')
+    code = "import sys; from hepdata_validator.cli import validate; " \
+           f"validate(['-d', {submission_dir!r}], standalone_mode=False); " \
+           "print('requests' in sys.modules, 'urllib3' in sys.modules)"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    assert result.returncode == 0
+    assert result.stdout.splitlines()[-1] == 'False False'
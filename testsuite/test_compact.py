@@ -0,0 +1,152 @@
+import glob
+import os
+
+import pytest
+import yaml
+from mock import patch
+from hepdata_validator import YamlDumper, YamlLoader, vectorized
+from hepdata_validator.compact import CompactValues, load_compact_table
+from hepdata_validator.data_file_validator import DataFileValidator
+
+
+@pytest.fixture(scope="module")
+def data_path():
+    base_dir = os.path.dirname(os.path.realpath(__file__))
+    return os.path.join(base_dir, 'test_data')
+
+
+@pytest.fixture
+def numpy_module():
+    pytest.importorskip('numpy')
+    # NumPy is imported when first needed, so import it before patching it
+    assert vectorized.can_vectorize(vectorized.MIN_ROWS)
+    return vectorized.numpy
+
+
+VALUES = [
+    {'value': 1},
+    {'value': 1.5, 'low': 1, 'high': 2.0},
+    {'low': float('-inf'), 'high': 2},
+    {'value': 2, 'errors': []},
+    {'value': 3.5, 'errors': [{'symerror': 0.1, 'label': 'stat'},
+                              {'asymerror': {'plus': 1, 'minus': -0.5}, 'label': 'sys'},
+                              {'symerror': 2}]},
+    {'value': 4, 'errors': [{'symerror': 0}, {'asymerror': {'plus': 0, 'minus': 0.0}}]},
+    # Values which are kept as they are
+    {'value': '1-2'},
+    {'value': 5, 'errors': [{'symerror': '10%', 'label': 'stat'}]},
+    {'value': 6, 'errors': [{'asymerror': {'plus': 1}}]},
+    {'value': True},
+    {'value': 2 ** 60},
+    {'value': 1, 'extra': 1},
+    {'value': 1, 'errors': [{'symerror': 1, 'label': None}]},
+    'abc',
+]
+
+
+def test_compact_values():
+    values = CompactValues(VALUES)
+    assert len(values) == len(VALUES)
+    assert list(values) == VALUES
+    assert [type(v.get('value')) for v in values[:6]] == [int, float, type(None), int, float, int]
+    assert values[-1] == 'abc'
+    assert values[1:3] == VALUES[1:3]
+    assert sorted(values.irregular_values) == list(range(6, len(VALUES)))
+    assert values.labels == ['stat', 'sys']
+    assert values.zero_error_indices() == [5]
+    assert values.infinite_bin_indices() == [2]
+
+
+def test_load_compact_table():
+    table = {
+        'independent_variables': [{'header': {'name': 'X'}, 'values': VALUES[:3]}],
+        'dependent_variables': [{'header': {'name': 'Y'}, 'values': VALUES[3:]},
+                                {'header': {'name': 'Z'}, 'values': []}],
+    }
+    streamed = []
+    compact_table = load_compact_table(yaml.dump(table, Dumper=YamlDumper), YamlLoader,
+                                       lambda key, i, j, value: streamed.append((key, i, j)))
+    assert compact_table.is_complete
+    assert len(streamed) == len(VALUES)
+    for key in ('independent_variables', 'dependent_variables'):
+        for variable in compact_table.document[key]:
+            assert isinstance(variable['values'], CompactValues)
+    assert compact_table.document == table
+
+
+def test_compact_values_size():
+    rows = [{'value': i + 0.5, 'errors': [{'symerror': 0.1, 'label': 'stat'},
+                                          {'asymerror': {'plus': 0.2, 'minus': -0.2}, 'label': 'sys'}]}
+            for i in range(1000)]
+    values = CompactValues(rows)
+    assert not values.irregular_values
+    # 1 + 8 * 4 bytes per value and 1 + 8 * 3 bytes per uncertainty
+    assert values.nbytes() < 100 * len(rows)
+
+
+@pytest.mark.parametrize("schema_version", ['0.1.0', '1.1.1'])
+def test_compact_validation(data_path, schema_version):
+    """
+    Tests that validating with compact values gives the same results as
+    loading the whole file
+    """
+    files = glob.glob(os.path.join(data_path, '*.yaml'))
+    files += glob.glob(os.path.join(data_path, 'TestHEPSubmission*', '*.yaml'))
+    for file in files:
+        validator = DataFileValidator(schema_version=schema_version)
+        compact_validator = DataFileValidator(schema_version=schema_version, compact_values=True)
+        assert compact_validator.validate(file_path=file) == validator.validate(file_path=file)
+        assert sorted(m.message for m in compact_validator.get_messages(file)) == \
+            sorted(m.message for m in validator.get_messages(file))
+
+
+@pytest.mark.parametrize("values", [
+    VALUES,
+    VALUES * 3 + [{'low': 1, 'high': float('inf'), 'errors': [{'symerror': 0}]}],
+    [],
+    ['abc'],
+    [{'value': 1, 'errors': []}],
+])
+def test_vectorized_checks(numpy_module, values):
+    """
+    Tests that the checks with NumPy find the same values as those in Python
+    """
+    compact_values = CompactValues(values)
+    with patch.object(vectorized, 'numpy', None):
+        expected = (compact_values.zero_error_indices(), compact_values.infinite_bin_indices())
+    assert expected != ([], []) or len(values) < 2
+    with patch.object(vectorized, 'MIN_ROWS', 0):
+        assert (compact_values.zero_error_indices(), compact_values.infinite_bin_indices()) == expected
+
+
+def test_vectorized_validation(numpy_module, tmp_path):
+    """
+    Tests that the messages for a large table checked with NumPy are those
+    of the checks in Python
+    """
+    rows = vectorized.MIN_ROWS + 10
+    table = {
+        'independent_variables': [{
+            'header': {'name': 'x'},
+            'values': [{'low': i, 'high': i + 1} for i in range(rows - 2)]
+                      + [{'low': float('-inf'), 'high': 0}, {'low': rows, 'high': float('inf')}],
+        }],
+        'dependent_variables': [{
+            'header': {'name': 'y'},
+            'values': [{'value': i, 'errors': [{'symerror': 0 if i % 100 == 0 else 0.5},
+                                               {'asymerror': {'plus': 0, 'minus': 0}}]}
+                       for i in range(rows)],
+        }],
+    }
+    file = str(tmp_path / 'data.yaml')
+    with open(file, 'w') as f:
+        yaml.dump(table, f, Dumper=YamlDumper)
+
+    messages = []
+    for module in (numpy_module, None):
+        with patch.object(vectorized, 'numpy', module):
+            validator = DataFileValidator(compact_values=True)
+            assert not validator.validate(file_path=file)
+            messages.append([(m.message, m.path) for m in validator.get_messages(file)])
+    assert len(messages[0]) == rows // 100 + 1
+    assert messages[0] == messages[1]
@@ -1,6 +1,9 @@
+import json
 import os
 import pytest
-from hepdata_validator import VALID_SCHEMA_VERSIONS
+import yaml
+from mock import patch
+from hepdata_validator import VALID_SCHEMA_VERSIONS, SchemaRegistry, get_compiled_validator, get_schema_key, load_schema_file
 from hepdata_validator.data_file_validator import DataFileValidator
 from hepdata_validator.data_file_validator import UnsupportedDataSchemaException
 
@@ -417,3 +420,445 @@ def test_invalid_schema_file():
         assert "Invalid schema file" in str(excinfo.value)
     finally:
         VALID_SCHEMA_VERSIONS.pop()
+
+
+def test_compiled_validator_cache(validator_v1, data_path):
+    """
+    Tests that the data schema is only loaded and checked once per process
+    """
+    schema = load_schema_file(validator_v1.default_schema_file)
+    assert load_schema_file(validator_v1.default_schema_file) is schema
+
+    compiled = get_compiled_validator(schema, schema_key=validator_v1.default_schema_file)
+    assert get_compiled_validator(schema, schema_key=validator_v1.default_schema_file) is compiled
+
+    file = os.path.join(data_path, 'valid_file.yaml')
+    with patch.object(type(compiled), 'check_schema') as check_schema:
+        assert DataFileValidator().validate(file_path=file) is True
+        assert DataFileValidator().validate(file_path=file) is True
+        check_schema.assert_not_called()
+
+
+def test_compiled_validator_cache_custom_schema(data_path):
+    """
+    Tests that custom schemas with the same content share a compiled validator
+    """
+    validator = DataFileValidator()
+    custom_schema_path = os.path.join(data_path, 'custom_data_schema.json')
+    schema_a = validator.load_custom_schema('type_a', custom_schema_path)
+    schema_b = validator.load_custom_schema('type_b', custom_schema_path)
+
+    # The file is only parsed once by the schema registry
+    assert schema_a is schema_b
+    assert validator._get_custom_schema_key('type_a', schema_a) == get_schema_key(schema_b)
+    assert get_compiled_validator(schema_a) is get_compiled_validator(schema_b)
+
+    # A replaced schema is not matched with the key of the original
+    validator.custom_data_schemas['type_a'] = {}
+    assert validator._get_custom_schema_key('type_a', {}) is None
+
+
+def test_check_validity_first(data_path):
+    """
+    Tests that errors are only collected for invalid files when checking
+    validity first, and that messages are the same either way
+    """
+    valid_file = os.path.join(data_path, 'valid_file.yaml')
+    invalid_file = os.path.join(data_path, 'invalid_missing_values.yaml')
+    schema = load_schema_file(DataFileValidator().default_schema_file)
+    compiled = get_compiled_validator(schema, schema_key=DataFileValidator().default_schema_file)
+
+    validator = DataFileValidator()
+    assert validator.check_validity_first is True
+    with patch.object(type(compiled), 'iter_errors') as iter_errors:
+        assert validator.validate(file_path=valid_file) is True
+        iter_errors.assert_not_called()
+
+    messages = {}
+    for check_validity_first in (True, False):
+        validator = DataFileValidator(check_validity_first=check_validity_first)
+        assert validator.validate(file_path=valid_file) is True
+        assert validator.validate(file_path=invalid_file) is False
+        messages[check_validity_first] = [m.message for m in validator.get_messages(invalid_file)]
+
+    assert messages[True] == messages[False]
+    assert len(messages[True]) == 1
+
+
+def test_custom_schema_cache(data_path):
+    """
+    Tests that custom schemas are stored once per content with their
+    compiled validators, and that the number loaded by a validator is bounded
+    """
+    registry = SchemaRegistry()
+    validator = DataFileValidator(schema_registry=registry, max_custom_schemas=2)
+    custom_schema_path = os.path.join(data_path, 'custom_data_schema.json')
+    remote_schema_path = os.path.join(data_path, 'custom_remote_data_schema.json')
+    file = os.path.join(data_path, 'valid_file_custom.yaml')
+
+    schema_a = validator.load_custom_schema('type_a', custom_schema_path)
+    assert validator.validate(file_path=file, file_type='type_a') is True
+    assert len(registry.custom_schemas) == 1
+    custom_schema = registry.custom_schemas[get_schema_key(schema_a)]
+    assert custom_schema.schema is schema_a
+    compiled = custom_schema.validator
+    assert custom_schema.is_valid is not None
+
+    # The same content under another path is only stored once
+    with open(custom_schema_path, 'r') as f:
+        schema_copy = json.load(f)
+    assert registry.get_custom_schema(schema_copy) is custom_schema
+
+    # Validating again reuses the compiled validators
+    with patch.object(type(compiled), 'check_schema') as check_schema:
+        assert validator.validate(file_path=file, file_type='type_a') is True
+        check_schema.assert_not_called()
+    assert registry.custom_schemas.cache_info().hits > 0
+
+    # Types loaded from a given path are all kept
+    validator.load_custom_schema('type_b', custom_schema_path)
+    validator.load_custom_schema('type_c', remote_schema_path)
+    assert list(validator.custom_data_schemas) == ['type_a', 'type_b', 'type_c']
+    assert len(registry.custom_schemas) == 2
+    assert validator.validate(file_path=file, file_type='type_a') is True
+
+    # Types of the schema folder loaded by validate are dropped, and loaded
+    # again when they are used
+    with patch.object(registry, 'get_custom_schema_filepath', return_value=custom_schema_path):
+        for custom_type in ('type_d', 'type_e', 'type_f'):
+            assert validator.validate(file_path=file, file_type=custom_type) is True
+        assert list(validator._default_custom_data_schemas) == ['type_e', 'type_f']
+        assert validator._default_custom_data_schemas.cache_info().evictions == 1
+        assert validator.validate(file_path=file, file_type='type_d') is True
+    assert 'type_d' in validator._default_custom_data_schemas
+    assert 'type_d' not in validator.custom_data_schemas
+
+
+def test_custom_schema_explicit_loads(data_path):
+    """
+    Tests that a custom schema loaded from a given path is kept however many
+    other schemas are loaded, even without autoloading remote schemas
+    """
+    validator = DataFileValidator(max_custom_schemas=2)
+    custom_schema_path = os.path.join(data_path, 'custom_data_schema.json')
+    file = os.path.join(data_path, 'valid_file_custom.yaml')
+    for i in range(5):
+        validator.load_custom_schema(f'type_{i}', custom_schema_path)
+    assert len(validator.custom_data_schemas) == 5
+    with patch.object(validator.schema_registry, 'load_custom_schema', side_effect=FileNotFoundError):
+        assert validator.validate(file_path=file, file_type='type_0') is True
+
+
+def test_json_fast_path(validator_v1, data_path, tmp_path):
+    """
+    Tests that files which look like JSON are parsed with the json module,
+    and with YAML if they aren't valid JSON
+    """
+    with open(os.path.join(data_path, 'valid_file.yaml'), 'r') as f:
+        contents = json.dumps(yaml.safe_load(f))
+    json_file = str(tmp_path / 'json_data.json')
+    with open(json_file, 'w') as f:
+        f.write(contents)
+    sniffed_file = str(tmp_path / 'json_data.yaml')
+    with open(sniffed_file, 'w') as f:
+        f.write('\n  ' + contents)
+
+    with patch('yaml.load') as yaml_load:
+        assert validator_v1.validate(file_path=json_file) is True
+        assert validator_v1.validate(file_path=sniffed_file) is True
+        yaml_load.assert_not_called()
+
+    # YAML with a .json extension, or starting with a flow mapping, and
+    # JSON which the json module doesn't accept (with a trailing comma)
+    assert validator_v1.validate(file_path=os.path.join(data_path, 'valid_file.json')) is True
+    yaml_file = str(tmp_path / 'yaml_data.json')
+    with open(os.path.join(data_path, 'valid_file.yaml'), 'r') as f:
+        with open(yaml_file, 'w') as g:
+            g.write(f.read())
+    assert validator_v1.validate(file_path=yaml_file) is True
+
+    flow_file = str(tmp_path / 'flow_data.yaml')
+    with open(flow_file, 'w') as f:
+        f.write('{independent_variables: [], dependent_variables: []}\n')
+    assert validator_v1.validate(file_path=flow_file) is True
+
+    invalid_file = str(tmp_path / 'invalid_data.json')
+    with open(invalid_file, 'w') as f:
+        f.write('{"independent_variables": [}\n')
+    assert validator_v1.validate(file_path=invalid_file) is False
+    message = validator_v1.get_messages(invalid_file)[0].message
+    assert message.startswith('There was a problem parsing the file.')
+    assert 'invalid_data.json' in message
+
+
+@pytest.mark.parametrize("intern_strings", [False, True])
+def test_json_constants(tmp_path, intern_strings):
+    """
+    Tests that files with NaN or Infinity, which the json module accepts but
+    aren't JSON, are parsed as YAML, where they are strings
+    """
+    contents = '{"independent_variables": [{"header": {"name": "x"}, "values": ' \
+               '[{"low": -Infinity, "high": 1}, {"low": 1, "high": 2}]}], ' \
+               '"dependent_variables": [{"header": {"name": "y"}, "values": [{"value": NaN}, {"value": 1}]}]}'
+    for name in ('constants.json', 'constants.yaml'):
+        file = str(tmp_path / name)
+        with open(file, 'w') as f:
+            f.write(contents)
+        validator = DataFileValidator(intern_strings=intern_strings)
+        assert validator.validate(file_path=file) is False
+        assert validator.get_messages(file)[0].message.startswith(
+            "{'low': '-Infinity', 'high': 1} is not valid under any of the given schemas")
+
+
+def test_json_numbers(tmp_path):
+    """
+    Tests that numbers in JSON files are read as by YAML, which reads numbers
+    without a decimal point or a sign in the exponent as strings, with or
+    without streaming or compact values
+    """
+    file = str(tmp_path / 'numbers.json')
+    with open(file, 'w') as f:
+        f.write('{"independent_variables": [{"header": {"name": "x"}, "values": '
+                '[{"low": 1e5, "high": 2e5}, {"low": 1.5e+5, "high": 2.5E-1}]}], '
+                '"dependent_variables": [{"header": {"name": "y"}, "values": '
+                '[{"value": 1.0e5}, {"value": -2.}]}]}')
+    results = []
+    for kwargs in ({}, {'streaming': True}, {'compact_values': True}):
+        validator = DataFileValidator(**kwargs)
+        results.append((validator.validate(file_path=file),
+                        [m.message for m in validator.get_messages(file)]))
+    assert results[0][0] is False
+    assert results[0][1][0].startswith(
+        "{'low': '1e5', 'high': '2e5'} is not valid under any of the given schemas")
+    assert results[1] == results[0]
+    assert results[2] == results[0]
+
+
+def _check_messages(check, *args):
+    """
+    Runs a check of a new validator, returning its messages and the type of
+    any exception it raised.
+    """
+    validator = DataFileValidator()
+    exception = None
+    try:
+        check(validator)(*args)
+    except Exception as e:
+        exception = type(e)
+    return [(m.message, m.path) for m in validator.get_messages('data.yaml')], exception
+
+
+@pytest.mark.parametrize("value", [
+    {'value': 1.0},
+    {'value': 1.0, 'errors': []},
+    {'value': 1.0, 'errors': [{'symerror': 0.1}, {'asymerror': {'plus': 0.2, 'minus': -0.1}}]},
+    {'value': 1.0, 'errors': [{'symerror': '10%'}, {'symerror': 2}, {'symerror': float('nan')}]},
+    {'value': 1.0, 'errors': [{'symerror': 0}, {'symerror': '0%'}, {'symerror': 0.0}]},
+    {'value': 1.0, 'errors': [{'asymerror': {'plus': 0, 'minus': -0.0}}]},
+    {'value': 1.0, 'errors': [{'asymerror': {'plus': 0, 'minus': 0.1}}, {'symerror': 0}]},
+    {'value': 1.0, 'errors': [{'symerror': ''}, {'symerror': 'abc'}, {'symerror': 0.1}]},
+    {'value': 1.0, 'errors': [{'asymerror': {'plus': '', 'minus': ''}}]},
+    {'value': 1.0, 'errors': [{'asymerror': {'plus': 0.1}}]},
+    {'value': 1.0, 'errors': [{'symerror': 10 ** 400}]},
+    {'value': 1.0, 'errors': [{'symerror': True}, {'symerror': None}]},
+    {'value': 1.0, 'errors': [{'label': 'stat'}]},
+    {'value': 1.0, 'errors': [0.1]},
+    {'value': 1.0, 'errors': [[]]},
+    {'value': 1.0, 'errors': None},
+    {'value': 1.0, 'errors': 'abc'},
+    {'value': 1.0, 'errors': {'symerror': 0}},
+    [1.0],
+])
+def test_quick_error_value_checks(value):
+    """
+    Tests that values passed by the quick check of uncertainties get the same
+    messages as values which are checked fully
+    """
+    data = {'dependent_variables': [{'values': [value, value]}]}
+    assert _check_messages(lambda v: v.check_error_values, 'data.yaml', data) == \
+        _check_messages(lambda v: lambda *args: [v._check_error_value(*args, i, value, 0)
+                                                for i in range(2)], 'data.yaml', data)
+
+
+@pytest.mark.parametrize("values", [
+    [{'value': 1.0}, {'low': 1, 'high': 2.5}, {'value': '1.5-2'}, {'value': 'a-b'}],
+    [{'low': float('-inf'), 'high': 1}, {'low': '-inf', 'high': 2}, {'low': 2, 'high': float('inf')}],
+    [{'low': float('-inf'), 'high': float('inf')}, {'low': 'a', 'high': 1}, {'low': 10 ** 400, 'high': 1}],
+    [{'low': None, 'high': 1}, 1.0],
+])
+def test_quick_independent_value_checks(values):
+    """
+    Tests that independent variable values passed by the quick check get the
+    same messages as values which are checked fully
+    """
+    data = {'independent_variables': [{'values': values}]}
+
+    def check_fully(validator):
+        def check(file_path, data):
+            underflows, overflows = {}, {}
+            for j, v in enumerate(values):
+                validator._check_independent_variable_value(file_path, data, 0, j, v,
+                                                            underflows, overflows)
+            validator._check_independent_variable_bins(file_path, data, 0, len(values) - 1,
+                                                       underflows, overflows)
+        return check
+
+    assert _check_messages(lambda v: v.check_independent_variable_values, 'data.yaml', data) == \
+        _check_messages(check_fully, 'data.yaml', data)
+
+
+@pytest.mark.parametrize("data,messages", [
+    # Stopped the checks with an exception, as the first uncertainty has
+    # neither 'symerror' nor 'asymerror'
+    ({'independent_variables': [{'values': [{'value': '1-2'}]}],
+      'dependent_variables': [{'values': [{'value': 1, 'errors': [{'label': 'stat'}]},
+                                          {'value': 2, 'errors': [{'symerror': 'abc'}]}]}]},
+     ["Invalid error value abc: value must be a number (possibly ending in %) in "
+      "'dependent_variables.values[1].errors[0].symerror'",
+      "Inconsistent length of 'values' list: independent_variables [1], dependent_variables [2]",
+      "independent_variable 'value' must not be a string range (use 'low' and 'high' to represent a range): "
+      "'1-2' in 'independent_variables[0].values[0].value' (expected: {'type': 'number or string (not a range)'})"]),
+    # Gave each uncertainty without a value the values of the previous one,
+    # repeating 'symerror cannot be empty' and the zero uncertainties of the
+    # previous value
+    ({'independent_variables': [{'values': [{'value': 1}] * 3}],
+      'dependent_variables': [{'values': [{'value': 1, 'errors': [{'symerror': ''}, {'label': 'stat'}]},
+                                          {'value': 2, 'errors': [{'symerror': 0}]},
+                                          {'value': 3, 'errors': [{'label': 'stat'}]}]}]},
+     ["symerror cannot be empty in 'dependent_variables.values[0].errors[0].symerror'",
+      "Uncertainties should not all be zero in 'dependent_variables.values[1].errors'"]),
+    # Stopped the checks, as the characters of the string were taken as
+    # uncertainties
+    ({'independent_variables': [{'values': [{'value': '1-2'}]}],
+      'dependent_variables': [{'values': [{'value': 1, 'errors': 'abc'}]}, {'values': []}]},
+     ["Inconsistent length of 'values' list: independent_variables [1], dependent_variables [1, 0]",
+      "independent_variable 'value' must not be a string range (use 'low' and 'high' to represent a range): "
+      "'1-2' in 'independent_variables[0].values[0].value' (expected: {'type': 'number or string (not a range)'})"]),
+])
+def test_semantic_messages_uncertainties_without_value(data, messages):
+    """
+    Tests the messages of the checks which aren't part of the schema for
+    tables with uncertainties without 'symerror' or 'asymerror', which
+    changed when the values were made to be checked one at a time (see
+    `DataFileValidator.check_error_values`)
+    """
+    validator = DataFileValidator()
+    validator._check_semantics('data.yaml', data)
+    assert [m.message for m in validator.get_messages('data.yaml')] == messages
+
+
+def _write_invalid_table(file_path, size):
+    """
+    Writes a table whose values each have a schema error, and then
+    uncertainties which are all zero.
+    """
+    values = [{'value': i, 'errors': [{'symerror': 1, 'label': 0.5}]} for i in range(size)]
+    values += [{'value': i, 'errors': [{'symerror': 0}]} for i in range(size)]
+    data = {'independent_variables': [{'header': {'name': 'x'},
+                                       'values': [{'value': i} for i in range(2 * size)]}],
+            'dependent_variables': [{'header': {'name': 'y'}, 'qualifiers': [], 'values': values}]}
+    with open(file_path, 'w') as f:
+        yaml.dump(data, f)
+
+
+@pytest.mark.parametrize("kwargs", [{}, {'streaming': True}, {'compact_values': True}])
+def test_max_errors_per_file(tmp_path, kwargs):
+    """
+    Tests that the checks of a file stop once it has too many errors
+    """
+    file = str(tmp_path / 'data.yaml')
+    _write_invalid_table(file, 20)
+    validator = DataFileValidator(**kwargs)
+    assert not validator.validate(file_path=file)
+    messages = [m.message for m in validator.get_messages(file)]
+    assert len(messages) == 40
+
+    for limit in (5, 30):
+        validator = DataFileValidator(max_errors_per_file=limit, **kwargs)
+        with patch.object(validator, 'add_validation_error', wraps=validator.add_validation_error) \
+                as add_validation_error:
+            assert not validator.validate(file_path=file)
+        assert add_validation_error.call_count == limit + 1
+        assert [m.message for m in validator.get_messages(file)] == messages[:limit] + \
+            [f"Too many errors: stopped checking the file after {limit} errors."]
+        assert validator.error_limit_reached(file)
+
+    validator = DataFileValidator(max_errors_per_file=40, **kwargs)
+    assert not validator.validate(file_path=file)
+    assert [m.message for m in validator.get_messages(file)] == messages
+    assert not validator.error_limit_reached(file)
+
+
+def test_max_errors_per_file_checks():
+    """
+    Tests that the checks stop once a file has too many errors when they are
+    called directly
+    """
+    summary = "Too many errors: stopped checking the file after 2 errors."
+    data = {'dependent_variables': [{'values': [{'value': 1, 'errors': [{'symerror': 0}]}] * 5}]}
+    validator = DataFileValidator(max_errors_per_file=2)
+    validator.check_error_values('data.yaml', data)
+    messages = validator.get_messages('data.yaml')
+    assert [m.message for m in messages][2:] == [summary]
+    assert [m.path for m in messages] == \
+        [('dependent_variables', 0, 'values', 0, 'errors'), ('dependent_variables', 0, 'values', 1, 'errors'), None]
+
+    data = {'independent_variables': [{'values': [{'value': '1-2'}] * 5}]}
+    validator = DataFileValidator(max_errors_per_file=2)
+    validator.check_independent_variable_values('data.yaml', data)
+    assert [m.message for m in validator.get_messages('data.yaml')][2:] == [summary]
+
+
+@pytest.mark.parametrize("kwargs", [{}, {'streaming': True}, {'compact_values': True}])
+def test_uncertainty_without_value(tmp_path, kwargs):
+    """
+    Tests that uncertainties with neither 'symerror' nor 'asymerror' are
+    skipped by the checks of the uncertainties, which used to give them the
+    values of the previous uncertainty, or stop the checks if there was none
+    (see `DataFileValidator.check_error_values`)
+    """
+    values = [
+        {'value': 1, 'errors': [{'symerror': 0.1}]},
+        {'value': 2, 'errors': [{'label': 'stat'}]},
+        {'value': 3, 'errors': [{'symerror': 0}, {'label': 'sys'}]},
+        {'value': 4, 'errors': [{'symerror': 'abc'}]},
+        {'value': 5, 'errors': [{'symerror': 0}]},
+    ]
+    data = {'independent_variables': [{'header': {'name': 'x'}, 'values': [{'value': i} for i in range(4)]}],
+            'dependent_variables': [{'header': {'name': 'y'}, 'values': values}]}
+    file = str(tmp_path / 'data.yaml')
+    with open(file, 'w') as f:
+        yaml.safe_dump(data, f)
+    validator = DataFileValidator(**kwargs)
+    assert not validator.validate(file_path=file)
+    messages = [m.message for m in validator.get_messages(file)]
+    assert [message.split(' (expected')[0] for message in messages] == [
+        "{'label': 'stat'} is not valid under any of the given schemas in 'dependent_variables[0].values[1].errors[0]'",
+        "{'label': 'sys'} is not valid under any of the given schemas in 'dependent_variables[0].values[2].errors[1]'",
+        "Uncertainties should not all be zero in 'dependent_variables.values[2].errors'",
+        "Invalid error value abc: value must be a number (possibly ending in %) in "
+        "'dependent_variables.values[3].errors[0].symerror'",
+        "Uncertainties should not all be zero in 'dependent_variables.values[4].errors'",
+        "Inconsistent length of 'values' list: independent_variables [4], dependent_variables [5]",
+    ]
+
+    # The first uncertainty of the table has no value
+    values = [
+        {'value': 1, 'errors': [{'label': 'stat'}, {'symerror': ''}]},
+        {'value': 2, 'errors': [{'symerror': 0}]},
+    ]
+    data = {'independent_variables': [{'header': {'name': 'x'}, 'values': [{'value': '1-2'}]}],
+            'dependent_variables': [{'header': {'name': 'y'}, 'values': values}]}
+    with open(file, 'w') as f:
+        yaml.safe_dump(data, f)
+    validator = DataFileValidator(**kwargs)
+    assert not validator.validate(file_path=file)
+    messages = [m.message for m in validator.get_messages(file)]
+    assert [message.split(' (expected')[0] for message in messages] == [
+        "{'label': 'stat'} is not valid under any of the given schemas in 'dependent_variables[0].values[0].errors[0]'",
+        "symerror cannot be empty in 'dependent_variables.values[0].errors[1].symerror'",
+        "Uncertainties should not all be zero in 'dependent_variables.values[1].errors'",
+        "Inconsistent length of 'values' list: independent_variables [1], dependent_variables [2]",
+        "independent_variable 'value' must not be a string range (use 'low' and 'high' to represent a range): "
+        "'1-2' in 'independent_variables[0].values[0].value'",
+    ]
@@ -0,0 +1,76 @@
+from jsonschema import Draft4Validator, Draft7Validator
+
+from hepdata_validator import get_compiled_validator, load_schema_file
+from hepdata_validator.data_file_validator import DataFileValidator
+from hepdata_validator.discriminator import find_discriminator
+from hepdata_validator.schema_compiler import compile_schema
+
+VALUE_BRANCHES = [
+    {"type": "object", "properties": {"value": {"type": ["string", "number"]}},
+     "required": ["value"], "additionalProperties": False},
+    {"type": "object", "properties": {"value": {"type": "number"}, "low": {"type": "number"},
+                                      "high": {"type": "number"}},
+     "required": ["low", "high"], "additionalProperties": False},
+]
+
+
+####################################################
+#             OneOfDiscriminator tests             #
+####################################################
+
+
+def test_find_discriminator():
+    """
+    Tests finding the keys which choose between the branches of a oneOf
+    """
+    discriminator = find_discriminator(VALUE_BRANCHES, Draft7Validator)
+    assert discriminator.keys == [('low', 1)]
+    assert discriminator.default == 0
+    assert discriminator.select({'low': 1, 'high': 2}) == 1
+    assert discriminator.select({'high': 2}) == 0
+    assert discriminator.select({'value': 1}) == 0
+
+    # Branches which don't forbid other keys can't be distinguished
+    assert find_discriminator([{"required": ["symerror"]}, {"required": ["asymerror"]}], Draft4Validator) is None
+    assert find_discriminator([VALUE_BRANCHES[0], {"$ref": "#/definitions/range"}], Draft7Validator) is None
+    assert find_discriminator(VALUE_BRANCHES[:1], Draft7Validator) is None
+
+
+def test_discriminated_one_of_errors():
+    """
+    Tests that jsonschema only reports errors from the chosen branch
+    """
+    schema = {"$schema": "http://json-schema.org/draft-07/schema#", "oneOf": VALUE_BRANCHES}
+    validator = get_compiled_validator(schema)
+
+    errors = list(validator.iter_errors({'low': 1, 'high': '2'}))
+    assert len(errors) == 1
+    assert errors[0].message == "{'low': 1, 'high': '2'} is not valid under any of the given schemas"
+    assert [e.message for e in errors[0].context] == ["'2' is not of type 'number'"]
+    assert list(errors[0].context[0].schema_path) == [1, 'properties', 'high', 'type']
+
+    assert list(validator.iter_errors({'low': 1, 'high': 2})) == []
+    assert len(list(validator.iter_errors(1))) == 1
+
+    is_valid = compile_schema(schema, type(validator))
+    assert "'low' in x" in is_valid.source
+    for instance in [{'low': 1, 'high': 2}, {'low': 1, 'high': '2'}, {'value': 'a'}, {'high': 2}, {}, 1]:
+        assert is_valid(instance) == Draft7Validator(schema).is_valid(instance)
+
+
+def test_discriminated_data_schema_messages():
+    """
+    Tests that messages for invalid values are the same as for the standard
+    oneOf keyword
+    """
+    validator = DataFileValidator(check_validity_first=False)
+    schema = load_schema_file(validator.default_schema_file)
+    plain_validator = Draft7Validator(schema)
+
+    for value in [{'low': 1}, {'low': 'a', 'high': 2}, {'value': 'x', 'low': 1, 'high': 2}, {}]:
+        data = {'independent_variables': [{'header': {'name': 'x'}, 'values': [value]}],
+                'dependent_variables': [{'header': {'name': 'y'}, 'values': [{'value': 1}]}]}
+        validator.clear_messages()
+        assert validator.validate(file_path='test.yaml', data=data) is False
+        expected = [e.message for e in plain_validator.iter_errors(data)]
+        assert [m.message.split(" in '")[0] for m in validator.get_messages('test.yaml')] == expected
@@ -1,7 +1,11 @@
 import os
 
 import pytest
+import yaml
+from mock import patch
 
+from hepdata_validator import LATEST_SCHEMA_VERSION, YamlDumper, get_schema_registry
+from hepdata_validator.data_file_validator import DataFileValidator
 from hepdata_validator.full_submission_validator import FullSubmissionValidator, SchemaType
 
 
@@ -401,3 +405,257 @@ def test_v0_schema(validator_v1, validator_v0, data_path, capsys):
     # Should be valid with v0 validator
     is_valid = validator_v0.validate(directory=submission_dir)
     assert is_valid
+
+
+def test_shared_schema_registry(validator_v1, validator_v0, data_path):
+    """
+    Tests that validators of the same schema version share a schema registry
+    """
+    assert validator_v1.schema_registry is get_schema_registry(LATEST_SCHEMA_VERSION)
+    assert validator_v1._submission_file_validator.schema_registry is validator_v1.schema_registry
+    assert validator_v1._data_file_validator.schema_registry is validator_v1.schema_registry
+    assert FullSubmissionValidator().schema_registry is validator_v1.schema_registry
+    assert validator_v0.schema_registry is not validator_v1.schema_registry
+
+    assert validator_v1.schema_registry.has_semantic_checks
+    assert validator_v1.schema_registry.has_v1_1_features
+    assert not validator_v0.schema_registry.has_semantic_checks
+    assert not validator_v0.schema_registry.has_v1_1_features
+
+    # Custom schemas are parsed once per registry, but each validator keeps
+    # its own set of loaded types
+    custom_schema_path = os.path.join(data_path, 'custom_data_schema.json')
+    schema = validator_v1._data_file_validator.load_custom_schema('different', custom_schema_path)
+    other = FullSubmissionValidator()._data_file_validator
+    assert 'different' not in other.custom_data_schemas
+    assert other.load_custom_schema('different', custom_schema_path) is schema
+
+    submission_dir = os.path.join(data_path, 'TestHEPSubmission')
+    assert FullSubmissionValidator().validate(directory=submission_dir)
+
+
+def test_remote_schema_registry(validator_v1):
+    """
+    Tests that remote schemas retrieved by one validator are not
+    downloaded again by another validator sharing its registry
+    """
+    schema_url = 'https://testing.com/test-project/schemas/1.0.0/remote_schema.json'
+    local_path = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                              'test_data', 'custom_data_schema.json')
+    registry = validator_v1.schema_registry
+    registry.remote_schemas[schema_url] = local_path
+    try:
+        with patch('hepdata_validator.full_submission_validator.HTTPSchemaDownloader.get_schema_spec') as get_schema_spec:
+            validator_v1.load_remote_schema(schema_url)
+            get_schema_spec.assert_not_called()
+        assert schema_url in validator_v1._data_file_validator.custom_data_schemas
+    finally:
+        registry.remote_schemas.pop(schema_url)
+
+
+def test_single_yaml_in_memory(validator_v1, data_path, tmp_path, monkeypatch):
+    """
+    Tests that the tables of a single YAML file are validated without
+    writing them out, and that their size is still checked
+    """
+    monkeypatch.chdir(tmp_path)
+    file = os.path.join(data_path, '1512299_invalid.yaml')
+    with patch('hepdata_validator.full_submission_validator.DataFileValidator.validate',
+               autospec=True, side_effect=DataFileValidator.validate) as validate:
+        assert not validator_v1.validate(file=file)
+    assert validate.call_args_list[0].kwargs['data']['dependent_variables']
+    assert os.listdir(str(tmp_path)) == []
+
+    with open(file, 'r') as f:
+        docs = list(yaml.safe_load_all(f))
+    table = {'independent_variables': docs[1]['independent_variables'],
+             'dependent_variables': docs[1]['dependent_variables']}
+    table_size = len(yaml.dump(table, Dumper=YamlDumper))
+    with patch('hepdata_validator.full_submission_validator.INDIVIDUAL_FILE_SIZE_LIMIT', table_size - 1):
+        validator = FullSubmissionValidator()
+        assert not validator.validate(file=file)
+    messages = [m.message for m in validator.get_messages('Table_1.yaml')]
+    assert messages == [f"Size of data_file 'Table_1.yaml' ({table_size} bytes) is bigger than the limit of "
+                        f"{table_size - 1} bytes. Try adding the file as an additional_resource instead."]
+
+
+def _get_messages(validator):
+    return {file: [(m.message, m.level) for m in messages]
+            for file, messages in validator.get_messages().items()}
+
+
+@pytest.mark.parametrize("schema_version", ['0.1.0', LATEST_SCHEMA_VERSION])
+def test_streaming_submission(data_path, schema_version):
+    """
+    Tests that validating the documents of submission files as they are
+    parsed gives the same results as loading them all first
+    """
+    submissions = [{'directory': os.path.join(data_path, name)}
+                   for name in ('TestHEPSubmission', 'TestHEPSubmission_invalid', 'TestHEPSubmission_v0')]
+    submissions += [{'archive': os.path.join(data_path, 'TestHEPSubmission_invalid.zip')}]
+    submissions += [{'file': os.path.join(data_path, name)}
+                    for name in ('1512299.yaml', '1512299_invalid.yaml', '1512299_invalid_yaml.yaml.gz',
+                                 'invalid_submission.yaml', 'invalid_submission_duplicates.yaml',
+                                 'invalid_syntax_submission.yaml', 'invalid_cmenergies.yaml',
+                                 'valid_submission_empty.yaml', 'valid_file.yaml')]
+    if schema_version == '0.1.0':
+        # Tables with duplicate names overwrite each other unless streaming
+        submissions = [s for s in submissions if not s.get('file', '').endswith('duplicates.yaml')]
+    for submission in submissions:
+        validator = FullSubmissionValidator(schema_version=schema_version)
+        streaming_validator = FullSubmissionValidator(schema_version=schema_version, streaming=True)
+        assert streaming_validator.validate(**submission) == validator.validate(**submission)
+        assert _get_messages(streaming_validator) == _get_messages(validator)
+        assert streaming_validator.valid_files == validator.valid_files
+        assert streaming_validator.submission_docs is None
+
+
+def test_streaming_submission_docs(data_path):
+    file = os.path.join(data_path, '1512299.yaml')
+    validator = FullSubmissionValidator()
+    assert validator.validate(file=file)
+
+    streaming_validator = FullSubmissionValidator(streaming=True, keep_submission_docs=True)
+    assert streaming_validator.validate(file=file)
+    assert streaming_validator.submission_docs == validator.submission_docs
+    # The tables have been validated and released
+    assert 'dependent_variables' not in streaming_validator.submission_docs[1]
+    assert streaming_validator._data_tables == {}
+
+
+def test_file_size_limits(data_path):
+    """
+    Tests that the sizes of the inputs are checked before they are parsed
+    """
+    submission_dir = os.path.join(data_path, 'TestHEPSubmission')
+    submission_file = os.path.join(submission_dir, 'submission.yaml')
+    validator = FullSubmissionValidator(submission_file_size_limit=100)
+    with patch('hepdata_validator.load_file') as load_file:
+        assert not validator.validate(directory=submission_dir)
+    load_file.assert_not_called()
+    size = os.path.getsize(submission_file)
+    assert [m.message for m in validator.get_messages(submission_file)] == \
+        [f"Size of submission file {submission_file} ({size} bytes) is bigger than the limit of 100 bytes."]
+    assert FullSubmissionValidator(submission_file_size_limit=size).validate(directory=submission_dir)
+
+    validator = FullSubmissionValidator(data_file_size_limit=100)
+    assert not validator.validate(directory=submission_dir)
+    data_file = os.path.join(submission_dir, 'data1.yaml')
+    assert validator.get_messages(data_file)[0].message.startswith(
+        f"Size of data_file 'data1.yaml' ({os.path.getsize(data_file)} bytes) is bigger than the limit of 100 bytes.")
+    assert FullSubmissionValidator(data_file_size_limit=None).validate(directory=submission_dir)
+
+    file = os.path.join(data_path, '1512299.yaml')
+    validator = FullSubmissionValidator(single_yaml_file_size_limit=100)
+    assert not validator.validate(file=file)
+    assert validator.get_messages(file)[0].message == \
+        f"Size of single YAML file {file} ({os.path.getsize(file)} bytes) is bigger than the limit of 100 bytes."
+
+    gzip_file = os.path.join(data_path, '1512299.yaml.gz')
+    validator = FullSubmissionValidator(single_yaml_file_size_limit=100)
+    assert not validator.validate(file=gzip_file)
+    assert validator.get_messages(gzip_file)[0].message == \
+        f"Size of the decompressed file {gzip_file} is bigger than the limit of 100 bytes."
+    assert FullSubmissionValidator(single_yaml_file_size_limit=os.path.getsize(file)).validate(file=gzip_file)
+
+    archive = os.path.join(data_path, 'TestHEPSubmission.zip')
+    validator = FullSubmissionValidator(archive_size_limit=100)
+    with patch('shutil.unpack_archive') as unpack_archive:
+        assert not validator.validate(archive=archive)
+    unpack_archive.assert_not_called()
+    assert validator.get_messages(archive)[0].message.startswith(
+        f"Size of the files in archive {archive} (")
+
+
+def test_memory_mapped_files(data_path, capsys):
+    """
+    Tests that validating memory-mapped files gives the same messages
+    """
+    with patch('hepdata_validator.MMAP_THRESHOLD', 0):
+        validator = FullSubmissionValidator()
+        assert validator.validate(directory=os.path.join(data_path, 'TestHEPSubmission'))
+        assert validator.validate(file=os.path.join(data_path, '1512299.yaml'))
+
+        file = os.path.join(data_path, 'invalid_syntax_submission.yaml')
+        assert not validator.validate(file=file)
+        validator.print_errors(file)
+        out, err = capsys.readouterr()
+        assert f'in "{file}", line 9, column 1' in out
+
+
+def test_max_errors_per_submission(tmp_path):
+    """
+    Tests that data files aren't validated once the submission has too many
+    errors, and that each only gets what is left of the limit
+    """
+    values = [{'value': i, 'errors': [{'symerror': 0}]} for i in range(10)]
+    data = {'independent_variables': [{'header': {'name': 'x'},
+                                       'values': [{'value': i} for i in range(10)]}],
+            'dependent_variables': [{'header': {'name': 'y'}, 'qualifiers': [], 'values': values}]}
+    documents = [{'comment': 'A submission'}]
+    for i in range(3):
+        with open(tmp_path / f'data{i}.yaml', 'w') as f:
+            yaml.dump(data, f)
+        documents.append({'name': f'Table {i}', 'description': 'A table', 'keywords': [],
+                          'data_file': f'data{i}.yaml'})
+    with open(tmp_path / 'submission.yaml', 'w') as f:
+        yaml.dump_all(documents, f)
+    submission_file = str(tmp_path / 'submission.yaml')
+    data_files = [str(tmp_path / f'data{i}.yaml') for i in range(3)]
+
+    validator = FullSubmissionValidator()
+    assert not validator.validate(directory=str(tmp_path))
+    # A message saying the file is invalid and one for each value
+    assert [len(validator.get_messages(file)) for file in data_files] == [11, 11, 11]
+
+    validator = FullSubmissionValidator(max_errors_per_submission=15)
+    assert not validator.validate(directory=str(tmp_path))
+    assert len(validator.get_messages(data_files[0])) == 11
+    assert [m.message for m in validator.get_messages(data_files[1])][-1] == \
+        "Too many errors in the submission: stopped checking the file after 4 errors."
+    assert len(validator.get_messages(data_files[1])) == 6
+    assert not validator.has_errors(data_files[2])
+    assert [m.message for m in validator.get_messages(submission_file)] == \
+        ["Too many errors: stopped validating the submission after 15 errors. Data files not checked: 1."]
+
+    for kwargs in ({}, {'streaming': True}):
+        validator = FullSubmissionValidator(max_errors_per_file=3, max_errors_per_submission=12, **kwargs)
+        assert not validator.validate(directory=str(tmp_path))
+        # A message saying the file is invalid, which isn't counted in the
+        # limit for the file, its first errors and one saying it wasn't
+        # checked any further
+        for file, limit, message in ((data_files[0], 3, "Too many errors: stopped checking"),
+                                     (data_files[1], 3, "Too many errors: stopped checking"),
+                                     (data_files[2], 2, "Too many errors in the submission: stopped checking")):
+            messages = [m.message for m in validator.get_messages(file)]
+            assert messages[-1] == f"{message} the file after {limit} errors."
+            assert len(messages) == limit + 2
+        assert not validator.has_errors(submission_file)
+        # The limit of the data file validator isn't changed
+        assert validator._data_file_validator.max_errors_per_file == 3
+
+
+def test_max_errors_per_file_single_yaml(tmp_path):
+    """
+    Tests that the messages of each table of a single YAML file are limited
+    separately
+    """
+    values = [{'value': i, 'errors': [{'symerror': 0}]} for i in range(10)]
+    documents = [{'comment': 'A submission'}]
+    for i in range(3):
+        documents.append({'name': f'Table {i}', 'description': 'A table', 'keywords': [],
+                          'independent_variables': [{'header': {'name': 'x'},
+                                                     'values': [{'value': j} for j in range(10)]}],
+                          'dependent_variables': [{'header': {'name': 'y'}, 'qualifiers': [],
+                                                   'values': values}]})
+    file = str(tmp_path / 'single.yaml')
+    with open(file, 'w') as f:
+        yaml.dump_all(documents, f)
+
+    validator = FullSubmissionValidator(max_errors_per_file=3)
+    assert not validator.validate(file=file)
+    messages = [m.message for m in validator.get_messages(file)]
+    for i in range(3):
+        assert f'{file} (Table {i}) is invalid HEPData YAML.' in messages
+    assert messages.count("Too many errors: stopped checking the file after 3 errors.") == 3
+    assert len(messages) == 15
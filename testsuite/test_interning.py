@@ -0,0 +1,96 @@
+import io
+import os
+
+import pytest
+from mock import ANY, patch
+
+from hepdata_validator import load_all_documents, load_document, load_file
+from hepdata_validator.full_submission_validator import FullSubmissionValidator
+from hepdata_validator.submission_file_validator import SubmissionFileValidator
+from hepdata_validator.interning import Interner
+from hepdata_validator.parse_cache import ParseCache
+
+
+@pytest.fixture(scope="module")
+def data_path():
+    base_dir = os.path.dirname(os.path.realpath(__file__))
+    return os.path.join(base_dir, 'test_data')
+
+
+def _qualifiers(document):
+    return [qualifier for variable in document['dependent_variables']
+            for qualifier in variable.get('qualifiers', [])]
+
+
+def _is_shared(items):
+    return len({id(item) for item in items}) < len(items)
+
+
+def test_interned_yaml(data_path):
+    file = os.path.join(data_path, 'valid_data_with_percent.yaml')
+    data = load_file(file, intern_strings=True)
+    assert data == load_file(file)
+
+    qualifiers = _qualifiers(data)
+    assert _is_shared(qualifiers)
+    assert _is_shared([qualifier['name'] for qualifier in qualifiers])
+
+
+def test_interned_documents_not_shared():
+    stream = io.StringIO("a: b\n---\na: b\n---\n- {a: b}\n- {a: b}\n- {a: 1}\n- {a: 1}\n")
+    first, second, items = load_all_documents(stream, intern_strings=True)
+    assert first == second and first is not second
+    assert items[0] is items[1] and items[0] is not first
+    # Mappings holding numbers aren't shared
+    assert items[2] is not items[3]
+
+
+def test_interned_json():
+    text = '[{"name": "x", "units": "GeV"}, {"name": "x", "units": "GeV"}, ' \
+           '{"label": "stat", "symerror": 0.1}, {"label": "stat", "symerror": 0.1}, ' \
+           '{"names": ["a", "b"]}]'
+    data = load_document(io.StringIO(text), intern_strings=True)
+    assert data[0] is data[1]
+    assert data[2] is not data[3] and data[2]['label'] is data[3]['label']
+    assert data[4] == {'names': ['a', 'b']}
+
+
+def test_interner_large_mappings():
+    interner = Interner()
+    mapping = {str(i): str(i) for i in range(10)}
+    assert interner.intern_mapping(mapping) is mapping
+    assert interner.intern_mapping(dict(mapping)) is not mapping
+    assert interner.intern_mapping({'a': 'b'}) is interner.intern_mapping({'a': 'b'})
+    # The order of the items is kept
+    assert list(interner.intern_mapping({'b': 'b', 'a': 'a'})) == ['b', 'a']
+    assert list(interner.intern_mapping({'a': 'a', 'b': 'b'})) == ['a', 'b']
+
+
+def test_interning_validators(data_path, tmp_path):
+    file = os.path.join(data_path, '1512299.yaml')
+    validator = FullSubmissionValidator(intern_strings=True)
+    assert validator.validate(file=file)
+    default_validator = FullSubmissionValidator()
+    assert default_validator.validate(file=file)
+    assert validator.submission_docs == default_validator.submission_docs
+    assert validator._data_tables == default_validator._data_tables
+
+    cache = ParseCache(str(tmp_path))
+    assert cache.load(file, True, intern_strings=True) == cache.load(file, True)
+    assert cache.misses == 2
+    data = cache.load(file, True, intern_strings=True)
+    assert cache.hits == 1
+    assert _is_shared([qualifier for document in data[1:] for qualifier in _qualifiers(document)])
+
+
+def test_interning_submission_file_validator(data_path):
+    """
+    Tests that the submission file validator interns strings without a
+    parse cache
+    """
+    file = os.path.join(data_path, 'TestHEPSubmission', 'submission.yaml')
+    validator = SubmissionFileValidator(intern_strings=True)
+    with patch('hepdata_validator.submission_file_validator.load_all_documents',
+               wraps=load_all_documents) as load:
+        assert validator.validate(file_path=file)
+    load.assert_called_once_with(ANY, True)
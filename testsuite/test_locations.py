@@ -0,0 +1,82 @@
+import os
+
+import pytest
+from mock import patch
+
+from hepdata_validator import YamlLoader
+from hepdata_validator.data_file_validator import DataFileValidator
+from hepdata_validator.full_submission_validator import FullSubmissionValidator
+from hepdata_validator.locations import find_locations
+
+
+@pytest.fixture(scope="module")
+def data_path():
+    base_dir = os.path.dirname(os.path.realpath(__file__))
+    return os.path.join(base_dir, 'test_data')
+
+
+def test_find_locations():
+    yaml_text = """a: 1
+b:
+  - x: [1, 2]
+  - {y: 3}
+---
+c:
+  d: 4
+"""
+    paths = [(0, ()), (0, ('a',)), (0, ('b', 0, 'x', 1)), (0, ('b', 1)), (0, ('b', 2)),
+             (1, ('c', 'd')), (2, ())]
+    assert find_locations(yaml_text, paths, YamlLoader) == {
+        (0, ()): (1, 1),
+        (0, ('a',)): (1, 4),
+        (0, ('b', 0, 'x', 1)): (3, 12),
+        (0, ('b', 1)): (4, 5),
+        (1, ('c', 'd')): (7, 6),
+    }
+
+
+def test_find_locations_stops_parsing():
+    # The parsing error after the last node isn't reached
+    assert find_locations("a: 1\nb: [", [(0, ('a',))], YamlLoader) == {(0, ('a',)): (1, 4)}
+
+
+@pytest.mark.parametrize("kwargs", [{}, {'streaming': True}, {'compact_values': True}])
+def test_data_file_locations(data_path, capsys, kwargs):
+    file = os.path.join(data_path, 'invalid_file.yaml')
+    validator = DataFileValidator(**kwargs)
+    assert not validator.validate(file_path=file)
+    messages = validator.get_messages(file)
+    assert [(m.line, m.column) for m in messages] == \
+        [(18, 36), (20, 24), (21, 25), (22, 24), (2, 1)]
+    # The path of uncertainties includes the dependent variable, unlike the message
+    assert messages[1].path == ('dependent_variables', 0, 'values', 1, 'errors', 2, 'symerror')
+
+    validator.print_errors(file, show_locations=True)
+    out, err = capsys.readouterr()
+    assert out.splitlines()[0].strip() == \
+        "error - line 18, column 36: 0.443 is not of type 'string' in " \
+        "'dependent_variables[0].values[1].errors[0].label' (expected: {'type': 'string'})"
+
+
+def test_locations_only_for_errors(data_path):
+    with patch('hepdata_validator.locations.find_locations') as find_locations:
+        assert DataFileValidator().validate(file_path=os.path.join(data_path, 'valid_file.yaml'))
+        file = os.path.join(data_path, 'invalid_file.yaml')
+        validator = DataFileValidator(locate_errors=False)
+        assert not validator.validate(file_path=file)
+    find_locations.assert_not_called()
+    assert all(m.line is None for m in validator.get_messages(file))
+
+
+def test_submission_locations(data_path):
+    file = os.path.join(data_path, '1512299_invalid.yaml')
+    validator = FullSubmissionValidator()
+    assert not validator.validate(file=file)
+    messages = validator.get_messages(file)
+    assert messages[0].line is None
+    assert (messages[1].line, messages[1].column) == (11, 5)
+
+    file = os.path.join(data_path, 'invalid_submission.yaml')
+    validator = FullSubmissionValidator(streaming=True)
+    assert not validator.validate(file=file)
+    assert [m.line for m in validator.get_messages(file)] == [None, 6, 6]
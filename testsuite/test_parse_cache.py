@@ -0,0 +1,175 @@
+import os
+import shutil
+import threading
+
+import pytest
+from mock import patch
+
+from hepdata_validator.data_file_validator import DataFileValidator
+from hepdata_validator.full_submission_validator import FullSubmissionValidator
+from hepdata_validator.parse_cache import ParseCache, _load_content
+from hepdata_validator.submission_file_validator import SubmissionFileValidator
+
+
+@pytest.fixture(scope="module")
+def data_path():
+    base_dir = os.path.dirname(os.path.realpath(__file__))
+    return os.path.join(base_dir, 'test_data')
+
+
+def _entries(cache):
+    return sorted(name for name in os.listdir(cache.directory) if name.endswith('.pickle'))
+
+
+def test_parse_cache(data_path, tmp_path):
+    cache = ParseCache(str(tmp_path / 'cache'))
+    file = os.path.join(data_path, 'valid_file.yaml')
+    data = cache.load(file)
+    assert cache.cache_info()[:3] == (0, 1, 0)
+    with patch('hepdata_validator.parse_cache._load_content') as load_content:
+        assert cache.load(file) == data
+        # A copy with the same content is found too
+        copy = str(tmp_path / 'copy.yaml')
+        shutil.copy(file, copy)
+        assert cache.load(copy) == data
+    load_content.assert_not_called()
+    assert cache.cache_info()[:3] == (2, 1, 0)
+
+    # A list of documents is cached separately
+    assert cache.load(file, all_documents=True) == [data]
+    with open(copy, 'a') as f:
+        f.write('\n# changed\n')
+    assert cache.load(copy) == data
+    assert cache.cache_info()[:3] == (2, 3, 0)
+    assert len(_entries(cache)) == 3
+
+    cache.clear()
+    assert _entries(cache) == []
+
+
+def test_parse_cache_reads_once(data_path, tmp_path):
+    """
+    Tests that a file is read once, so that what is parsed is what was
+    hashed, and that the entries can be read by other users
+    """
+    file = str(tmp_path / 'data.yaml')
+    shutil.copy(os.path.join(data_path, 'valid_file.yaml'), file)
+    cache = ParseCache(str(tmp_path / 'cache'))
+
+    def change_file(*args):
+        with open(file, 'a') as f:
+            f.write('extra: 1\n')
+        return _load_content(*args)
+
+    with patch('hepdata_validator.parse_cache._load_content', side_effect=change_file):
+        data = cache.load(file)
+    assert 'extra' not in data
+    # The entry of the old content holds the old content
+    shutil.copy(os.path.join(data_path, 'valid_file.yaml'), file)
+    assert cache.load(file) == data
+    assert cache.hits == 1
+
+    umask = os.umask(0o022)
+    try:
+        cache = ParseCache(str(tmp_path / 'shared_cache'))
+        cache.load(file)
+    finally:
+        os.umask(umask)
+    [entry] = _entries(cache)
+    assert os.stat(os.path.join(cache.directory, entry)).st_mode & 0o777 == 0o644
+
+
+def test_parse_cache_eviction(data_path, tmp_path):
+    files = [os.path.join(data_path, name) for name in
+             ('valid_file.yaml', 'invalid_file.yaml', 'file_with_zero_uncertainty.yaml')]
+    cache = ParseCache(str(tmp_path))
+    for file in files:
+        cache.load(file)
+    sizes = [os.path.getsize(os.path.join(cache.directory, name)) for name in _entries(cache)]
+
+    cache = ParseCache(str(tmp_path), max_size=sum(sizes) - 1)
+    # Use the first file, so that the second is the least recently used
+    os.utime(os.path.join(cache.directory, cache.get_key(files[1]) + '.pickle'), (0, 0))
+    cache.load(files[0])
+    changed_file = str(tmp_path / 'changed.yaml')
+    shutil.copy(files[0], changed_file)
+    with open(changed_file, 'a') as f:
+        f.write('\n# changed\n')
+    cache.load(changed_file)
+    # Entries are removed until the cache is no bigger than 90% of max_size
+    assert cache.evictions == 2
+    assert _entries(cache) == sorted(cache.get_key(file) + '.pickle' for file in (files[0], changed_file))
+
+
+def test_parse_cache_scans(data_path, tmp_path):
+    """
+    Tests that the cache directory isn't scanned for every entry written
+    """
+    files = []
+    for i in range(5):
+        files.append(str(tmp_path / f'file{i}.yaml'))
+        with open(files[-1], 'w') as f:
+            f.write(f'a: {i}\n')
+    cache = ParseCache(str(tmp_path / 'cache'))
+    with patch('os.scandir', wraps=os.scandir) as scandir:
+        for file in files:
+            cache.load(file)
+    assert scandir.call_count == 1
+    assert len(_entries(cache)) == 5
+
+
+def test_parse_cache_unreadable_entry(data_path, tmp_path):
+    cache = ParseCache(str(tmp_path))
+    file = os.path.join(data_path, 'valid_file.yaml')
+    data = cache.load(file)
+    with open(os.path.join(cache.directory, cache.get_key(file) + '.pickle'), 'wb') as f:
+        f.write(b'not a pickle')
+    assert cache.load(file) == data
+    assert cache.misses == 2
+    assert cache.load(file) == data
+    assert cache.hits == 1
+
+
+def test_parse_cache_concurrent(data_path, tmp_path):
+    file = os.path.join(data_path, 'valid_file.yaml')
+    expected = ParseCache(str(tmp_path / 'expected')).load(file)
+    results = []
+
+    def load():
+        cache = ParseCache(str(tmp_path / 'cache'), max_size=1)
+        for _ in range(20):
+            results.append(cache.load(file))
+
+    threads = [threading.Thread(target=load) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [expected] * 80
+
+
+def test_validators_parse_cache(data_path, tmp_path):
+    cache_dir = str(tmp_path)
+    file = os.path.join(data_path, 'invalid_file.yaml')
+    validator = DataFileValidator(parse_cache=cache_dir)
+    assert not validator.validate(file_path=file)
+    messages = [m.message for m in validator.get_messages(file)]
+    validator = DataFileValidator(parse_cache=cache_dir)
+    assert not validator.validate(file_path=file)
+    assert [m.message for m in validator.get_messages(file)] == messages
+    assert validator.parse_cache.hits == 1
+
+    submission_file = os.path.join(data_path, 'valid_submission.yaml')
+    for _ in range(2):
+        validator = SubmissionFileValidator(parse_cache=cache_dir)
+        assert validator.validate(file_path=submission_file)
+    assert validator.parse_cache.hits == 1
+
+    submission_dir = os.path.join(data_path, 'TestHEPSubmission')
+    cache = ParseCache(cache_dir)
+    for _ in range(2):
+        validator = FullSubmissionValidator(parse_cache=cache)
+        assert validator.validate(directory=submission_dir)
+    # submission.yaml and 8 data files
+    assert cache.cache_info()[:2] == (9, 9)
+    assert validator._data_file_validator.parse_cache is cache
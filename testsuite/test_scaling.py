@@ -0,0 +1,131 @@
+"""
+Tests that checks take time proportional to the size of their input, so
+that quadratic behaviour doesn't come back unnoticed. Each check is timed
+on inputs of n, 10n and 100n items.
+
+As the timings depend on the load of the machine, these tests are marked
+as benchmarks, which aren't run by default::
+
+    $ pytest testsuite -m benchmark
+"""
+
+import io
+import timeit
+
+import pytest
+import yaml
+
+from hepdata_validator import YamlDumper, YamlLoader
+from hepdata_validator.data_file_validator import DataFileValidator
+from hepdata_validator.full_submission_validator import FullSubmissionValidator
+from hepdata_validator.locations import find_locations
+from hepdata_validator.submission_file_validator import SubmissionFileValidator
+
+# Growth in time for 10 times the input: about 10 if linear, or 100 if
+# quadratic. Allows for noise in the timings.
+MAX_GROWTH = 30
+# Each check is timed this many times, keeping the fastest
+REPEAT = 5
+
+pytestmark = pytest.mark.benchmark
+
+
+def _assert_linear(make_input, check, n):
+    """
+    Times `check(make_input(size))` for sizes n, 10n and 100n.
+    """
+    times = []
+    for size in (n, 10 * n, 100 * n):
+        data = make_input(size)
+        times.append(min(timeit.repeat(lambda: check(data), number=1, repeat=REPEAT)))
+    assert times[1] < MAX_GROWTH * times[0], times
+    assert times[2] < MAX_GROWTH * times[1], times
+
+
+def test_independent_variable_checks_scaling():
+    def make_table(size):
+        values = [{'low': i, 'high': float('inf')} for i in range(size)]
+        values += [{'low': float('-inf'), 'high': i} for i in range(size)]
+        values += [{'value': i} for i in range(size)]
+        return {'independent_variables': [{'values': values}]}
+
+    def check(data):
+        validator = DataFileValidator()
+        validator.check_independent_variable_values('data.yaml', data)
+        assert len(validator.get_messages('data.yaml')) == 2
+
+    _assert_linear(make_table, check, 100)
+
+
+def test_error_value_checks_scaling():
+    def make_table(size):
+        values = [{'value': i, 'errors': [{'symerror': i % 3}, {'symerror': '1%'}]}
+                  for i in range(size)]
+        return {'independent_variables': [{'values': [{'value': i} for i in range(size)]}],
+                'dependent_variables': [{'values': values}]}
+
+    def check(data):
+        DataFileValidator()._check_semantics('data.yaml', data)
+
+    _assert_linear(make_table, check, 200)
+
+
+def test_duplicate_table_checks_scaling():
+    def make_names(size):
+        return [f'Table {i}' for i in range(size)] * 2
+
+    def check(names):
+        validator = SubmissionFileValidator()
+        validator.check_for_duplicates('submission.yaml', names, names)
+        assert len(validator.get_messages('submission.yaml')) == len(names)
+
+    _assert_linear(make_names, check, 100)
+
+
+def test_submission_file_scaling(tmp_path):
+    def make_submission(size):
+        documents = [{'comment': 'A submission'}]
+        documents += [{'name': f'Table {i}', 'description': 'A table', 'keywords': [],
+                       'data_file': f'data{i}.yaml'} for i in range(size)]
+        file = str(tmp_path / f'submission{size}.yaml')
+        with open(file, 'w') as f:
+            yaml.dump_all(documents, f, Dumper=YamlDumper)
+        return file
+
+    def check(file):
+        assert SubmissionFileValidator().validate(file_path=file)
+
+    _assert_linear(make_submission, check, 20)
+
+
+def test_unreferenced_file_checks_scaling(tmp_path):
+    def make_validator(size):
+        directory = tmp_path / str(size)
+        directory.mkdir()
+        for i in range(size):
+            (directory / f'data{i}.yaml').write_text('')
+        validator = FullSubmissionValidator()
+        validator.directory = str(directory)
+        validator.temp_directory = None
+        validator.included_files = [str(directory / f'data{i}.yaml') for i in range(1, size)]
+        return validator
+
+    def check(validator):
+        validator.clear_messages()
+        validator._check_unreferenced_files()
+        assert len(validator.get_messages()) == 1
+
+    _assert_linear(make_validator, check, 40)
+
+
+def test_find_locations_scaling():
+    def make_document(size):
+        text = yaml.dump({'values': [{'value': i, 'label': 'a'} for i in range(size)]},
+                         Dumper=YamlDumper)
+        return text, [(0, ('values', i, 'label')) for i in range(0, size, 2)]
+
+    def check(data):
+        text, paths = data
+        assert len(find_locations(io.StringIO(text), paths, YamlLoader)) == len(paths)
+
+    _assert_linear(make_document, check, 100)
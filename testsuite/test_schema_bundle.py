@@ -0,0 +1,124 @@
+import json
+import os
+import shutil
+
+import pytest
+from mock import patch
+
+from hepdata_validator import VALID_SCHEMA_VERSIONS, SchemaRegistry
+from hepdata_validator.data_file_validator import DataFileValidator
+from hepdata_validator.schema_bundle import BUNDLE_FILENAME, SchemaBundleError, \
+    build_schema_bundle, load_schema_bundle
+from hepdata_validator.submission_file_validator import SubmissionFileValidator
+
+
+####################################################
+#                 Tests fixtures                   #
+####################################################
+
+
+@pytest.fixture(scope="module")
+def data_path():
+    base_dir = os.path.dirname(os.path.realpath(__file__))
+    return os.path.join(base_dir, 'test_data')
+
+
+@pytest.fixture(scope="module")
+def schemas_path():
+    base_dir = os.path.dirname(os.path.realpath(__file__))
+    return os.path.join(base_dir, os.pardir, 'hepdata_validator', 'schemas')
+
+
+####################################################
+#                 Schema bundle tests              #
+####################################################
+
+
+@pytest.mark.parametrize('schema_version', VALID_SCHEMA_VERSIONS)
+def test_bundles_up_to_date(schemas_path, schema_version):
+    """
+    Tests that the shipped bundles match the JSON schema files.
+    If this fails, run `python -m hepdata_validator.schema_bundle`.
+    """
+    version_path = os.path.join(schemas_path, schema_version)
+    bundled_schemas = load_schema_bundle(version_path)
+    assert bundled_schemas is not None
+    assert bundled_schemas == build_schema_bundle(version_path)['schemas']
+
+
+def test_bundle_resolves_refs(schemas_path):
+    version_path = os.path.join(schemas_path, '1.1.1')
+    schemas = load_schema_bundle(version_path)
+
+    with open(os.path.join(version_path, 'additional_resources_schema.json')) as f:
+        additional_resources_schema = json.load(f)
+
+    for filename in ('submission_schema.json', 'additional_info_schema.json'):
+        assert '$ref' not in json.dumps(schemas[filename])
+        assert schemas[filename]['properties']['additional_resources'] == additional_resources_schema
+
+
+def test_registry_uses_bundle(data_path):
+    """
+    Tests that bundled schemas are neither read from their JSON files nor
+    checked against their metaschema
+    """
+    with patch('hepdata_validator.load_schema_file') as load_schema_file, \
+            patch('hepdata_validator.get_schema_resolver') as get_schema_resolver:
+        registry = SchemaRegistry()
+        submission_validator = SubmissionFileValidator(schema_registry=registry)
+        data_validator = DataFileValidator(schema_registry=registry)
+        load_schema_file.assert_not_called()
+        get_schema_resolver.assert_not_called()
+
+    assert registry.get_submission_resolver() is None
+    assert submission_validator.validate(
+        file_path=os.path.join(data_path, 'valid_submission.yaml')) is True
+    assert data_validator.validate(
+        file_path=os.path.join(data_path, 'valid_file.yaml')) is True
+
+
+def test_registry_without_bundle(tmpdir, schemas_path, data_path):
+    """
+    Tests that the JSON schema files are used if there is no bundle
+    """
+    schema_folder = tmpdir.join('schemas')
+    shutil.copytree(os.path.join(schemas_path, '1.1.1'), str(schema_folder.join('1.1.1')))
+    os.remove(str(schema_folder.join('1.1.1', BUNDLE_FILENAME)))
+
+    registry = SchemaRegistry('1.1.1', 'schemas', str(tmpdir))
+    assert registry.get_submission_resolver() is not None
+    assert '$ref' in json.dumps(registry.get_schema('submission_schema.json'))
+
+    validator = SubmissionFileValidator(schema_registry=registry)
+    assert validator.validate(file_path=os.path.join(data_path, 'valid_submission.yaml')) is True
+
+
+def test_invalid_bundle(tmpdir):
+    tmpdir.join(BUNDLE_FILENAME).write('not a bundle')
+    assert load_schema_bundle(str(tmpdir)) is None
+
+
+def test_unresolvable_ref(tmpdir):
+    tmpdir.join('a_schema.json').write(json.dumps({
+        "$schema": "http://json-schema.org/draft-07/schema#",
+        "$id": "https://example.com/a_schema.json",
+        "properties": {"b": {"$ref": "b_schema.json"}}
+    }))
+    with pytest.raises(SchemaBundleError) as excinfo:
+        build_schema_bundle(str(tmpdir))
+
+    assert str(excinfo.value) == "Cannot resolve $ref b_schema.json"
+
+
+def test_circular_ref(tmpdir):
+    for name, other in (('a', 'b'), ('b', 'a')):
+        tmpdir.join(f'{name}_schema.json').write(json.dumps({
+            "$schema": "http://json-schema.org/draft-07/schema#",
+            "$id": f"https://example.com/{name}_schema.json",
+            "properties": {other: {"$ref": f"{other}_schema.json"}}
+        }))
+    with pytest.raises(SchemaBundleError) as excinfo:
+        build_schema_bundle(str(tmpdir))
+
+    assert str(excinfo.value).startswith("Circular $ref")
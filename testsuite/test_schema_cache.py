@@ -0,0 +1,62 @@
+import pytest
+
+from hepdata_validator.schema_cache import SchemaCache, SchemaCacheInfo
+
+
+def test_lru_eviction():
+    cache = SchemaCache(max_entries=2)
+    cache['a'] = 1
+    cache['b'] = 2
+    assert cache['a'] == 1
+
+    # 'b' is the least recently used
+    cache['c'] = 3
+    assert 'b' not in cache
+    assert list(cache) == ['a', 'c']
+    assert cache.cache_info() == SchemaCacheInfo(hits=1, misses=0, evictions=1, entries=2,
+                                                 size=0, max_entries=2, max_size=None)
+
+
+def test_size_bound():
+    cache = SchemaCache(max_entries=None, max_size=10, sizeof=len)
+    cache['a'] = 'aaaa'
+    cache['b'] = 'bbbb'
+    assert cache.size == 8
+
+    cache['c'] = 'cccc'
+    assert list(cache) == ['b', 'c']
+    assert cache.size == 8
+    assert cache.evictions == 1
+
+    # Replacing an item updates the size
+    cache['c'] = 'cc'
+    assert cache.size == 6
+
+    # Items which can never fit are not stored
+    cache['d'] = 'd' * 11
+    assert 'd' not in cache
+    assert list(cache) == ['b', 'c']
+
+    del cache['b']
+    assert cache.size == 2
+    with pytest.raises(KeyError):
+        del cache['b']
+
+
+def test_counters():
+    cache = SchemaCache()
+    cache['a'] = 1
+
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert cache.hits == 0 and cache.misses == 0
+
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    with pytest.raises(KeyError):
+        cache['b']
+
+    info = cache.cache_info()
+    assert info.hits == 1
+    assert info.misses == 2
+    assert info.entries == 1
@@ -0,0 +1,215 @@
+import glob
+import json
+import os
+
+import pytest
+import yaml
+from jsonschema.validators import validator_for
+
+from hepdata_validator import VALID_SCHEMA_VERSIONS, YamlLoader, get_fast_validator, get_schema_resolver
+from hepdata_validator.schema_compiler import compile_schema, UnsupportedSchemaError
+
+
+####################################################
+#                 Tests fixtures                   #
+####################################################
+
+
+@pytest.fixture(scope="module")
+def data_path():
+    base_dir = os.path.dirname(os.path.realpath(__file__))
+    return os.path.join(base_dir, 'test_data')
+
+
+@pytest.fixture(scope="module")
+def schemas_path():
+    base_dir = os.path.dirname(os.path.realpath(__file__))
+    return os.path.join(base_dir, os.pardir, 'hepdata_validator', 'schemas')
+
+
+@pytest.fixture(scope="module")
+def documents(data_path):
+    """
+    All YAML documents found in the test data, valid or not
+    """
+    docs = []
+    for file_path in sorted(glob.glob(os.path.join(data_path, '**', '*.yaml'), recursive=True)):
+        try:
+            with open(file_path, 'r') as f:
+                docs.extend(doc for doc in yaml.load_all(f, Loader=YamlLoader) if doc)
+        except yaml.YAMLError:
+            pass
+    return docs
+
+
+def _load_bundled_schema(schemas_path, version, schema_name):
+    schema_file = os.path.join(schemas_path, version, schema_name)
+    with open(schema_file, 'r') as f:
+        schema = json.load(f)
+    resolver = None
+    resources_file = os.path.join(schemas_path, version, 'additional_resources_schema.json')
+    if os.path.isfile(resources_file):
+        resolver = get_schema_resolver(resources_file)
+    return schema, resolver
+
+
+####################################################
+#               SchemaCompiler tests               #
+####################################################
+
+
+@pytest.mark.parametrize("version", VALID_SCHEMA_VERSIONS)
+@pytest.mark.parametrize("schema_name", ['data_schema.json', 'submission_schema.json', 'additional_info_schema.json'])
+def test_compiled_bundled_schemas_match_jsonschema(version, schema_name, schemas_path, documents):
+    """
+    Tests that the compiled bundled schemas give the same result as jsonschema
+    """
+    schema, resolver = _load_bundled_schema(schemas_path, version, schema_name)
+    cls = validator_for(schema)
+    is_valid = compile_schema(schema, cls, resolver)
+    validator = cls(schema, resolver=resolver) if resolver else cls(schema)
+
+    for doc in documents:
+        assert is_valid(doc) == validator.is_valid(doc)
+
+
+def test_compiled_data_schema_values():
+    """
+    Tests the compiled data schema against different forms of table values
+    """
+    schema = {
+        "type": "object",
+        "properties": {
+            "values": {
+                "type": "array",
+                "items": {
+                    "oneOf": [
+                        {"type": "object", "properties": {"value": {"type": ["string", "number"]}},
+                         "required": ["value"], "additionalProperties": False},
+                        {"type": "object", "properties": {"low": {"type": "number"}, "high": {"type": "number"}},
+                         "required": ["low", "high"], "additionalProperties": False},
+                    ]
+                }
+            }
+        }
+    }
+    is_valid = compile_schema(schema, validator_for(schema))
+
+    assert is_valid({'values': [{'value': 1}, {'value': '1-2'}, {'low': 1, 'high': 2.5}]})
+    assert not is_valid({'values': [{'low': 1}]})
+    assert not is_valid({'values': [{'low': 1, 'high': '2'}]})
+    assert not is_valid({'values': [{'value': True}]})
+    assert not is_valid({'values': [{'value': 1, 'low': 1, 'high': 2}]})
+    assert not is_valid({'values': {}})
+    assert 'def validate' in is_valid.source
+
+
+def test_compiled_schema_keywords():
+    """
+    Tests the less common keywords supported by the schema compiler
+    """
+    schema = {
+        "$schema": "http://json-schema.org/draft-07/schema#",
+        "definitions": {"name": {"type": "string", "maxLength": 3, "pattern": "^a"}},
+        "type": "object",
+        "properties": {
+            "name": {"$ref": "#/definitions/name"},
+            "kind": {"enum": ["x", "y"]},
+            "ids": {"type": "array", "uniqueItems": True, "items": {"type": "integer", "minimum": 1}},
+            "any": {"anyOf": [{"type": "null"}, {"type": "boolean"}]},
+            "not_string": {"not": {"type": "string"}},
+        },
+        "additionalProperties": {"type": "number"},
+    }
+    is_valid = compile_schema(schema, validator_for(schema))
+
+    assert is_valid({'name': 'abc', 'kind': 'x', 'ids': [1, 2.0], 'any': None, 'not_string': 1, 'extra': 1})
+    assert not is_valid({'name': 'abcd'})
+    assert not is_valid({'name': 'bc'})
+    assert not is_valid({'kind': 'z'})
+    assert not is_valid({'ids': [1, 1]})
+    assert not is_valid({'ids': [0]})
+    assert not is_valid({'any': 1})
+    assert not is_valid({'not_string': 'a'})
+    assert not is_valid({'extra': 'a'})
+
+
+@pytest.mark.parametrize("draft", ["draft-04", "draft-07"])
+def test_compiled_schema_bounds(draft):
+    """
+    Tests the length and bound keywords, whose meaning depends on the draft
+    """
+    if draft == "draft-04":
+        exclusive_minimum = {"minimum": 0, "exclusiveMinimum": True}
+    else:
+        exclusive_minimum = {"exclusiveMinimum": 0}
+    schema = {
+        "$schema": f"http://json-schema.org/{draft}/schema#",
+        "type": "object",
+        "properties": {
+            "name": {"minLength": 1, "maxLength": 2},
+            "list": {"type": "array", "minItems": 1, "maxItems": 2},
+            "positive": exclusive_minimum,
+            "small": {"maximum": 10},
+            "option": {"enum": [1, None, "a"]},
+        },
+    }
+    cls = validator_for(schema)
+    is_valid = compile_schema(schema, cls)
+    validator = cls(schema)
+
+    for instance in [{'name': 'a', 'list': [1], 'positive': 1, 'small': 10, 'option': 1.0},
+                     {'name': ''}, {'name': 'abc'}, {'name': 1},
+                     {'list': []}, {'list': [1, 2, 3]},
+                     {'positive': 0}, {'positive': 'a'}, {'small': 10.5},
+                     {'option': None}, {'option': True}, {'option': 'b'}]:
+        assert is_valid(instance) == validator.is_valid(instance)
+
+
+def test_unsupported_schema():
+    """
+    Tests that schemas with unsupported keywords can't be compiled
+    """
+    schema = {"type": "object", "patternProperties": {"^a": {"type": "string"}}}
+    with pytest.raises(UnsupportedSchemaError):
+        compile_schema(schema, validator_for(schema))
+
+    assert get_fast_validator(schema) is None
+
+    # Unknown keywords are ignored, as they are by jsonschema
+    schema = {"type": "array", "notAKeyword": 1}
+    assert compile_schema(schema, validator_for(schema))([])
+
+
+
+def test_ref_siblings():
+    """
+    Tests that keywords alongside $ref are only ignored in the drafts which
+    ignore them
+    """
+    definitions = {"name": {"type": "string"}}
+    schema = {"$schema": "http://json-schema.org/draft-07/schema#",
+              "definitions": definitions, "$ref": "#/definitions/name", "maxLength": 2}
+    is_valid = compile_schema(schema, validator_for(schema))
+    assert is_valid('abc') == validator_for(schema)(schema).is_valid('abc') is True
+
+    for draft in ("https://json-schema.org/draft/2019-09/schema", "https://json-schema.org/draft/2020-12/schema"):
+        schema = {"$schema": draft, "definitions": definitions,
+                  "$ref": "#/definitions/name", "maxLength": 2}
+        assert validator_for(schema)(schema).is_valid('abc') is False
+        with pytest.raises(UnsupportedSchemaError):
+            compile_schema(schema, validator_for(schema))
+        assert get_fast_validator(schema) is None
+
+        # Annotations alongside $ref don't change the validity
+        schema = {"$schema": draft, "definitions": definitions,
+                  "$ref": "#/definitions/name", "description": "A name"}
+        assert compile_schema(schema, validator_for(schema))('abc')
+
+def test_unresolvable_ref():
+    """
+    Tests that remote references are never fetched while compiling
+    """
+    schema = {"$ref": "https://example.com/schema.json"}
+    with pytest.raises(UnsupportedSchemaError):
+        compile_schema(schema, validator_for(schema))
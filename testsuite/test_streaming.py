@@ -0,0 +1,261 @@
+import glob
+import os
+import tracemalloc
+
+import pytest
+import yaml
+from hepdata_validator import YamlDumper, YamlLoader
+from hepdata_validator.data_file_validator import DataFileValidator
+from hepdata_validator.full_submission_validator import FullSubmissionValidator
+from hepdata_validator.streaming import stream_table
+
+
+####################################################
+#                 Tests fixtures                   #
+####################################################
+
+
+@pytest.fixture(scope="module")
+def data_path():
+    base_dir = os.path.dirname(os.path.realpath(__file__))
+    return os.path.join(base_dir, 'test_data')
+
+
+def make_table(rows):
+    return {
+        'independent_variables': [{
+            'header': {'name': 'PT', 'units': 'GEV'},
+            'values': [{'low': float(i), 'high': float(i + 1)} for i in range(rows)],
+        }],
+        'dependent_variables': [{
+            'header': {'name': 'SIG', 'units': 'FB'},
+            'values': [{'value': i + 0.5, 'errors': [{'symerror': 0.1, 'label': 'stat'}]}
+                       for i in range(rows)],
+        }],
+    }
+
+
+def write_table(path, table):
+    with open(path, 'w') as f:
+        yaml.dump(table, f, Dumper=YamlDumper)
+    return path
+
+
+def get_message_set(validator, file_path):
+    return sorted(m.message for m in validator.get_messages(file_path))
+
+
+####################################################
+#                stream_table tests                #
+####################################################
+
+
+def test_stream_table():
+    """
+    Tests that the values are passed to the callbacks instead of being kept
+    in the document
+    """
+    values = []
+    variables = []
+    table = stream_table(
+        yaml.dump(make_table(3), Dumper=YamlDumper), YamlLoader,
+        lambda key, i, j, value: values.append((key, i, j, value)),
+        lambda key, i, count: variables.append((key, i, count))
+    )
+
+    assert table.is_complete
+    assert table.document['independent_variables'][0] == \
+        {'header': {'name': 'PT', 'units': 'GEV'}, 'values': []}
+    assert table.value_counts == {('independent_variables', 0): 3, ('dependent_variables', 0): 3}
+    assert ('independent_variables', 0, 2, {'low': 2.0, 'high': 3.0}) in values
+    assert len(values) == 6
+    assert sorted(variables) == [('dependent_variables', 0, 3), ('independent_variables', 0, 3)]
+
+
+@pytest.mark.parametrize("text", [
+    "[1, 2]",
+    "independent_variables: []",
+    "independent_variables: [1]\ndependent_variables: []",
+    "independent_variables: [{header: {name: X}}]\ndependent_variables: []",
+    "independent_variables: [{values: 1}]\ndependent_variables: []",
+])
+def test_stream_table_incomplete(text):
+    """
+    Tests that documents not laid out as a data table are parsed whole
+    """
+    table = stream_table(text, YamlLoader, lambda *args: None)
+    assert not table.is_complete
+    assert table.document == yaml.load(text, Loader=YamlLoader)
+
+
+MERGE_KEY_TABLE = """
+independent_variables:
+- header: {name: x}
+  values: [{value: 1}, {value: 2}]
+dependent_variables:
+- &dependent
+  header: {name: y}
+  values: [{value: 1, errors: [{symerror: 0}]}, {value: 2, errors: [{symerror: 0}]}]
+- <<: *dependent
+  header: {name: z}
+"""
+
+DOCUMENT_MERGE_KEY_TABLE = """
+base: &base
+  independent_variables:
+  - header: {name: x}
+    values: [{value: 1}]
+<<: *base
+dependent_variables:
+- header: {name: y}
+  values: [{value: 1, errors: [{symerror: 0}]}]
+"""
+
+REPEATED_VALUES_TABLE = """
+independent_variables:
+- header: {name: x}
+  values: [{value: 1}]
+dependent_variables:
+- header: {name: y}
+  values: [{value: 1, errors: [{symerror: 0}]}, {value: '1-2'}]
+  values: [{value: 1, errors: [{symerror: 1}]}]
+"""
+
+REPEATED_VARIABLES_TABLE = """
+independent_variables:
+- header: {name: x}
+  values: [{value: '1-2'}]
+independent_variables:
+- header: {name: x}
+  values: [{value: 1}]
+dependent_variables:
+- header: {name: y}
+  values: [{value: 1, errors: [{symerror: 1}]}]
+"""
+
+ANCHORED_VALUES_TABLE = """
+independent_variables:
+- header: {name: x}
+  values: &values [{value: 1}]
+dependent_variables:
+- header: {name: y}
+  values: [{value: 1, errors: [{symerror: 0}]}]
+extra: *values
+"""
+
+
+@pytest.mark.parametrize("text", [MERGE_KEY_TABLE, DOCUMENT_MERGE_KEY_TABLE, REPEATED_VALUES_TABLE,
+                                  REPEATED_VARIABLES_TABLE, ANCHORED_VALUES_TABLE])
+def test_stream_table_not_streamable(tmp_path, text):
+    """
+    Tests that tables with merge keys, repeated keys or aliases of the
+    streamed values are loaded whole, giving the same results with or
+    without streaming
+    """
+    table = stream_table(text, YamlLoader, lambda *args: None)
+    assert not table.is_complete
+    assert table.document is None
+
+    file = str(tmp_path / 'data.yaml')
+    with open(file, 'w') as f:
+        f.write(text)
+    validator = DataFileValidator()
+    is_valid = validator.validate(file_path=file)
+    messages = [m.message for m in validator.get_messages(file)]
+    assert not any(message.startswith('There was a problem parsing the file') for message in messages)
+    for kwargs in ({'streaming': True}, {'compact_values': True}):
+        streaming_validator = DataFileValidator(**kwargs)
+        assert streaming_validator.validate(file_path=file) == is_valid
+        assert [m.message for m in streaming_validator.get_messages(file)] == messages
+
+
+def test_stream_table_documents():
+    assert stream_table("", YamlLoader, lambda *args: None) is None
+    with pytest.raises(yaml.YAMLError) as excinfo:
+        stream_table("a: 1\n---\nb: 2\n", YamlLoader, lambda *args: None)
+    assert "expected a single document" in str(excinfo.value)
+
+
+####################################################
+#          DataFileValidator streaming tests       #
+####################################################
+
+
+@pytest.mark.parametrize("schema_version", ['0.1.0', '1.1.1'])
+def test_streaming_messages(data_path, tmp_path, schema_version):
+    """
+    Tests that streaming validation gives the same results as loading the
+    whole file
+    """
+    invalid = make_table(10)
+    del invalid['independent_variables'][0]['values'][2]['high']
+    invalid['independent_variables'][0]['values'][4] = {'value': '1-2'}
+    invalid['independent_variables'][0]['values'][6] = {'low': '-inf', 'high': 1}
+    invalid['independent_variables'][0]['values'][7] = {'low': '-inf', 'high': 2}
+    invalid['dependent_variables'][0]['values'][3]['errors'] = [{'symerror': 0}]
+    invalid['dependent_variables'][0]['values'][5]['errors'] = [{'symerror': 'abc'}]
+    invalid['dependent_variables'][0]['values'].pop()
+    invalid['dependent_variables'][0]['header'] = 'SIG'
+
+    files = glob.glob(os.path.join(data_path, '*.yaml'))
+    files += glob.glob(os.path.join(data_path, 'TestHEPSubmission*', '*.yaml'))
+    files.append(write_table(str(tmp_path / 'invalid.yaml'), invalid))
+
+    for file in files:
+        validator = DataFileValidator(schema_version=schema_version)
+        streaming_validator = DataFileValidator(schema_version=schema_version, streaming=True)
+        assert streaming_validator.validate(file_path=file) == validator.validate(file_path=file)
+        assert get_message_set(streaming_validator, file) == get_message_set(validator, file)
+
+
+def test_streaming_parse_error(tmp_path):
+    """
+    Tests that no errors from the values are reported for a file which
+    can't be parsed
+    """
+    table = make_table(10)
+    table['dependent_variables'][0]['values'][0]['errors'] = [{'symerror': 0}]
+    file = write_table(str(tmp_path / 'data.yaml'), table)
+    with open(file, 'a') as f:
+        f.write('- [\n')
+
+    validator = DataFileValidator(streaming=True)
+    assert not validator.validate(file_path=file)
+    messages = validator.get_messages(file)
+    assert len(messages) == 1
+    assert messages[0].message.startswith('There was a problem parsing the file.')
+
+
+def test_streaming_bounded_memory(tmp_path):
+    """
+    Tests that the memory used by streaming validation doesn't grow with
+    the number of rows
+    """
+    def get_peak_memory(rows):
+        file = write_table(str(tmp_path / f'data{rows}.yaml'), make_table(rows))
+        DataFileValidator(streaming=True).validate(file_path=file)
+        tracemalloc.start()
+        try:
+            assert DataFileValidator(streaming=True).validate(file_path=file)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    small_peak = get_peak_memory(200)
+    large_peak = get_peak_memory(2000)
+    assert large_peak < 1.5 * small_peak
+
+
+@pytest.mark.parametrize("submission", ['TestHEPSubmission', 'TestHEPSubmission_invalid'])
+def test_full_submission_streaming(data_path, submission):
+    directory = os.path.join(data_path, submission)
+    validator = FullSubmissionValidator()
+    streaming_validator = FullSubmissionValidator(streaming=True)
+
+    assert streaming_validator.validate(directory=directory) == validator.validate(directory=directory)
+    assert streaming_validator.valid_files == validator.valid_files
+    messages = validator.get_messages()
+    streaming_messages = streaming_validator.get_messages()
+    assert streaming_messages.keys() == messages.keys()
+    for file in messages:
+        assert get_message_set(streaming_validator, file) == get_message_set(validator, file)
@@ -1,6 +1,7 @@
 import os
 import pytest
 import yaml
+from mock import patch
 from hepdata_validator import VALID_SCHEMA_VERSIONS, YamlLoader
 from hepdata_validator.submission_file_validator import SubmissionFileValidator
 
@@ -302,6 +303,24 @@ def test_invalid_cmenergies_submission_yaml_v1(validator_v1, data_path, capsys):
         assert out.strip() == "error - Invalid value (in GeV) for cmenergies: '7000 GeV' in 'keywords[2].name.cmenergies' (expected: {'type': 'number or hyphen-separated range of numbers e.g. 1.7-4.7'})"
 
 
+def test_schemas_shared_between_validators(validator_v1, data_path):
+    """
+    Tests that validators of the same schema version share parsed schemas
+    and resolver, which are reused across calls to validate
+    """
+    other_validator = SubmissionFileValidator()
+    assert other_validator._submission_file_schema is validator_v1._submission_file_schema
+    assert other_validator._additional_file_section_schema is validator_v1._additional_file_section_schema
+    assert other_validator._resolver is validator_v1._resolver
+
+    file = os.path.join(data_path, 'valid_submission.yaml')
+    with patch('builtins.open', side_effect=open) as mock_open:
+        for _ in range(2):
+            assert other_validator.validate(file_path=file) is True
+        opened_files = [call.args[0] for call in mock_open.call_args_list]
+        assert opened_files == [file, file]
+
+
 def test_check_for_duplicates(validator_v1):
     """
     Tests the check_for_duplicates method adds correct errors
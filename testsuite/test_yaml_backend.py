@@ -0,0 +1,93 @@
+import os
+
+import pytest
+import yaml
+from click.testing import CliRunner
+
+from hepdata_validator.cli import validate
+from hepdata_validator.data_file_validator import DataFileValidator
+from hepdata_validator.yaml_backend import SlowYamlBackendError, YamlBackend, get_yaml_backend, \
+    get_yaml_backend_names, register_yaml_backend, set_yaml_backend, _backends
+
+
+@pytest.fixture(scope="module")
+def data_path():
+    base_dir = os.path.dirname(os.path.realpath(__file__))
+    return os.path.join(base_dir, 'test_data')
+
+
+@pytest.fixture()
+def restore_backend():
+    backend = get_yaml_backend()
+    yield
+    set_yaml_backend(backend.name)
+
+
+class CountingYamlBackend(YamlBackend):
+
+    def __init__(self):
+        super(CountingYamlBackend, self).__init__('counting', None, yaml.SafeDumper,
+                                                  description='counts loads')
+        self.loads = 0
+
+    def load(self, stream):
+        self.loads += 1
+        return yaml.safe_load(stream)
+
+
+def test_default_backend():
+    names = get_yaml_backend_names()
+    assert 'python' in names
+    assert ('libyaml' in names) == bool(getattr(yaml, '__with_libyaml__', False))
+
+    backend = get_yaml_backend()
+    use_libyaml = os.environ.get('USE_LIBYAML', 'True') not in ('False', 'false', 'f', 'F')
+    if use_libyaml and 'libyaml' in names:
+        assert backend.name == 'libyaml'
+        assert backend.is_fast
+    else:
+        assert backend.name == 'python'
+        assert not backend.is_fast
+
+
+def test_set_backend(restore_backend):
+    backend = set_yaml_backend('python')
+    assert get_yaml_backend() is backend
+    assert backend.load('a: [1, 2]') == {'a': [1, 2]}
+    assert list(backend.load_all('a: 1\n---\nb: 2\n')) == [{'a': 1}, {'b': 2}]
+    assert backend.load(backend.dump({'a': 1.5})) == {'a': 1.5}
+
+    with pytest.raises(SlowYamlBackendError):
+        set_yaml_backend('python', strict=True)
+    assert get_yaml_backend() is backend
+
+    with pytest.raises(ValueError):
+        set_yaml_backend('unknown')
+
+
+def test_custom_backend(data_path, restore_backend):
+    backend = CountingYamlBackend()
+    register_yaml_backend(backend)
+    try:
+        assert set_yaml_backend('counting', strict=True) is backend
+        file = os.path.join(data_path, 'valid_file.yaml')
+        assert DataFileValidator().validate(file_path=file)
+        assert backend.loads == 1
+        # Files are streamed with a PyYAML loader
+        assert DataFileValidator(streaming=True).validate(file_path=file)
+        assert backend.loads == 1
+    finally:
+        del _backends['counting']
+
+
+def test_cli_backend(data_path, restore_backend):
+    submission_dir = os.path.join(data_path, 'TestHEPSubmission')
+    runner = CliRunner()
+
+    result = runner.invoke(validate, ['-d', submission_dir, '--yaml-backend', 'python', '--show-yaml-backend'])
+    assert result.exit_code == 0
+    assert result.output.splitlines()[0] == "Using YAML backend python (pure-Python PyYAML parser)."
+
+    result = runner.invoke(validate, ['-d', submission_dir, '--yaml-backend', 'python', '--strict-yaml'])
+    assert result.exit_code == 1
+    assert 'is slow' in result.output